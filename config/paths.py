@@ -0,0 +1,8 @@
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Local state shared by all agent worker processes on this host (caches, indexes, queues)
+DATA_DIR = Path(os.getenv("CORTEX_DATA_DIR", str(BASE_DIR / "data")))
+DATA_DIR.mkdir(parents=True, exist_ok=True)
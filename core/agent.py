@@ -55,9 +55,41 @@ from tools import (
     close_tab_by_index,
     close_tab_by_title,
     submit_search,
-    smart_click
+    smart_click,
+    scrape_pages,
+    get_weather_multi,
+    email_queue_status,
+    send_bulk_email,
+    search_email,
+    transfer_status,
+    cancel_transfer,
+    find_files,
+    grep_files,
+    search_documents,
+    disk_usage,
+    batch_files,
+    undo_batch,
+    resume_batch,
+    find_duplicates,
+    start_background_job,
+    job_status,
+    job_output,
+    wait_for_job,
+    stop_job,
+    open_urls,
+    browser_status
 )
 
+from tools.email.smtp_pool import get_smtp_pool
+from tools.email.spool import get_email_spool
+from tools.email.inbox import get_inbox_syncer
+from tools.os.file_index import get_file_index
+from tools.os.documents import get_document_index
+from tools.os.app_catalog import get_app_catalog
+from tools.os.path_resolver import get_path_index
+from tools.os.shell import get_shell_pool
+from tools.os.jobs import stop_session_jobs
+from tools.browser.manager import get_browser_manager
 from memory.memory_manager import MemoryManager
 from dotenv import load_dotenv
 
@@ -103,7 +135,29 @@ tools = [
     close_tab_by_index,
     close_tab_by_title,
     smart_click,
-    submit_search
+    submit_search,
+    scrape_pages,
+    get_weather_multi,
+    email_queue_status,
+    send_bulk_email,
+    search_email,
+    transfer_status,
+    cancel_transfer,
+    find_files,
+    grep_files,
+    search_documents,
+    disk_usage,
+    batch_files,
+    undo_batch,
+    resume_batch,
+    find_duplicates,
+    start_background_job,
+    job_status,
+    job_output,
+    wait_for_job,
+    stop_job,
+    open_urls,
+    browser_status
 ]
 
 
@@ -156,6 +210,37 @@ async def my_agent(ctx: agents.JobContext):
 
     session = AgentSession()
 
+    # Close SMTP connections that have sat idle past the pool's idle timeout
+    get_smtp_pool().start()
+    # Deliver any email left in the outbound spool by a previous run
+    get_email_spool().start()
+    # Keep the local inbox index in step with Gmail so email searches answer instantly
+    get_inbox_syncer().start()
+    # Build and rescan the file catalog behind find_files
+    get_file_index().start()
+    # Ingest changed documents for search_documents
+    get_document_index().start()
+    # Index names under the home folder so misheard paths can be corrected
+    get_path_index().start()
+    # Catalog installed apps and rebuild it when apps are installed or removed
+    get_app_catalog().start()
+    # Close idle run_command shells, and this session's shell when it ends
+    get_shell_pool().start()
+
+    async def close_shell():
+        await get_shell_pool().close(session)
+
+    ctx.add_shutdown_callback(close_shell)
+
+    # Background jobs run detached from the turn that started them, but not past their session
+    async def stop_jobs():
+        await stop_session_jobs(session)
+
+    ctx.add_shutdown_callback(stop_jobs)
+    # Watch the assistant's browser for crashes, launching it now if CORTEX_BROWSER_PREWARM is set
+    get_browser_manager().start()
+    ctx.add_shutdown_callback(get_browser_manager().stop)
+
     avatar = anam.AvatarSession(
         persona_config=anam.PersonaConfig(
             name="Mia",
@@ -0,0 +1,144 @@
+import asyncio
+from email.message import EmailMessage
+
+from tools.email.imap_stub import LocalIMAPServer
+from tools.email.inbox import InboxIndex, InboxSyncer
+
+
+def _raw(subject: str, sender: str = "alice@example.com", body: str = "Hello") -> bytes:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = "me@example.com"
+    msg["Subject"] = subject
+    msg.set_content(body)
+    return msg.as_bytes()
+
+
+async def _with_server(server: LocalIMAPServer, scenario) -> None:
+    await server.start()
+    try:
+        await scenario()
+    finally:
+        await server.stop()
+
+
+def _syncer(server: LocalIMAPServer, tmp_path) -> InboxSyncer:
+    return InboxSyncer(
+        InboxIndex(tmp_path / "inbox.db"),
+        host=server.host,
+        port=server.port,
+        user="me@example.com",
+        password="secret",
+        ssl=False,
+        mailboxes=["INBOX"],
+    )
+
+
+def _flags(syncer: InboxSyncer) -> dict:
+    rows = syncer.index._connect().execute("SELECT uid, flags FROM messages WHERE mailbox = 'INBOX'")
+    return {row["uid"]: row["flags"] for row in rows}
+
+
+def test_initial_sync_indexes_every_message(tmp_path):
+    server = LocalIMAPServer()
+    server.add_message(_raw("Invoice 42", body="Your invoice is attached"))
+    server.add_message(_raw("Lunch", sender="bob@example.com"), flags=["\\Seen"])
+
+    async def scenario():
+        syncer = _syncer(server, tmp_path)
+        result = await syncer.sync()
+
+        assert result["added"] == 2
+        state = syncer.index.state("INBOX")
+        assert state["uidvalidity"] == server.uidvalidity
+        assert state["last_uid"] == 2
+        assert state["highest_modseq"] == server.modseq
+
+        rows = syncer.index.search("invoice")
+        assert [row["subject"] for row in rows] == ["Invoice 42"]
+        assert _flags(syncer) == {1: "", 2: "\\Seen"}
+
+    asyncio.run(_with_server(server, scenario))
+
+
+def test_resync_only_fetches_new_messages(tmp_path):
+    server = LocalIMAPServer()
+    server.add_message(_raw("First"))
+
+    async def scenario():
+        syncer = _syncer(server, tmp_path)
+        await syncer.sync()
+        before = server.fetched_bytes
+
+        result = await syncer.sync()
+        assert result == {"added": 0, "flag_updates": 0, "removed": 0, "seconds": result["seconds"]}
+        assert server.fetched_bytes == before
+
+        uid = server.add_message(_raw("Second"))
+        result = await syncer.sync()
+        assert result["added"] == 1
+        assert server.fetched_bytes - before == len(server._find(uid)["raw"])
+        assert syncer.index.state("INBOX")["last_uid"] == uid
+
+    asyncio.run(_with_server(server, scenario))
+
+
+def test_flag_changes_are_pulled_with_changedsince(tmp_path):
+    server = LocalIMAPServer()
+    first = server.add_message(_raw("First"))
+    second = server.add_message(_raw("Second"))
+
+    async def scenario():
+        syncer = _syncer(server, tmp_path)
+        await syncer.sync()
+        before = server.fetched_bytes
+
+        server.set_flags(second, ["\\Seen", "\\Flagged"])
+        result = await syncer.sync()
+
+        # Only the changed message is reported, and no bodies are downloaded again
+        assert result["flag_updates"] == 1
+        assert server.fetched_bytes == before
+        assert _flags(syncer) == {first: "", second: "\\Flagged \\Seen"}
+        assert syncer.index.state("INBOX")["highest_modseq"] == server.modseq
+
+    asyncio.run(_with_server(server, scenario))
+
+
+def test_expunged_messages_are_removed_from_the_index(tmp_path):
+    server = LocalIMAPServer()
+    keep = server.add_message(_raw("Keep me"))
+    gone = server.add_message(_raw("Delete me"))
+
+    async def scenario():
+        syncer = _syncer(server, tmp_path)
+        await syncer.sync()
+
+        server.expunge(gone)
+        result = await syncer.sync()
+
+        assert result["removed"] == 1
+        assert syncer.index.uids("INBOX") == {keep}
+        assert syncer.index.search("delete") == []
+
+    asyncio.run(_with_server(server, scenario))
+
+
+def test_uidvalidity_change_resyncs_the_mailbox(tmp_path):
+    server = LocalIMAPServer(uidvalidity=1)
+    server.add_message(_raw("First"))
+    server.add_message(_raw("Second"))
+
+    async def scenario():
+        syncer = _syncer(server, tmp_path)
+        await syncer.sync()
+
+        server.reset(uidvalidity=2)
+        result = await syncer.sync()
+
+        assert result["added"] == 2
+        assert syncer.index.state("INBOX")["uidvalidity"] == 2
+        assert syncer.index.uids("INBOX") == {m["uid"] for m in server.messages}
+        assert len(syncer.index.search("", limit=10)) == 2
+
+    asyncio.run(_with_server(server, scenario))
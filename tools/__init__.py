@@ -34,7 +34,29 @@ from tools.registry import (
     close_all_tabs,
     close_current_tab,
     submit_search,
-    smart_click
+    smart_click,
+    scrape_pages,
+    get_weather_multi,
+    email_queue_status,
+    send_bulk_email,
+    search_email,
+    transfer_status,
+    cancel_transfer,
+    find_files,
+    grep_files,
+    search_documents,
+    disk_usage,
+    batch_files,
+    undo_batch,
+    resume_batch,
+    find_duplicates,
+    start_background_job,
+    job_status,
+    job_output,
+    wait_for_job,
+    stop_job,
+    open_urls,
+    browser_status
 )
 
 __all__ = [
@@ -42,5 +64,5 @@ __all__ = [
     "open_file", "list_directory", "create_folder", "delete_path", "run_command","scrape_page","read_file","write_file","copy_file","move_file","delete_file",
     "open_url","search_youtube","search_google","open_github","open_stackoverflow","open_app","list_apps","focus_app","quit_app","open_new_tab","scroll_page",
     "search_on_page","switch_tab","click_element","go_back","go_forward","close_tab_by_title","close_tab_by_index","close_current_tab","close_all_tabs","submit_search",
-    "smart_click"
+    "smart_click","scrape_pages","get_weather_multi","email_queue_status","send_bulk_email","search_email","transfer_status","cancel_transfer","find_files","grep_files","search_documents","disk_usage","batch_files","undo_batch","resume_batch","find_duplicates","start_background_job","job_status","job_output","wait_for_job","stop_job","open_urls","browser_status"
 ]
\ No newline at end of file
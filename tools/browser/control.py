@@ -1,20 +1,54 @@
+import asyncio
 import logging
-from playwright.async_api import async_playwright
+from typing import List, Optional, Tuple
 from livekit.agents import function_tool, RunContext
 from urllib.parse import urlparse
 
+from tools.browser.manager import get_browser_manager
+
 logger = logging.getLogger("JARVIS.Browser")
 
-browser_context = None
+NAVIGATION_TIMEOUT = 15000
 
 
 async def _get_browser():
-    global browser_context
-    if browser_context is None:
-        p = await async_playwright().start()
-        browser = await p.webkit.launch(headless=False)
-        browser_context = await browser.new_context()
-    return browser_context
+    return await get_browser_manager().context()
+
+
+def is_running() -> bool:
+    """
+    Whether the assistant's browser has already been launched and is still connected.
+    """
+
+    return get_browser_manager().is_running()
+
+
+async def open_pages(urls: List[str], timeout: int = NAVIGATION_TIMEOUT) -> List[Tuple[str, Optional[str]]]:
+    """
+    Opens each URL in its own new tab of the assistant's browser, all at once,
+    so the tab tools can act on them straight away. Each navigation returns
+    as soon as the server responds rather than when the page finishes loading.
+    Returns:
+        list: (url, error) pairs in the order given; error is None for tabs that opened.
+    """
+
+    ctx = await _get_browser()
+
+    async def open_one(url: str) -> Optional[str]:
+        page = await ctx.new_page()
+        try:
+            await page.goto(url, timeout=timeout, wait_until="commit")
+            return None
+        except Exception as e:
+            logger.warning(f"Could not load {url} in a new tab: {e}")
+            await page.close()
+            return str(e).splitlines()[0] if str(e) else type(e).__name__
+
+    errors = await asyncio.gather(*(open_one(url) for url in urls), return_exceptions=True)
+    return [
+        (url, f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else error)
+        for url, error in zip(urls, errors)
+    ]
 
 
 @function_tool()
@@ -48,7 +82,7 @@ async def open_new_tab(context: RunContext, url: str) -> str:
         
         ctx = await _get_browser()
         page = await ctx.new_page()
-        await page.goto(url,timeout=15000)
+        await page.goto(url, timeout=NAVIGATION_TIMEOUT)
         logger.info(f"Opened new tab: {url}")
         return f"Opened {url}"
     except Exception:
@@ -401,4 +435,37 @@ async def submit_search(context: RunContext) -> str:
 
     except Exception:
         logger.exception("Search submit failed")
-        return "Could not submit search"
\ No newline at end of file
+        return "Could not submit search"
+
+
+@function_tool()
+async def browser_status(context: RunContext) -> str:
+    """
+    Report the status of the assistant's browser.
+
+    This function reports whether the browser is running, how many tabs are
+    open, its memory use and uptime, and how often it has been launched or
+    has crashed.
+
+    Args:
+        context (RunContext): The runtime context provided by the agent framework.
+
+    Returns:
+        str: A one-line status summary, or an error message if it could not be read.
+    """
+    try:
+        stats = await get_browser_manager().stats()
+        logger.info(f"Browser stats: {stats}")
+
+        history = f"{stats['launches']} launches, {stats['crashes']} crashes"
+        if stats["last_launch_seconds"] is not None:
+            history += f", last launch took {stats['last_launch_seconds']:.1f}s"
+        if not stats["running"]:
+            return f"The browser is not running ({history})."
+        return (
+            f"The browser is running with {stats['pages']} tabs, using {stats['memory_bytes'] / 1e6:.0f} MB, "
+            f"up for {stats['uptime_seconds']:.0f}s ({history})."
+        )
+    except Exception:
+        logger.exception("Browser status failed")
+        return "Could not read the browser status"
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import psutil
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger("JARVIS.Browser.Manager")
+
+# Launch the browser when the session starts instead of on the first browser tool call
+PREWARM = os.getenv("CORTEX_BROWSER_PREWARM", "0") == "1"
+HEADLESS = os.getenv("CORTEX_BROWSER_HEADLESS", "0") == "1"
+HEALTH_INTERVAL = 30
+# A browser that takes longer than this to answer a trivial request is treated as hung
+HEALTH_TIMEOUT = 5
+
+
+class BrowserManager:
+    """
+    Owns the assistant's single Playwright WebKit browser and its context.
+    Launches happen under a lock, so concurrent tool calls share one
+    browser instead of racing to start several. A crash or disconnect is
+    noticed through Playwright's events and a periodic probe; the next
+    call then launches a fresh browser, or one is relaunched straight away
+    when the browser was prewarmed.
+    """
+
+    def __init__(self, headless: bool = HEADLESS):
+        self.headless = headless
+        self.keep_warm = False
+        self.launches = 0
+        self.crashes = 0
+        self.last_launch_seconds: Optional[float] = None
+        self.launched_at: Optional[float] = None
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._connected = False
+        self._closing = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._warm_task: Optional[asyncio.Task] = None
+
+    def is_running(self) -> bool:
+        return self._context is not None and self._connected
+
+    async def context(self):
+        """
+        Returns the browser context, launching the browser first if it is not running.
+        """
+
+        if self.is_running():
+            return self._context
+        async with self._lock:
+            if not self.is_running():
+                await self._launch()
+            return self._context
+
+    async def _launch(self) -> None:
+        await self._close()
+
+        started = time.perf_counter()
+        playwright = await async_playwright().start()
+        try:
+            browser = await playwright.webkit.launch(headless=self.headless)
+            context = await browser.new_context()
+        except Exception:
+            await playwright.stop()
+            raise
+
+        self._playwright, self._browser, self._context = playwright, browser, context
+        self._connected = True
+        browser.on("disconnected", lambda _: self._on_disconnected(browser))
+
+        self.launches += 1
+        self.launched_at = time.time()
+        self.last_launch_seconds = time.perf_counter() - started
+        logger.info(f"Browser launched in {self.last_launch_seconds:.2f}s (launch {self.launches})")
+
+    def _on_disconnected(self, browser) -> None:
+        if browser is not self._browser:
+            return
+        self._connected = False
+        if self._closing:
+            return
+
+        self.crashes += 1
+        logger.warning(f"Browser disconnected unexpectedly after {time.time() - (self.launched_at or time.time()):.0f}s")
+        if self.keep_warm:
+            self.prewarm()
+
+    async def _close(self) -> None:
+        self._closing = True
+        try:
+            if self._browser is not None and self._connected:
+                try:
+                    # A hung browser may never answer; the driver stop below ends it regardless
+                    await asyncio.wait_for(self._browser.close(), HEALTH_TIMEOUT)
+                except Exception:
+                    logger.debug("Browser close failed", exc_info=True)
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    logger.debug("Playwright driver stop failed", exc_info=True)
+        finally:
+            self._playwright = self._browser = self._context = None
+            self._connected = False
+            self._closing = False
+
+    async def check(self) -> bool:
+        """
+        Probes the running browser with a trivial request. A browser that
+        fails the probe is shut down, and relaunched if it is kept warm.
+        Returns:
+            bool: Whether a browser is running and responsive afterwards.
+        """
+
+        browser, context = self._browser, self._context
+        if context is None:
+            return False
+        try:
+            if not self._connected:
+                raise ConnectionError("disconnected")
+            await asyncio.wait_for(context.cookies(), HEALTH_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.warning(f"Browser failed its health check ({str(e) or type(e).__name__})")
+
+        async with self._lock:
+            # Another call may have replaced the browser while this one waited
+            if self._browser is browser:
+                if self._connected:
+                    # Hung rather than gone; disconnects are counted when they happen
+                    self.crashes += 1
+                await self._close()
+            if self.keep_warm and not self.is_running():
+                await self._launch()
+        return self.is_running()
+
+    def prewarm(self) -> None:
+        """
+        Launches the browser in the background on the running event loop and
+        keeps it running: if it crashes, a new one is launched right away.
+        """
+
+        self.keep_warm = True
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.get_running_loop().create_task(self._warm())
+
+    async def _warm(self) -> None:
+        try:
+            await self.context()
+        except Exception:
+            logger.exception("Browser prewarm failed")
+
+    def memory_bytes(self) -> int:
+        """
+        Resident memory of the Playwright driver and the browser processes it started. Blocking.
+        """
+
+        total = 0
+        for proc in psutil.Process().children(recursive=True):
+            try:
+                if "playwright" in " ".join(proc.cmdline()).lower():
+                    total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Returns launch, crash, uptime and memory figures for the browser.
+        """
+
+        # Read on the event loop, where _close() runs, so the context cannot vanish in between
+        running = self.is_running()
+        result = {
+            "running": running,
+            "launches": self.launches,
+            "crashes": self.crashes,
+            "last_launch_seconds": self.last_launch_seconds,
+            "uptime_seconds": time.time() - self.launched_at if running and self.launched_at else 0.0,
+            "pages": len(self._context.pages) if running else 0,
+        }
+        result["memory_bytes"] = await asyncio.to_thread(self.memory_bytes) if running else 0
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(HEALTH_INTERVAL)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Browser health check failed")
+
+    def start(self) -> None:
+        """
+        Starts periodic health checks on the running event loop if they are not
+        already running, and launches the browser now when `PREWARM` is set.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if PREWARM:
+            self.prewarm()
+
+    async def stop(self) -> None:
+        """
+        Stops health checks and shuts down the browser and the Playwright driver.
+        """
+
+        self.keep_warm = False
+        for task in (self._task, self._warm_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._warm_task = None
+        async with self._lock:
+            await self._close()
+
+
+_manager: Optional[BrowserManager] = None
+
+
+def get_browser_manager() -> BrowserManager:
+    """
+    Returns the shared browser manager, creating it on first use.
+    """
+
+    global _manager
+    if _manager is None:
+        _manager = BrowserManager()
+    return _manager
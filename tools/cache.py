@@ -0,0 +1,308 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config.paths import DATA_DIR
+
+logger = logging.getLogger("JARVIS.ToolCache")
+
+CACHE_DB = DATA_DIR / "tool_cache.db"
+
+_caches: Dict[str, "ToolCache"] = {}
+
+
+class SharedCacheStore:
+    """
+    SQLite-backed cache tier shared by every worker process on the host.
+    Each thread keeps its own connection; calls are made from worker threads
+    so the event loop never waits on disk or on another process holding the lock.
+    """
+
+    def __init__(self, path=CACHE_DB):
+        self.path = str(path)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS tool_cache ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                    )
+                    conn.commit()
+                    self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO tool_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl),
+        )
+        conn.commit()
+
+    def delete_prefix(self, prefix: str) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM tool_cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        conn.commit()
+
+    def purge_expired(self) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM tool_cache WHERE expires_at < ?", (time.time(),))
+        conn.commit()
+
+
+_shared_store: Optional[SharedCacheStore] = None
+
+
+def get_shared_store() -> SharedCacheStore:
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = SharedCacheStore()
+        try:
+            _shared_store.purge_expired()
+        except Exception:
+            logger.exception("Failed to purge expired tool cache entries")
+    return _shared_store
+
+
+class ToolCache:
+    """
+    Two-tier result cache for a single tool.
+    The first tier is an in-process LRU with a per-entry TTL. The optional
+    second tier is the host-wide SQLite store. Concurrent misses for the same
+    key are coalesced so the tool body runs once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int,
+        shared: bool,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.shared = shared
+        self.cache_if = cache_if
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    def make_key(self, signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+        """
+        Builds a canonical key from the call arguments.
+        Arguments are bound to the signature with defaults applied, so positional,
+        keyword and omitted-default calls map to the same key. The RunContext
+        argument is ignored.
+        """
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {k: v for k, v in bound.arguments.items() if k != "context"}
+
+        payload = json.dumps(arguments, sort_keys=True, default=str, ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+        return f"{self.name}:{digest}"
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self._get_local(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            # Run the load as its own task so a cancelled caller does not cancel
+            # the computation other callers are waiting on
+            task = asyncio.ensure_future(self._load(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.stats["coalesced"] += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: str, compute: Callable[[], Any]) -> Any:
+        if self.shared:
+            try:
+                value = await asyncio.to_thread(get_shared_store().get, key)
+                if value is not None:
+                    self.stats["shared_hits"] += 1
+                    self._set_local(key, value)
+                    return value
+            except Exception:
+                self.stats["errors"] += 1
+                logger.exception(f"Shared cache read failed for {self.name}")
+
+        self.stats["misses"] += 1
+        value = await compute()
+
+        if value is None or (self.cache_if is not None and not self.cache_if(value)):
+            return value
+
+        self._set_local(key, value)
+
+        if self.shared:
+            try:
+                await asyncio.to_thread(get_shared_store().set, key, value, self.ttl)
+            except Exception:
+                self.stats["errors"] += 1
+                logger.exception(f"Shared cache write failed for {self.name}")
+
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.shared:
+            get_shared_store().delete_prefix(f"{self.name}:")
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["shared_hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] + self.stats["shared_hits"]) / lookups if lookups else 0.0
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hit_rate": round(hit_rate, 3),
+        }
+
+
+def get_cache(
+    name: str,
+    ttl: float,
+    maxsize: int = 128,
+    shared: bool = True,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+) -> ToolCache:
+    """
+    Creates and registers a named cache for code that needs finer-grained keys
+    than whole tool calls, e.g. one entry per city in a batched lookup.
+    """
+
+    cache = ToolCache(name, ttl=ttl, maxsize=maxsize, shared=shared, cache_if=cache_if)
+    _caches[name] = cache
+    return cache
+
+
+def cached_tool(
+    ttl: float,
+    maxsize: int = 128,
+    shared: bool = True,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+):
+    """
+    Caches the results of a read-only async tool.
+    Apply it below `@function_tool()` so the tool schema is still built from
+    the original signature and docstring:
+
+        @function_tool()
+        @cached_tool(ttl=600, cache_if=lambda r: not r.startswith("An error"))
+        async def get_weather(context: RunContext, city: str) -> str: ...
+
+    Args:
+        ttl (float): Seconds a result stays fresh.
+        maxsize (int, optional): Maximum entries kept in the in-process LRU. Defaults to 128.
+        shared (bool, optional): Whether to also use the host-wide SQLite tier so other
+            worker processes can reuse results. Values must be JSON serialisable. Defaults to True.
+        cache_if (Callable, optional): Predicate deciding whether a result may be cached,
+            e.g. to skip error messages. Defaults to caching every non-None result.
+    """
+
+    def decorator(func):
+        cache = get_cache(func.__name__, ttl=ttl, maxsize=maxsize, shared=shared, cache_if=cache_if)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                key = cache.make_key(signature, args, kwargs)
+            except TypeError:
+                return await func(*args, **kwargs)
+            return await cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Returns hit, miss, coalescing and size counters for every cached tool in this process.
+    """
+
+    return {name: cache.snapshot() for name, cache in _caches.items()}
+
+
+def invalidate(tool_name: Optional[str] = None) -> None:
+    """
+    Drops cached results for one tool, or for every cached tool when no name is given.
+    """
+
+    for name, cache in _caches.items():
+        if tool_name is None or name == tool_name:
+            cache.clear()
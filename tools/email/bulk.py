@@ -0,0 +1,143 @@
+import logging
+import os
+import string
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from livekit.agents import function_tool, RunContext
+from tools.email.spool import get_email_spool
+
+logger = logging.getLogger("JARVIS.Email.Bulk")
+
+MAX_BULK_RECIPIENTS = 100
+DEFAULT_RATE_PER_MINUTE = 60
+
+_formatter = string.Formatter()
+
+
+def _template_fields(template: str) -> List[str]:
+    return [field for _, field, _, _ in _formatter.parse(template) if field]
+
+
+def render_messages(
+    subject_template: str,
+    body_template: str,
+    recipients: List[Dict[str, str]],
+) -> Tuple[List[Tuple[str, str, str]], Dict[str, str]]:
+    """
+    Renders a subject and body template for every recipient in one pass.
+    Templates use `{name}` placeholders filled from each recipient's entry.
+    Recipients without an `email` or missing a variable are rejected up front,
+    before anything is sent.
+    Returns:
+        Tuple: A list of (email, subject, body) for renderable recipients, and a
+        mapping of rejected recipients to the reason.
+    """
+
+    fields = set(_template_fields(subject_template)) | set(_template_fields(body_template))
+    rendered = []
+    rejected = {}
+    seen = set()
+
+    for entry in recipients:
+        values = {str(k): str(v) for k, v in entry.items()}
+        email = values.get("email", "").strip()
+
+        if not email:
+            rejected[str(entry)] = "no email address"
+            continue
+
+        if email.lower() in seen:
+            continue
+        seen.add(email.lower())
+
+        missing = sorted(fields - values.keys())
+        if missing:
+            rejected[email] = f"missing {', '.join(missing)}"
+            continue
+
+        rendered.append((
+            email,
+            subject_template.format_map(values),
+            body_template.format_map(values),
+        ))
+
+    return rendered, rejected
+
+
+@function_tool()
+async def send_bulk_email(
+    context: RunContext,
+    subject_template: str,
+    body_template: str,
+    recipients: List[Dict[str, str]],
+    attachments: Optional[List[str]] = None,
+    rate_per_minute: int = DEFAULT_RATE_PER_MINUTE,
+) -> str:
+    """
+    Queue a personalised email to many recipients at once for delivery through Gmail.
+    Use this instead of repeated `send_email` calls when the same update goes
+    to several people. It returns as soon as the messages are queued, with a
+    batch id; `email_queue_status` with that batch id reports each recipient's delivery.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        subject_template (str): The subject line, with `{variable}` placeholders.
+        body_template (str): The plain-text body, with `{variable}` placeholders,
+            e.g. "Hi {name}, your invoice {invoice} is ready."
+        recipients (List[Dict[str, str]]): One entry per recipient. Each must have an
+            "email" key; the other keys fill the placeholders, e.g.
+            [{"email": "alice@example.com", "name": "Alice", "invoice": "42"}].
+            At most 100 recipients per call.
+        attachments (List[str], optional): Paths of files attached to every message.
+        rate_per_minute (int, optional): Maximum messages sent per minute. Defaults to 60.
+    Returns:
+        str: A summary line with the batch id followed by one line per recipient that was not queued.
+    Notes:
+        All messages are rendered before any is queued. Their send times are
+        spread out to honour `rate_per_minute`; messages that fall due together
+        go out over a single authenticated connection, pipelining the SMTP
+        commands when Gmail allows it. Failures are retried by the outbox worker.
+    """
+
+    try:
+        gmail_user = os.getenv("GMAIL_USER")
+
+        if not gmail_user or not os.getenv("GMAIL_APP_PASSWORD"):
+            logger.error("Gmail credentials not found in environment variables")
+            return "Bulk email failed: Gmail credentials not configured"
+
+        if len(recipients) > MAX_BULK_RECIPIENTS:
+            return f"Too many recipients: {len(recipients)}. The limit is {MAX_BULK_RECIPIENTS} per call."
+
+        files = []
+        for attachment in attachments or []:
+            path = Path(os.path.expanduser(attachment)).resolve()
+            if not path.is_file():
+                return f"Bulk email not sent: attachment not found: {attachment}"
+            files.append(str(path))
+
+        try:
+            rendered, rejected = render_messages(subject_template, body_template, recipients)
+        except (ValueError, IndexError) as e:
+            return f"Bulk email not sent: invalid template: {e}"
+
+        if not rendered:
+            lines = ["No emails queued."]
+        else:
+            batch_id = await get_email_spool().enqueue_batch(
+                gmail_user, rendered, attachments=files, rate_per_minute=rate_per_minute
+            )
+            logger.info(f"Bulk email batch {batch_id} queued for {len(rendered)} recipients, {len(rejected)} rejected")
+
+            lines = [
+                f"Queued {len(rendered)} of {len(rendered) + len(rejected)} emails for delivery as batch {batch_id}. "
+                f"Use email_queue_status with batch_id={batch_id} to see each recipient's delivery."
+            ]
+            spread = (len(rendered) - 1) * 60 / rate_per_minute if rate_per_minute > 0 else 0
+            if spread >= 1:
+                lines[0] += f" The last goes out in about {spread:.0f}s."
+        lines += [f"Not queued for {email}: {reason}" for email, reason in rejected.items()]
+        return "\n".join(lines)
+
+    except Exception as e:
+        logger.exception("Bulk email failed")
+        return f"An unexpected error occurred while sending bulk email: {str(e)}"
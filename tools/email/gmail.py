@@ -1,22 +1,35 @@
 import logging
 from livekit.agents import function_tool, RunContext
-from typing import Optional
+from typing import Dict, List, Optional
 import os
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import time
+from pathlib import Path
+from tools.email.spool import get_email_spool
 
 @function_tool()
-async def send_email(context: RunContext, to_email: str, subject: str, message: str, cc_email: Optional[str] = None) -> str:
+async def send_email(
+    context: RunContext,
+    to_email: str,
+    subject: str,
+    message: str,
+    cc_email: Optional[str] = None,
+    attachments: Optional[List[str]] = None,
+) -> str:
     """
-    Send an email through Gmail SMTP
+    Send an email through Gmail SMTP.
+    The email is queued and delivered in the background, with automatic retries
+    if Gmail is temporarily unavailable. Use `email_queue_status` to check on delivery.
+    Args:
+        to_email: The recipient address.
+        subject: The subject line.
+        message: The plain-text body.
+        cc_email: An optional address to copy.
+        attachments: Optional paths of files to attach.
     """
+
     try:
         logging.debug(f"Preparing to send email. From: {os.getenv('GMAIL_USER')}, To: {to_email}, Subject: {subject}")
 
-        smtp_server = "smtp.gmail.com"
-        smtp_port = 587
-
         gmail_user = os.getenv("GMAIL_USER")
         gmail_password = os.getenv("GMAIL_APP_PASSWORD")
 
@@ -24,27 +37,80 @@ async def send_email(context: RunContext, to_email: str, subject: str, message:
             logging.error("Gmail credentials not found in environment variables")
             return "Email Sending failed: Gmail credentials not configured"
 
-        msg = MIMEMultipart()
-        msg['From'] = gmail_user
-        msg['To'] = to_email
-        msg['Subject'] = subject
+        files = []
+        for attachment in attachments or []:
+            path = Path(os.path.expanduser(attachment)).resolve()
+            if not path.is_file():
+                return f"Email not sent: attachment not found: {attachment}"
+            files.append(str(path))
+
+        spool_id = await get_email_spool().enqueue(
+            gmail_user,
+            [to_email],
+            subject,
+            message,
+            cc_addrs=[cc_email] if cc_email else None,
+            attachments=files,
+        )
+
+        logging.info(f"Email {spool_id} to {to_email} queued for delivery")
+        return f"Email to {to_email} queued for delivery"
+
+    except Exception as e:
+        logging.error(f"Unexpected error occurred while sending email: {e}")
+        return f"An unexpected error occurred while sending email: {str(e)}"
+
+
+@function_tool()
+async def email_queue_status(context: RunContext, batch_id: int = 0) -> str:
+    """
+    Report on outgoing email delivery: how many emails are still queued,
+    how many were sent or failed, typical delivery time, and recent failures.
+    With the batch id returned by `send_bulk_email`, report each recipient of that batch instead.
+    """
+
+    try:
+        spool = get_email_spool()
+
+        if batch_id:
+            messages = await spool.batch_status(batch_id)
+            if not messages:
+                return f"No email batch {batch_id}."
 
-        recipients = [to_email]
-        if cc_email:
-            msg['Cc'] = cc_email
-            recipients.append(cc_email)
+            counts: Dict[str, int] = {}
+            lines = []
+            for message in messages:
+                counts[message["status"]] = counts.get(message["status"], 0) + 1
+                line = f"{', '.join(message['to'])}: {message['status']}"
+                if message["status"] == "pending" and message["attempts"]:
+                    line += f" (retrying in {max(message['next_attempt_at'] - time.time(), 0):.0f}s)"
+                if message["error"] and message["status"] != "sent":
+                    line += f": {message['error']}"
+                lines.append(line)
 
-        msg.attach(MIMEText(message, 'plain'))
+            summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+            return "\n".join([f"Batch {batch_id}: {summary}", *lines])
 
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(gmail_user, gmail_password)
-        server.sendmail(gmail_user, recipients, msg.as_string())
-        server.quit()
+        metrics = await spool.metrics()
 
-        logging.info(f"Email sent successfully to {to_email}")
-        return f"Email sent successfully to {to_email}"
+        lines = [
+            f"Queued: {metrics['queue_depth']}, sent: {metrics['sent']}, "
+            f"failed: {metrics['failed']}, retries: {metrics['retries']}"
+        ]
+
+        if metrics["latency_avg"] is not None:
+            lines.append(
+                f"Delivery time: {metrics['latency_avg']:.1f}s average, {metrics['latency_p95']:.1f}s p95"
+            )
+
+        if metrics["oldest_queued_age"]:
+            lines.append(f"Oldest queued email has waited {metrics['oldest_queued_age']:.0f}s")
+
+        for failure in await spool.recent_failures():
+            lines.append(f"Failed: '{failure['subject']}' to {', '.join(failure['to'])}: {failure['error']}")
+
+        return "\n".join(lines)
 
     except Exception as e:
-        logging.error(f"Unexpected error occurred while sending email: {e}")
-        return f"An unexpected error occurred while sending email: {str(e)}"
\ No newline at end of file
+        logging.error(f"Failed to read email queue status: {e}")
+        return "Could not read the email queue status"
@@ -0,0 +1,200 @@
+import asyncio
+import imaplib
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger("JARVIS.Email.IMAPStub")
+
+_PARTIAL_RE = re.compile(r"BODY\.PEEK\[\]<(\d+)\.(\d+)>", re.IGNORECASE)
+_CHANGEDSINCE_RE = re.compile(r"\(CHANGEDSINCE (\d+)\)", re.IGNORECASE)
+
+
+class LocalIMAPServer:
+    """
+    Minimal in-process IMAP server standing in for Gmail in tests and benchmarks.
+    Serves a single mailbox (any name is accepted) over plain TCP and speaks
+    enough IMAP4rev1 for imaplib and the inbox syncer: CAPABILITY, LOGIN
+    (any credentials are accepted), ENABLE CONDSTORE, SELECT/EXAMINE,
+    UID SEARCH, UID FETCH (FLAGS, INTERNALDATE, MODSEQ, partial BODY[] and
+    CHANGEDSINCE), NOOP and LOGOUT. Mail is added, flagged and expunged
+    through `add_message`, `set_flags` and `expunge`; `fetched_bytes` counts
+    message bytes sent so tests can check that syncs are incremental.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, uidvalidity: int = 1):
+        self.host = host
+        self.port = port
+        self.uidvalidity = uidvalidity
+        self.messages: List[Dict[str, object]] = []
+        self.next_uid = 1
+        self.modseq = 1
+        self.connections = 0
+        self.fetched_bytes = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def add_message(self, raw: bytes, flags: Iterable[str] = (), date: Optional[float] = None) -> int:
+        self.modseq += 1
+        uid = self.next_uid
+        self.next_uid += 1
+        self.messages.append({
+            "uid": uid,
+            "flags": set(flags),
+            "modseq": self.modseq,
+            "date": date or time.time(),
+            "raw": raw,
+        })
+        return uid
+
+    def _find(self, uid: int) -> Dict[str, object]:
+        return next(m for m in self.messages if m["uid"] == uid)
+
+    def set_flags(self, uid: int, flags: Iterable[str]) -> None:
+        self.modseq += 1
+        message = self._find(uid)
+        message["flags"] = set(flags)
+        message["modseq"] = self.modseq
+
+    def expunge(self, uid: int) -> None:
+        self.modseq += 1
+        self.messages.remove(self._find(uid))
+
+    def reset(self, uidvalidity: int) -> None:
+        """
+        Simulates the server renumbering the mailbox: UIDVALIDITY changes and
+        every message gets a fresh UID.
+        """
+
+        self.uidvalidity = uidvalidity
+        for message in self.messages:
+            message["uid"] = self.next_uid
+            self.next_uid += 1
+
+    def _uid_set(self, spec: str) -> List[int]:
+        highest = self.messages[-1]["uid"] if self.messages else 0
+        uids = set()
+        for part in spec.split(","):
+            low, _, high = part.partition(":")
+            low = highest if low == "*" else int(low)
+            high = low if not high else highest if high == "*" else int(high)
+            low, high = min(low, high), max(low, high)
+            uids.update(m["uid"] for m in self.messages if low <= m["uid"] <= high)
+        return sorted(uids)
+
+    def _fetch_response(self, seq: int, message: Dict[str, object], items: str) -> bytes:
+        parts = [f"UID {message['uid']}"]
+        upper = items.upper()
+        if "FLAGS" in upper:
+            parts.append(f"FLAGS ({' '.join(sorted(message['flags']))})")
+        if "INTERNALDATE" in upper:
+            parts.append(f"INTERNALDATE {imaplib.Time2Internaldate(message['date'])}")
+        parts.append(f"MODSEQ ({message['modseq']})")
+
+        head = f"* {seq} FETCH ({' '.join(parts)}".encode()
+        partial = _PARTIAL_RE.search(items)
+        if partial or "BODY.PEEK[]" in upper:
+            raw = message["raw"]
+            if partial:
+                start, length = int(partial.group(1)), int(partial.group(2))
+                raw = raw[start:start + length]
+                name = f"BODY[]<{start}>"
+            else:
+                name = "BODY[]"
+            self.fetched_bytes += len(raw)
+            return head + f" {name} {{{len(raw)}}}\r\n".encode() + raw + b")\r\n"
+        return head + b")\r\n"
+
+    def _uid_command(self, tag: str, args: str) -> bytes:
+        sub, _, rest = args.partition(" ")
+        sub = sub.upper()
+
+        if sub == "SEARCH":
+            criteria = rest.split()
+            if criteria and criteria[0].upper() == "UID":
+                uids = self._uid_set(criteria[1])
+            else:
+                uids = [m["uid"] for m in self.messages]
+            return f"* SEARCH {' '.join(map(str, uids))}\r\n{tag} OK SEARCH completed\r\n".encode()
+
+        if sub == "FETCH":
+            spec, _, items = rest.partition(" ")
+            changed = _CHANGEDSINCE_RE.search(items)
+            wanted = set(self._uid_set(spec))
+            out = []
+            for seq, message in enumerate(self.messages, start=1):
+                if message["uid"] not in wanted:
+                    continue
+                if changed and message["modseq"] <= int(changed.group(1)):
+                    continue
+                out.append(self._fetch_response(seq, message, items))
+            return b"".join(out) + f"{tag} OK FETCH completed\r\n".encode()
+
+        return f"{tag} BAD Unsupported UID command\r\n".encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        try:
+            writer.write(b"* OK CortexOS IMAP stand-in ready\r\n")
+
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+
+                line = raw.decode(errors="ignore").rstrip("\r\n")
+                tag, _, rest = line.partition(" ")
+                command, _, args = rest.partition(" ")
+                command = command.upper()
+
+                if command == "CAPABILITY":
+                    reply = f"* CAPABILITY IMAP4rev1 CONDSTORE ENABLE\r\n{tag} OK CAPABILITY completed\r\n"
+                elif command == "LOGIN":
+                    reply = f"{tag} OK LOGIN completed\r\n"
+                elif command == "ENABLE":
+                    reply = f"* ENABLED CONDSTORE\r\n{tag} OK ENABLE completed\r\n"
+                elif command in ("SELECT", "EXAMINE"):
+                    mode = "READ-ONLY" if command == "EXAMINE" else "READ-WRITE"
+                    reply = (
+                        f"* {len(self.messages)} EXISTS\r\n"
+                        f"* 0 RECENT\r\n"
+                        f"* FLAGS (\\Seen \\Answered \\Flagged \\Deleted \\Draft)\r\n"
+                        f"* OK [UIDVALIDITY {self.uidvalidity}] UIDs valid\r\n"
+                        f"* OK [UIDNEXT {self.next_uid}] Predicted next UID\r\n"
+                        f"* OK [HIGHESTMODSEQ {self.modseq}] Highest\r\n"
+                        f"{tag} OK [{mode}] {command} completed\r\n"
+                    )
+                elif command == "UID":
+                    writer.write(self._uid_command(tag, args))
+                    await writer.drain()
+                    continue
+                elif command == "NOOP":
+                    reply = f"{tag} OK NOOP completed\r\n"
+                elif command == "LOGOUT":
+                    writer.write(f"* BYE Logging out\r\n{tag} OK LOGOUT completed\r\n".encode())
+                    await writer.drain()
+                    break
+                else:
+                    reply = f"{tag} BAD Command not implemented\r\n"
+
+                writer.write(reply.encode())
+                await writer.drain()
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception:
+            logger.exception("IMAP stand-in session failed")
+        finally:
+            writer.close()
@@ -0,0 +1,539 @@
+import asyncio
+import imaplib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from email import message_from_bytes, policy
+from email.utils import getaddresses
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from livekit.agents import function_tool, RunContext
+
+from config.paths import DATA_DIR
+
+logger = logging.getLogger("JARVIS.Email.Inbox")
+
+IMAP_HOST = os.getenv("IMAP_HOST", "imap.gmail.com")
+IMAP_PORT = int(os.getenv("IMAP_PORT", "993"))
+IMAP_SSL = os.getenv("IMAP_SSL", "1") != "0"
+MAILBOXES = [m.strip() for m in os.getenv("CORTEX_INBOX_MAILBOXES", "INBOX").split(",") if m.strip()]
+
+INBOX_DB = DATA_DIR / "inbox.db"
+
+SYNC_INTERVAL = 120
+FETCH_BATCH = 100
+# Only the first part of each message is downloaded; enough for headers and the readable body
+BODY_BYTES = 65536
+BODY_INDEX_CHARS = 20000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mailbox_state (
+    mailbox TEXT PRIMARY KEY,
+    uidvalidity INTEGER NOT NULL,
+    last_uid INTEGER NOT NULL DEFAULT 0,
+    highest_modseq INTEGER,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    mailbox TEXT NOT NULL,
+    uid INTEGER NOT NULL,
+    message_id TEXT,
+    date REAL,
+    sender TEXT,
+    recipients TEXT,
+    subject TEXT,
+    flags TEXT,
+    UNIQUE (mailbox, uid)
+);
+CREATE INDEX IF NOT EXISTS messages_date ON messages (date);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5 (
+    subject, sender, recipients, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_FETCH_ITEMS = f"(UID FLAGS INTERNALDATE BODY.PEEK[]<0.{BODY_BYTES}>)"
+_TAG_RE = re.compile(r"<[^>]+>")
+_FETCH_START_RE = re.compile(rb"\d+ \(")
+_UID_RE = re.compile(rb"UID (\d+)")
+_FLAGS_RE = re.compile(rb"FLAGS \(([^)]*)\)")
+
+
+def _body_text(msg) -> str:
+    try:
+        part = msg.get_body(preferencelist=("plain", "html"))
+        if part is None:
+            return ""
+        text = part.get_content()
+        if part.get_content_subtype() == "html":
+            text = _TAG_RE.sub(" ", text)
+        return " ".join(text.split())[:BODY_INDEX_CHARS]
+    except Exception:
+        # Truncated or malformed MIME; index the headers only
+        return ""
+
+
+def _parse_message(raw: bytes) -> Dict[str, Any]:
+    msg = message_from_bytes(raw, policy=policy.default)
+
+    def addresses(*headers: str) -> str:
+        values = [str(msg.get(h, "")) for h in headers]
+        return ", ".join(
+            f"{name} <{addr}>" if name else addr
+            for name, addr in getaddresses(values)
+            if addr
+        )
+
+    return {
+        "message_id": str(msg.get("Message-ID", "")),
+        "sender": addresses("From"),
+        "recipients": addresses("To", "Cc"),
+        "subject": str(msg.get("Subject", "")),
+        "body": _body_text(msg),
+    }
+
+
+def _iter_fetch(data: List[Any]) -> Iterable[Tuple[bytes, Optional[bytes]]]:
+    """
+    Regroups an imaplib FETCH response into (metadata, literal) pairs.
+    Items following a literal arrive as a separate bytes element and are
+    folded back into the metadata of the message they belong to.
+    """
+
+    meta, literal = None, None
+    for item in data:
+        if isinstance(item, tuple):
+            if meta is not None:
+                yield meta, literal
+            meta, literal = item[0], item[1]
+        elif isinstance(item, bytes):
+            if meta is not None and literal is not None and not _FETCH_START_RE.match(item):
+                meta += item
+                yield meta, literal
+                meta, literal = None, None
+            else:
+                if meta is not None:
+                    yield meta, literal
+                meta, literal = item, None
+    if meta is not None:
+        yield meta, literal
+
+
+def _fts_query(text: str) -> str:
+    """
+    Turns free text into an FTS5 query that ANDs every word, with prefix
+    matching on the last word so partially spoken names still match.
+    """
+
+    words = re.findall(r"\w+", text, flags=re.UNICODE)
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+    return " ".join(terms)
+
+
+class InboxIndex:
+    """
+    Local SQLite index of mailbox headers and bodies with FTS5 full-text search.
+    Holds per-mailbox sync watermarks (UIDVALIDITY, last UID, HIGHESTMODSEQ)
+    so each sync only transfers what changed.
+    """
+
+    def __init__(self, path=INBOX_DB):
+        self.path = str(path)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def state(self, mailbox: str) -> Optional[sqlite3.Row]:
+        return self._connect().execute(
+            "SELECT * FROM mailbox_state WHERE mailbox = ?", (mailbox,)
+        ).fetchone()
+
+    def reset_mailbox(self, mailbox: str, uidvalidity: int) -> None:
+        with self._connect() as conn:
+            ids = [r[0] for r in conn.execute("SELECT id FROM messages WHERE mailbox = ?", (mailbox,))]
+            conn.executemany("DELETE FROM messages_fts WHERE rowid = ?", [(i,) for i in ids])
+            conn.execute("DELETE FROM messages WHERE mailbox = ?", (mailbox,))
+            conn.execute(
+                "INSERT OR REPLACE INTO mailbox_state (mailbox, uidvalidity, last_uid, highest_modseq) "
+                "VALUES (?, ?, 0, NULL)",
+                (mailbox, uidvalidity),
+            )
+
+    def save_state(self, mailbox: str, last_uid: int, highest_modseq: Optional[int]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE mailbox_state SET last_uid = ?, highest_modseq = ?, synced_at = ? WHERE mailbox = ?",
+                (last_uid, highest_modseq, time.time(), mailbox),
+            )
+
+    def add_messages(self, mailbox: str, messages: List[Dict[str, Any]]) -> None:
+        with self._connect() as conn:
+            for m in messages:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO messages (mailbox, uid, message_id, date, sender, recipients, subject, flags) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (mailbox, m["uid"], m["message_id"], m["date"], m["sender"], m["recipients"], m["subject"], m["flags"]),
+                )
+                if cursor.rowcount:
+                    conn.execute(
+                        "INSERT INTO messages_fts (rowid, subject, sender, recipients, body) VALUES (?, ?, ?, ?, ?)",
+                        (cursor.lastrowid, m["subject"], m["sender"], m["recipients"], m["body"]),
+                    )
+
+    def update_flags(self, mailbox: str, flags: List[Tuple[int, str]]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE messages SET flags = ? WHERE mailbox = ? AND uid = ?",
+                [(f, mailbox, uid) for uid, f in flags],
+            )
+
+    def uids(self, mailbox: str) -> Set[int]:
+        return {r[0] for r in self._connect().execute("SELECT uid FROM messages WHERE mailbox = ?", (mailbox,))}
+
+    def remove_uids(self, mailbox: str, uids: Iterable[int]) -> None:
+        with self._connect() as conn:
+            for uid in uids:
+                row = conn.execute("SELECT id FROM messages WHERE mailbox = ? AND uid = ?", (mailbox, uid)).fetchone()
+                if row:
+                    conn.execute("DELETE FROM messages_fts WHERE rowid = ?", (row[0],))
+                    conn.execute("DELETE FROM messages WHERE id = ?", (row[0],))
+
+    def search(
+        self,
+        query: str = "",
+        sender: str = "",
+        since: Optional[float] = None,
+        limit: int = 5,
+    ) -> List[sqlite3.Row]:
+        """
+        Ranks indexed messages by BM25 over subject, sender, recipients and body.
+        With no query or sender, returns the most recent messages instead.
+        """
+
+        clauses = []
+        if _fts_query(query):
+            clauses.append(f"({_fts_query(query)})")
+        if _fts_query(sender):
+            clauses.append(f"sender : ({_fts_query(sender)})")
+
+        params: List[Any] = []
+        date_filter = ""
+        if since is not None:
+            date_filter = " AND m.date >= ?"
+            params.append(since)
+
+        conn = self._connect()
+
+        if not clauses:
+            return conn.execute(
+                "SELECT m.mailbox, m.uid, m.date, m.sender, m.subject, m.flags, "
+                "substr(f.body, 1, 160) AS snippet FROM messages m "
+                "JOIN messages_fts f ON f.rowid = m.id WHERE 1 = 1" + date_filter +
+                " ORDER BY m.date DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+
+        return conn.execute(
+            "SELECT m.mailbox, m.uid, m.date, m.sender, m.subject, m.flags, "
+            "snippet(messages_fts, 3, '', '', '...', 24) AS snippet "
+            "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+            "WHERE messages_fts MATCH ?" + date_filter +
+            " ORDER BY bm25(messages_fts, 4.0, 3.0, 1.0, 1.0), m.date DESC LIMIT ?",
+            (" AND ".join(clauses), *params, limit),
+        ).fetchall()
+
+    def last_synced(self) -> Optional[float]:
+        row = self._connect().execute("SELECT MIN(synced_at) FROM mailbox_state").fetchone()
+        return row[0] if row else None
+
+
+class InboxSyncer:
+    """
+    Incrementally mirrors IMAP mailboxes into an `InboxIndex`.
+    New mail is found with a UID range search above the stored watermark;
+    flag changes are pulled with CONDSTORE `CHANGEDSINCE` when the server
+    supports it; expunged messages are detected by comparing message counts.
+    A changed UIDVALIDITY discards the mailbox and resyncs it.
+    """
+
+    def __init__(
+        self,
+        index: InboxIndex,
+        host: str = IMAP_HOST,
+        port: int = IMAP_PORT,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        ssl: bool = IMAP_SSL,
+        mailboxes: Optional[List[str]] = None,
+    ):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.ssl = ssl
+        self.mailboxes = mailboxes or MAILBOXES
+
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self.last_result: Dict[str, Any] = {}
+
+    def _open(self) -> imaplib.IMAP4:
+        imap = (imaplib.IMAP4_SSL if self.ssl else imaplib.IMAP4)(self.host, self.port, timeout=30)
+        imap.login(self.user, self.password)
+        if "CONDSTORE" in imap.capabilities and "ENABLE" in imap.capabilities:
+            imap.enable("CONDSTORE")
+        return imap
+
+    def _fetch_new(self, imap: imaplib.IMAP4, mailbox: str, uids: List[int]) -> int:
+        added = 0
+        for start in range(0, len(uids), FETCH_BATCH):
+            batch = uids[start:start + FETCH_BATCH]
+            typ, data = imap.uid("FETCH", ",".join(map(str, batch)), _FETCH_ITEMS)
+            if typ != "OK":
+                raise imaplib.IMAP4.error(f"FETCH failed: {data}")
+
+            messages = []
+            for meta, literal in _iter_fetch(data):
+                uid = _UID_RE.search(meta)
+                if uid is None or literal is None:
+                    continue
+
+                internal = imaplib.Internaldate2tuple(meta)
+                flags = _FLAGS_RE.search(meta)
+                messages.append({
+                    "uid": int(uid.group(1)),
+                    "date": time.mktime(internal) if internal else None,
+                    "flags": flags.group(1).decode() if flags else "",
+                    **_parse_message(literal),
+                })
+
+            self.index.add_messages(mailbox, messages)
+            added += len(messages)
+        return added
+
+    def _sync_mailbox(self, imap: imaplib.IMAP4, mailbox: str) -> Dict[str, int]:
+        typ, data = imap.select(f'"{mailbox}"', readonly=True)
+        if typ != "OK":
+            raise imaplib.IMAP4.error(f"Cannot open mailbox {mailbox}: {data}")
+
+        exists = int(data[0])
+        uidvalidity = int(imap.response("UIDVALIDITY")[1][0])
+        # Only reported by servers with CONDSTORE enabled
+        modseq = imap.response("HIGHESTMODSEQ")[1]
+        highest_modseq = int(modseq[0]) if modseq and modseq[0] else None
+
+        state = self.index.state(mailbox)
+        if state is None or state["uidvalidity"] != uidvalidity:
+            logger.info(f"Full sync of {mailbox} (uidvalidity {uidvalidity})")
+            self.index.reset_mailbox(mailbox, uidvalidity)
+            state = self.index.state(mailbox)
+
+        last_uid = state["last_uid"]
+        result = {"added": 0, "flag_updates": 0, "removed": 0}
+
+        # Flag changes on messages we already have
+        if last_uid and highest_modseq and state["highest_modseq"] and highest_modseq > state["highest_modseq"]:
+            typ, data = imap.uid(
+                "FETCH", f"1:{last_uid}", "(UID FLAGS)", f"(CHANGEDSINCE {state['highest_modseq']})"
+            )
+            if typ == "OK":
+                updates = []
+                for meta, _ in _iter_fetch(data):
+                    uid, flags = _UID_RE.search(meta), _FLAGS_RE.search(meta)
+                    if uid and flags:
+                        updates.append((int(uid.group(1)), flags.group(1).decode()))
+                self.index.update_flags(mailbox, updates)
+                result["flag_updates"] = len(updates)
+
+        # New messages above the watermark
+        if exists:
+            typ, data = imap.uid("SEARCH", "UID", f"{last_uid + 1}:*")
+            new_uids = sorted(int(u) for u in (data[0] or b"").split() if int(u) > last_uid)
+            if new_uids:
+                result["added"] = self._fetch_new(imap, mailbox, new_uids)
+                last_uid = new_uids[-1]
+
+        # Expunges: only pay for a full UID listing when the counts disagree
+        local = self.index.uids(mailbox)
+        if len(local) > exists:
+            typ, data = imap.uid("SEARCH", "ALL")
+            remote = {int(u) for u in (data[0] or b"").split()}
+            gone = local - remote
+            self.index.remove_uids(mailbox, gone)
+            result["removed"] = len(gone)
+
+        self.index.save_state(mailbox, last_uid, highest_modseq)
+        return result
+
+    def sync_blocking(self) -> Dict[str, Any]:
+        """
+        Runs one incremental sync of every configured mailbox. Blocking.
+        """
+
+        with self._lock:
+            started = time.perf_counter()
+            imap = self._open()
+            try:
+                totals = {"added": 0, "flag_updates": 0, "removed": 0}
+                for mailbox in self.mailboxes:
+                    for key, value in self._sync_mailbox(imap, mailbox).items():
+                        totals[key] += value
+            finally:
+                try:
+                    imap.logout()
+                except Exception:
+                    pass
+
+            totals["seconds"] = round(time.perf_counter() - started, 3)
+            self.last_result = totals
+            logger.info(f"Inbox sync finished: {totals}")
+            return totals
+
+    async def sync(self) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.sync_blocking)
+
+    def is_stale(self) -> bool:
+        last = self.index.last_synced()
+        return last is None or time.time() - last > SYNC_INTERVAL
+
+    def request_sync(self) -> None:
+        """
+        Starts a background sync unless one is already running.
+        """
+
+        if self._lock.locked():
+            return
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.get_running_loop().create_task(self._sync_logged())
+
+    async def _sync_logged(self) -> None:
+        try:
+            await self.sync()
+        except Exception:
+            logger.exception("Inbox sync failed")
+
+    async def _run(self) -> None:
+        while True:
+            await self._sync_logged()
+            await asyncio.sleep(SYNC_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Starts periodic background syncing on the running event loop if it is not already running.
+        """
+
+        if not self.user or not self.password:
+            logger.warning("IMAP credentials not configured; inbox sync disabled")
+            return
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_syncer: Optional[InboxSyncer] = None
+
+
+def get_inbox_syncer() -> InboxSyncer:
+    """
+    Returns the shared Gmail inbox syncer, creating it on first use.
+    The IMAP server can be overridden with IMAP_HOST, IMAP_PORT and IMAP_SSL.
+    """
+
+    global _syncer
+    if _syncer is None:
+        _syncer = InboxSyncer(
+            InboxIndex(),
+            user=os.getenv("GMAIL_USER"),
+            password=os.getenv("GMAIL_APP_PASSWORD"),
+        )
+    return _syncer
+
+
+def set_inbox_syncer(syncer: InboxSyncer) -> None:
+    global _syncer
+    _syncer = syncer
+
+
+def _format_date(timestamp: Optional[float]) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M") if timestamp else "unknown date"
+
+
+@function_tool()
+async def search_email(
+    context: RunContext,
+    query: str = "",
+    sender: str = "",
+    days: int = 0,
+    limit: int = 5,
+) -> str:
+    """
+    Search the user's email, e.g. to answer "did Alice reply about the invoice".
+    Answers instantly from a local index that is kept in sync with Gmail in the background.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        query (str, optional): Words to look for in the subject, addresses and body.
+        sender (str, optional): Only messages whose sender name or address matches this.
+        days (int, optional): Only messages received in the last N days. 0 means any time.
+        limit (int, optional): Maximum number of messages to return. Defaults to 5.
+    Returns:
+        str: One line per matching message with date, sender, subject and a snippet,
+        best matches first, or a message saying nothing matched.
+    """
+
+    try:
+        syncer = get_inbox_syncer()
+
+        if not syncer.user or not syncer.password:
+            logger.error("Gmail credentials not found in environment variables")
+            return "Email search failed: Gmail credentials not configured"
+
+        if syncer.is_stale():
+            syncer.request_sync()
+
+        since = time.time() - days * 86400 if days > 0 else None
+        rows = await asyncio.to_thread(syncer.index.search, query, sender, since, max(1, min(limit, 20)))
+
+        if not rows:
+            if syncer.index.last_synced() is None:
+                return "The email index is still being built. Please try again in a moment."
+            return "No matching emails found."
+
+        lines = []
+        for row in rows:
+            unread = "" if "\\Seen" in (row["flags"] or "") else " (unread)"
+            lines.append(
+                f"{_format_date(row['date'])} | {row['sender']} | {row['subject']}{unread} | {row['snippet']}"
+            )
+
+        logger.info(f"Email search for '{query}' from '{sender}' returned {len(rows)} results")
+        return "\n".join(lines)
+
+    except Exception:
+        logger.exception("Email search failed")
+        return "Email search failed."
@@ -0,0 +1,100 @@
+import mimetypes
+import os
+import uuid
+from base64 import b64encode
+from email import policy
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+# 57 raw bytes encode to one 76 character base64 line; read a few thousand lines at a time
+_B64_LINE_BYTES = 57
+_READ_CHUNK = _B64_LINE_BYTES * 1024
+
+
+def _header(name: str, value: str) -> bytes:
+    return policy.SMTP.fold_binary(name, policy.SMTP.header_factory(name, value))
+
+
+def _attachment_headers(path: Path) -> bytes:
+    content_type, encoding = mimetypes.guess_type(path.name)
+    if content_type is None or encoding is not None:
+        content_type = "application/octet-stream"
+
+    maintype, subtype = content_type.split("/", 1)
+    part = MIMEBase(maintype, subtype)
+    del part["MIME-Version"]
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", "attachment", filename=path.name)
+
+    # Serialising an empty part yields exactly its headers and the blank separator line
+    return part.as_bytes(policy=policy.SMTP)
+
+
+def _iter_base64_file(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            encoded = b64encode(chunk)
+            yield b"\r\n".join(
+                encoded[i:i + 76] for i in range(0, len(encoded), 76)
+            ) + b"\r\n"
+
+
+def iter_message(
+    from_addr: str,
+    to_addrs: List[str],
+    subject: str,
+    body: str,
+    cc_addrs: Optional[List[str]] = None,
+    attachments: Optional[List[str]] = None,
+    message_id: Optional[str] = None,
+) -> Iterator[bytes]:
+    """
+    Generates an RFC 5322 message as a stream of CRLF-terminated byte chunks.
+    Attachments are read from disk and base64-encoded one chunk at a time, so
+    memory use stays constant regardless of attachment size. Call it again to
+    restart the stream, e.g. when a send has to be retried.
+    Args:
+        from_addr (str): The sender address.
+        to_addrs (List[str]): Addresses for the To header.
+        subject (str): The subject line.
+        body (str): The plain-text body.
+        cc_addrs (List[str], optional): Addresses for the Cc header.
+        attachments (List[str], optional): Paths of files to attach.
+        message_id (str, optional): A fixed Message-ID, so retries of the same
+            message can be recognised. Generated when omitted.
+    Yields:
+        bytes: Consecutive pieces of the message, each ending on a line boundary.
+    """
+
+    boundary = f"===============CortexOS{uuid.uuid4().hex}=="
+
+    yield b"".join([
+        _header("From", from_addr),
+        _header("To", ", ".join(to_addrs)),
+        _header("Cc", ", ".join(cc_addrs)) if cc_addrs else b"",
+        _header("Subject", subject),
+        _header("Date", formatdate(localtime=True)),
+        _header("Message-ID", message_id or make_msgid(domain=from_addr.rpartition("@")[2] or None)),
+        _header("MIME-Version", "1.0"),
+        _header("Content-Type", f'multipart/mixed; boundary="{boundary}"'),
+        b"\r\n",
+    ])
+
+    delimiter = f"--{boundary}\r\n".encode()
+
+    text = MIMEText(body, "plain", "utf-8")
+    del text["MIME-Version"]
+    yield delimiter + text.as_bytes(policy=policy.SMTP) + b"\r\n"
+
+    for attachment in attachments or []:
+        path = Path(os.path.expanduser(attachment))
+        yield delimiter + _attachment_headers(path)
+        yield from _iter_base64_file(path)
+
+    yield f"--{boundary}--\r\n".encode()
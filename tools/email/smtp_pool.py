@@ -0,0 +1,437 @@
+import asyncio
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger("JARVIS.Email.SMTP")
+
+T = TypeVar("T")
+
+# (from_addr, to_addrs, make_chunks) for one message of a batch
+Envelope = Tuple[str, List[str], Callable[[], Iterable[bytes]]]
+
+_PENDING: Any = object()
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+
+# Errors that mean the cached connection went away and a fresh one should be tried
+_STALE_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPPool:
+    """
+    Pool of authenticated SMTP connections used from async code.
+    Connections are opened, upgraded with STARTTLS and logged in once, then
+    reused across sends. Blocking smtplib calls run on a small dedicated thread
+    pool so the event loop never waits on the network. Connections idle longer
+    than `idle_timeout` are closed; connections idle longer than `noop_after`
+    are checked with NOOP before reuse. A send that fails on a stale connection
+    is retried once on a new one.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str],
+        password: Optional[str],
+        starttls: bool = True,
+        max_size: int = 2,
+        idle_timeout: float = 60,
+        noop_after: float = 10,
+        timeout: float = 20,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.noop_after = noop_after
+        self.timeout = timeout
+
+        self._idle: Deque[Tuple[smtplib.SMTP, float]] = deque()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_size, thread_name_prefix="smtp")
+        self.stats = {
+            "connects": 0,
+            "reuses": 0,
+            "health_checks": 0,
+            "reconnects": 0,
+            "sent": 0,
+            "failures": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        # Updated from executor threads
+        with self._lock:
+            self.stats[name] += 1
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.ehlo()
+            if self.starttls:
+                conn.starttls()
+                conn.ehlo()
+            if self.user and self.password:
+                conn.login(self.user, self.password)
+        except Exception:
+            self._close(conn)
+            raise
+
+        self._count("connects")
+        logger.info(f"Opened SMTP connection to {self.host}:{self.port}")
+        return conn
+
+    @staticmethod
+    def _close(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+
+            idle_for = time.monotonic() - last_used
+
+            if idle_for > self.idle_timeout:
+                self._close(conn)
+                continue
+
+            if idle_for > self.noop_after:
+                self._count("health_checks")
+                try:
+                    if conn.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP rejected")
+                except Exception:
+                    self._close(conn)
+                    continue
+
+            self._count("reuses")
+            return conn
+
+        return self._connect()
+
+    def _checkin(self, conn: smtplib.SMTP) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        self._close(conn)
+
+    def _with_connection(self, action: Callable[[smtplib.SMTP], T]) -> T:
+        """
+        Runs `action` on a pooled connection, retrying once on a fresh
+        connection if the pooled one turns out to be dead.
+        """
+
+        conn = self._checkout()
+        try:
+            result = action(conn)
+        except _STALE_ERRORS:
+            self._close(conn)
+            self._count("reconnects")
+            logger.warning("SMTP connection dropped, reconnecting")
+            conn = self._connect()
+            try:
+                result = action(conn)
+            except Exception:
+                self._close(conn)
+                raise
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+            # The connection is still usable, only this envelope was rejected
+            self._checkin(conn)
+            raise
+        except Exception:
+            self._close(conn)
+            raise
+
+        self._count("sent")
+        self._checkin(conn)
+        return result
+
+    @staticmethod
+    def _write_data(conn: smtplib.SMTP, make_chunks: Callable[[], Iterable[bytes]]) -> None:
+        """
+        Writes a message body after a 354 reply, dot-stuffing on the fly, and
+        terminates it with the end-of-data marker. Chunks always end on a line boundary.
+        """
+
+        at_line_start = True
+        for chunk in make_chunks():
+            if not chunk:
+                continue
+            if at_line_start and chunk.startswith(b"."):
+                chunk = b"." + chunk
+            chunk = chunk.replace(b"\n.", b"\n..")
+            conn.send(chunk)
+            at_line_start = chunk.endswith(b"\n")
+
+        conn.send(b".\r\n" if at_line_start else b"\r\n.\r\n")
+
+    @staticmethod
+    def _transmit_stream(
+        conn: smtplib.SMTP,
+        make_chunks: Callable[[], Iterable[bytes]],
+        from_addr: str,
+        to_addrs: List[str],
+    ) -> Dict[str, Tuple[int, bytes]]:
+        conn.ehlo_or_helo_if_needed()
+
+        code, resp = conn.mail(from_addr)
+        if code != 250:
+            conn.rset()
+            raise smtplib.SMTPSenderRefused(code, resp, from_addr)
+
+        refused = {}
+        for rcpt in to_addrs:
+            code, resp = conn.rcpt(rcpt)
+            if code not in (250, 251):
+                refused[rcpt] = (code, resp)
+
+        if len(refused) == len(to_addrs):
+            conn.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        code, resp = conn.docmd("data")
+        if code != 354:
+            conn.rset()
+            raise smtplib.SMTPDataError(code, resp)
+
+        SMTPPool._write_data(conn, make_chunks)
+
+        code, resp = conn.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+
+        return refused
+
+    async def send_stream(
+        self,
+        make_chunks: Callable[[], Iterable[bytes]],
+        from_addr: str,
+        to_addrs: List[str],
+    ) -> Dict[str, Tuple[int, bytes]]:
+        """
+        Sends a message produced chunk by chunk, e.g. by `tools.email.message.iter_message`,
+        so large attachments are streamed from disk instead of held in memory.
+        `make_chunks` is called again if the send has to be retried.
+        Returns:
+            Dict[str, Tuple[int, bytes]]: Recipients the server refused, if only some were refused.
+        """
+
+        return await self._run(lambda conn: self._transmit_stream(conn, make_chunks, from_addr, to_addrs))
+
+    def _transmit_batch(
+        self,
+        conn: smtplib.SMTP,
+        envelopes: List[Envelope],
+        results: List[Optional[str]],
+        interval: float,
+    ) -> None:
+        """
+        Sends every envelope whose result is still pending over one connection.
+        When the server advertises PIPELINING, the envelope commands of a message
+        are sent in one write together with the previous message's end-of-data,
+        so each message costs a single round-trip before its body is streamed.
+        Results are filled in as replies arrive: None for delivered, otherwise
+        the error text.
+        """
+
+        conn.ehlo_or_helo_if_needed()
+        pipelining = conn.has_extn("pipelining")
+        awaiting_end: Optional[int] = None
+        last_started = 0.0
+
+        def read_end(index: int) -> None:
+            code, resp = conn.getreply()
+            results[index] = None if code == 250 else f"{code} {resp.decode(errors='ignore')}"
+            if code == 250:
+                self._count("sent")
+
+        for i, (from_addr, to_addrs, make_chunks) in enumerate(envelopes):
+            if results[i] is not _PENDING:
+                continue
+
+            wait = last_started + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            last_started = time.monotonic()
+
+            commands = [f"MAIL FROM:{smtplib.quoteaddr(from_addr)}"]
+            commands += [f"RCPT TO:{smtplib.quoteaddr(rcpt)}" for rcpt in to_addrs]
+            commands.append("DATA")
+
+            if pipelining:
+                conn.send("".join(c + "\r\n" for c in commands).encode())
+                if awaiting_end is not None:
+                    read_end(awaiting_end)
+                    awaiting_end = None
+                replies = [conn.getreply() for _ in commands]
+            else:
+                replies = []
+                for command in commands:
+                    conn.putcmd(command)
+                    replies.append(conn.getreply())
+                    if replies[-1][0] >= 400 and command != "DATA":
+                        break
+
+            code, resp = replies[-1]
+            if len(replies) < len(commands) or code != 354:
+                failed = next((r for r in replies if r[0] >= 400), replies[-1])
+                results[i] = f"{failed[0]} {failed[1].decode(errors='ignore')}"
+                conn.rset()
+                continue
+
+            self._write_data(conn, make_chunks)
+
+            if pipelining:
+                awaiting_end = i
+            else:
+                read_end(i)
+
+        if awaiting_end is not None:
+            read_end(awaiting_end)
+
+    def _send_batch_blocking(self, envelopes: List[Envelope], interval: float) -> List[Optional[str]]:
+        results: List[Optional[str]] = [_PENDING] * len(envelopes)
+        conn = self._checkout()
+
+        for attempt in range(2):
+            try:
+                self._transmit_batch(conn, envelopes, results, interval)
+                break
+            except _STALE_ERRORS:
+                self._close(conn)
+                if attempt:
+                    raise
+                # Resume with the first message the server had not confirmed
+                self._count("reconnects")
+                logger.warning("SMTP connection dropped during batch, reconnecting")
+                conn = self._connect()
+            except Exception:
+                self._close(conn)
+                raise
+
+        self._checkin(conn)
+        return results
+
+    async def send_batch(self, envelopes: List[Envelope], rate_per_minute: float = 0) -> List[Optional[str]]:
+        """
+        Sends many messages over a single authenticated connection.
+        Args:
+            envelopes (List[Envelope]): (from_addr, to_addrs, make_chunks) per message,
+                with `make_chunks` as in `send_stream`.
+            rate_per_minute (float, optional): Maximum messages started per minute.
+                0 disables rate limiting.
+        Returns:
+            List[Optional[str]]: For each envelope, None if it was accepted or the
+            server's error reply.
+        """
+
+        interval = 60 / rate_per_minute if rate_per_minute > 0 else 0
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._send_batch_blocking, envelopes, interval)
+        except Exception:
+            self._count("failures")
+            raise
+
+    async def _run(self, action: Callable[[smtplib.SMTP], T]) -> T:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._with_connection, action)
+        except Exception:
+            self._count("failures")
+            raise
+
+    def reap_idle(self) -> None:
+        """
+        Closes idle connections that have outlived `idle_timeout`.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            expired = [c for c, t in self._idle if now - t > self.idle_timeout]
+            self._idle = deque((c, t) for c, t in self._idle if now - t <= self.idle_timeout)
+        for conn in expired:
+            self._close(conn)
+
+    async def _reap_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1))
+            try:
+                # QUIT is a network round trip, so closing runs on the pool's threads
+                await loop.run_in_executor(self._executor, self.reap_idle)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Closing idle SMTP connections failed")
+
+    def start(self) -> None:
+        """
+        Starts closing idle connections on the running event loop if that is not already happening.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+
+        loop = asyncio.get_running_loop()
+        for conn, _ in idle:
+            await loop.run_in_executor(self._executor, self._close, conn)
+
+
+_pool: Optional[SMTPPool] = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    """
+    Returns the shared Gmail SMTP pool, creating it on first use.
+    Host and port can be overridden with SMTP_HOST and SMTP_PORT.
+    """
+
+    global _pool
+    if _pool is None:
+        _pool = SMTPPool(
+            SMTP_HOST,
+            SMTP_PORT,
+            os.getenv("GMAIL_USER"),
+            os.getenv("GMAIL_APP_PASSWORD"),
+        )
+    return _pool
+
+
+def set_smtp_pool(pool: SMTPPool) -> None:
+    """
+    Replaces the shared pool, e.g. with one pointed at a `LocalSMTPServer`.
+    """
+
+    global _pool
+    _pool = pool
@@ -0,0 +1,150 @@
+import asyncio
+import base64
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("JARVIS.Email.SMTPStub")
+
+# A client that sends nothing more for this long is taken to be waiting on its replies
+PIPELINE_WINDOW = 0.002
+
+
+class LocalSMTPServer:
+    """
+    Minimal in-process SMTP server standing in for Gmail in tests and benchmarks.
+    Speaks enough of the protocol for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN
+    (any credentials are accepted), MAIL, RCPT, DATA, RSET, NOOP and QUIT.
+    STARTTLS is not offered, so point the pool at it with `starttls=False`.
+    PIPELINING is advertised. Accepted messages are kept in `messages` and
+    recipients listed in `reject` are refused with 550. Replies are held until
+    the client pauses for `PIPELINE_WINDOW` and then sent together after
+    `latency` seconds, so each client round-trip costs one simulated RTT.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        reject: Optional[List[str]] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.reject = {r.lower() for r in reject or []}
+        self.messages: List[Dict[str, object]] = []
+        self.connections = 0
+        self.logins = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._pending: Dict[asyncio.StreamWriter, List[str]] = {}
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _reply(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, line: str) -> None:
+        self._pending.setdefault(writer, []).append(line + "\r\n")
+
+    async def _flush(self, writer: asyncio.StreamWriter) -> None:
+        pending = self._pending.pop(writer, None)
+        if pending:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            writer.write("".join(pending).encode())
+            await writer.drain()
+
+    async def _readline(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bytes:
+        # Only answer once the client has stopped sending, i.e. it is waiting on us
+        if self._pending.get(writer):
+            try:
+                return await asyncio.wait_for(reader.readline(), PIPELINE_WINDOW)
+            except asyncio.TimeoutError:
+                await self._flush(writer)
+        return await reader.readline()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        sender = None
+        recipients: List[str] = []
+
+        try:
+            await self._reply(reader, writer, "220 localhost CortexOS SMTP stand-in")
+
+            while True:
+                raw = await self._readline(reader, writer)
+                if not raw:
+                    break
+
+                line = raw.decode(errors="ignore").rstrip("\r\n")
+                verb = line.split(" ", 1)[0].upper()
+                arg = line[len(verb):].strip()
+
+                if verb == "EHLO":
+                    await self._reply(reader, writer, "250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250-PIPELINING\r\n250 8BITMIME")
+                elif verb == "HELO":
+                    await self._reply(reader, writer, "250 localhost")
+                elif verb == "AUTH":
+                    mechanism = arg.split(" ", 1)[0].upper()
+                    if mechanism == "LOGIN":
+                        await self._reply(reader, writer, "334 " + base64.b64encode(b"Username:").decode())
+                        await self._readline(reader, writer)
+                        await self._reply(reader, writer, "334 " + base64.b64encode(b"Password:").decode())
+                        await self._readline(reader, writer)
+                    elif mechanism == "PLAIN" and " " not in arg:
+                        await self._reply(reader, writer, "334 ")
+                        await self._readline(reader, writer)
+                    self.logins += 1
+                    await self._reply(reader, writer, "235 Authentication successful")
+                elif verb == "MAIL":
+                    sender = arg.split(":", 1)[-1].strip().split(" ")[0].strip("<>")
+                    recipients = []
+                    await self._reply(reader, writer, "250 OK")
+                elif verb == "RCPT":
+                    rcpt = arg.split(":", 1)[-1].strip().strip("<>")
+                    if rcpt.lower() in self.reject:
+                        await self._reply(reader, writer, "550 No such user")
+                    else:
+                        recipients.append(rcpt)
+                        await self._reply(reader, writer, "250 OK")
+                elif verb == "DATA" and not recipients:
+                    await self._reply(reader, writer, "554 No valid recipients")
+                elif verb == "DATA":
+                    await self._reply(reader, writer, "354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = await self._readline(reader, writer)
+                        if not data_line or data_line == b".\r\n":
+                            break
+                        lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    self.messages.append({
+                        "from": sender,
+                        "to": list(recipients),
+                        "data": b"".join(lines),
+                    })
+                    await self._reply(reader, writer, "250 OK queued")
+                elif verb == "RSET":
+                    sender, recipients = None, []
+                    await self._reply(reader, writer, "250 OK")
+                elif verb == "NOOP":
+                    await self._reply(reader, writer, "250 OK")
+                elif verb == "QUIT":
+                    await self._reply(reader, writer, "221 Bye")
+                    await self._flush(writer)
+                    break
+                else:
+                    await self._reply(reader, writer, "502 Command not implemented")
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception:
+            logger.exception("SMTP stand-in session failed")
+        finally:
+            self._pending.pop(writer, None)
+            writer.close()
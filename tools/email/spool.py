@@ -0,0 +1,490 @@
+import asyncio
+import json
+import logging
+import smtplib
+import sqlite3
+import threading
+import time
+from email.utils import make_msgid
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.paths import DATA_DIR
+from tools.email.message import iter_message
+from tools.email.smtp_pool import get_smtp_pool
+
+logger = logging.getLogger("JARVIS.Email.Spool")
+
+SPOOL_DB = DATA_DIR / "email_spool.db"
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5
+BACKOFF_MAX = 900
+POLL_INTERVAL = 30
+# A message claimed by a worker that has not finished within this window is
+# assumed to belong to a crashed process and becomes deliverable again
+LEASE_SECONDS = 600
+# Due messages of one bulk batch are sent together over one connection, up to this many at a time
+BATCH_CLAIM = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message_id TEXT NOT NULL,
+    from_addr TEXT NOT NULL,
+    to_addrs TEXT NOT NULL,
+    cc_addrs TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attachments TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    sent_at REAL,
+    last_error TEXT,
+    batch_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_batch ON outbox (batch_id, status);
+"""
+
+
+def _is_permanent(error: Exception) -> bool:
+    """
+    Decides whether a delivery error is worth retrying.
+    Rejected recipients, 5xx replies and missing attachments will not fix
+    themselves; authentication failures are retried so a corrected password
+    still delivers the backlog.
+    """
+
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, FileNotFoundError, IsADirectoryError)):
+        return True
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class EmailSpool:
+    """
+    Disk-backed outbound email queue with a background delivery worker.
+    Messages are written to SQLite before the caller returns, so they survive
+    restarts. The worker delivers due messages one at a time through the shared
+    SMTP pool, retrying transient failures with exponential backoff. Messages
+    queued together as a batch are claimed together and pipelined over one
+    connection. Several worker processes can share one spool; each message is
+    claimed atomically.
+    """
+
+    def __init__(self, path=SPOOL_DB):
+        self.path = str(path)
+        self._local = threading.local()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {"delivered": 0, "retries": 0, "failed": 0}
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _insert_row(
+        conn: sqlite3.Connection,
+        from_addr: str,
+        to_addrs: List[str],
+        cc_addrs: List[str],
+        subject: str,
+        body: str,
+        attachments: List[str],
+        send_at: Optional[float] = None,
+        batch_id: Optional[int] = None,
+    ) -> int:
+        now = time.time()
+        cursor = conn.execute(
+            "INSERT INTO outbox (message_id, from_addr, to_addrs, cc_addrs, subject, body, "
+            "attachments, created_at, next_attempt_at, batch_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                make_msgid(domain=from_addr.rpartition("@")[2] or None),
+                from_addr,
+                json.dumps(to_addrs),
+                json.dumps(cc_addrs),
+                subject,
+                body,
+                json.dumps(attachments),
+                now,
+                max(send_at or now, now),
+                batch_id,
+            ),
+        )
+        return cursor.lastrowid
+
+    def _insert(
+        self,
+        from_addr: str,
+        to_addrs: List[str],
+        cc_addrs: List[str],
+        subject: str,
+        body: str,
+        attachments: List[str],
+    ) -> int:
+        with self._connect() as conn:
+            return self._insert_row(conn, from_addr, to_addrs, cc_addrs, subject, body, attachments)
+
+    def _insert_batch(
+        self,
+        from_addr: str,
+        messages: List[Tuple[str, str, str]],
+        attachments: List[str],
+        interval: float,
+    ) -> int:
+        start = time.time()
+        with self._connect() as conn:
+            batch_id = conn.execute("SELECT COALESCE(MAX(batch_id), 0) + 1 FROM outbox").fetchone()[0]
+            for i, (to_addr, subject, body) in enumerate(messages):
+                self._insert_row(
+                    conn, from_addr, [to_addr], [], subject, body, attachments, start + i * interval, batch_id
+                )
+        return batch_id
+
+    async def enqueue(
+        self,
+        from_addr: str,
+        to_addrs: List[str],
+        subject: str,
+        body: str,
+        cc_addrs: Optional[List[str]] = None,
+        attachments: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Stores a message for delivery and wakes the worker.
+        Attachments are stored as paths and read from disk at delivery time.
+        Returns:
+            int: The spool id of the queued message.
+        """
+
+        spool_id = await asyncio.to_thread(
+            self._insert, from_addr, to_addrs, cc_addrs or [], subject, body, attachments or []
+        )
+        logger.info(f"Queued email {spool_id} to {', '.join(to_addrs)}")
+
+        self.start()
+        self._wakeup.set()
+        return spool_id
+
+    async def enqueue_batch(
+        self,
+        from_addr: str,
+        messages: List[Tuple[str, str, str]],
+        attachments: Optional[List[str]] = None,
+        rate_per_minute: float = 0,
+    ) -> int:
+        """
+        Stores one (to_addr, subject, body) message per recipient as a batch in a
+        single transaction and wakes the worker. Send times are spaced to honour
+        `rate_per_minute` (0 sends them all at once); messages that fall due
+        together are pipelined over one connection.
+        Returns:
+            int: The batch id, for `batch_status`.
+        """
+
+        interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        batch_id = await asyncio.to_thread(self._insert_batch, from_addr, messages, attachments or [], interval)
+        logger.info(f"Queued batch {batch_id} of {len(messages)} emails")
+
+        self.start()
+        self._wakeup.set()
+        return batch_id
+
+    def _claim_next(self) -> List[sqlite3.Row]:
+        """
+        Claims the next due message, together with the other due messages of its batch.
+        """
+
+        now = time.time()
+        conn = self._connect()
+
+        with conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'pending' WHERE status = 'sending' AND claimed_at < ?",
+                (now - LEASE_SECONDS,),
+            )
+
+            row = conn.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT 1",
+                (now,),
+            ).fetchone()
+
+            if row is None:
+                return []
+
+            ids = [row["id"]]
+            if row["batch_id"] is not None:
+                ids = [
+                    r[0] for r in conn.execute(
+                        "SELECT id FROM outbox WHERE batch_id = ? AND status = 'pending' AND next_attempt_at <= ? "
+                        "ORDER BY next_attempt_at LIMIT ?",
+                        (row["batch_id"], now, BATCH_CLAIM),
+                    )
+                ]
+
+            marks = ", ".join("?" * len(ids))
+            conn.execute(
+                "UPDATE outbox SET status = 'sending', claimed_at = ?, attempts = attempts + 1 "
+                f"WHERE id IN ({marks}) AND status = 'pending'",
+                (now, *ids),
+            )
+
+        # Rows another process claimed first are not returned; the caller simply asks again
+        return conn.execute(
+            f"SELECT * FROM outbox WHERE id IN ({marks}) AND status = 'sending' AND claimed_at = ? ORDER BY id",
+            (*ids, now),
+        ).fetchall()
+
+    def _seconds_until_due(self) -> float:
+        row = self._connect().execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+        ).fetchone()
+
+        if row[0] is None:
+            return POLL_INTERVAL
+        return min(max(row[0] - time.time(), 0.05), POLL_INTERVAL)
+
+    def _finish(self, spool_id: int, status: str, error: Optional[str] = None, retry_at: Optional[float] = None) -> None:
+        with self._connect() as conn:
+            if status == "sent":
+                conn.execute(
+                    "UPDATE outbox SET status = 'sent', sent_at = ?, last_error = ? WHERE id = ?",
+                    (time.time(), error, spool_id),
+                )
+            elif status == "pending":
+                conn.execute(
+                    "UPDATE outbox SET status = 'pending', next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (retry_at, error, spool_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE outbox SET status = 'failed', last_error = ? WHERE id = ?",
+                    (error, spool_id),
+                )
+
+    @staticmethod
+    def _make_chunks(row: sqlite3.Row):
+        def make_chunks():
+            return iter_message(
+                row["from_addr"],
+                json.loads(row["to_addrs"]),
+                row["subject"],
+                row["body"],
+                cc_addrs=json.loads(row["cc_addrs"]),
+                attachments=json.loads(row["attachments"]),
+                message_id=row["message_id"],
+            )
+
+        return make_chunks
+
+    @staticmethod
+    def _recipients(row: sqlite3.Row) -> List[str]:
+        return json.loads(row["to_addrs"]) + json.loads(row["cc_addrs"])
+
+    async def _record_failure(self, row: sqlite3.Row, e: Exception) -> None:
+        error = f"{type(e).__name__}: {e}"
+
+        if _is_permanent(e) or row["attempts"] >= MAX_ATTEMPTS:
+            self.stats["failed"] += 1
+            logger.error(f"Email {row['id']} failed permanently after {row['attempts']} attempts: {error}")
+            await asyncio.to_thread(self._finish, row["id"], "failed", error)
+            return
+
+        delay = min(BACKOFF_BASE * 2 ** (row["attempts"] - 1), BACKOFF_MAX)
+        self.stats["retries"] += 1
+        logger.warning(f"Email {row['id']} attempt {row['attempts']} failed, retrying in {delay}s: {error}")
+        await asyncio.to_thread(self._finish, row["id"], "pending", error, time.time() + delay)
+
+    async def _record_sent(self, row: sqlite3.Row, note: Optional[str] = None) -> None:
+        self.stats["delivered"] += 1
+        logger.info(f"Delivered email {row['id']} after {time.time() - row['created_at']:.2f}s")
+        await asyncio.to_thread(self._finish, row["id"], "sent", note)
+
+    async def _deliver(self, row: sqlite3.Row) -> None:
+        try:
+            refused = await get_smtp_pool().send_stream(self._make_chunks(row), row["from_addr"], self._recipients(row))
+        except Exception as e:
+            await self._record_failure(row, e)
+            return
+
+        await self._record_sent(row, f"Refused recipients: {', '.join(refused)}" if refused else None)
+
+    async def _deliver_batch(self, rows: List[sqlite3.Row]) -> None:
+        envelopes = [(row["from_addr"], self._recipients(row), self._make_chunks(row)) for row in rows]
+        try:
+            results = await get_smtp_pool().send_batch(envelopes)
+        except Exception as e:
+            for row in rows:
+                await self._record_failure(row, e)
+            return
+
+        for row, error in zip(rows, results):
+            if error is None:
+                await self._record_sent(row)
+                continue
+            code, _, text = error.partition(" ")
+            await self._record_failure(
+                row, smtplib.SMTPResponseException(int(code) if code.isdigit() else 451, text.encode())
+            )
+
+    async def _run(self) -> None:
+        logger.info("Email spool worker started")
+
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._claim_next)
+
+                if rows:
+                    if rows[0]["batch_id"] is None:
+                        await self._deliver(rows[0])
+                    else:
+                        await self._deliver_batch(rows)
+                    continue
+
+                self._wakeup.clear()
+                delay = await asyncio.to_thread(self._seconds_until_due)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email spool worker error")
+                await asyncio.sleep(POLL_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Starts the delivery worker on the running event loop if it is not already running.
+        """
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _metrics(self) -> Dict[str, Any]:
+        conn = self._connect()
+
+        counts = {
+            row["status"]: row["n"]
+            for row in conn.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status")
+        }
+
+        latencies = sorted(
+            row[0]
+            for row in conn.execute(
+                "SELECT sent_at - created_at FROM outbox WHERE status = 'sent' "
+                "ORDER BY sent_at DESC LIMIT 200"
+            )
+        )
+
+        retried = conn.execute(
+            "SELECT COALESCE(SUM(attempts - 1), 0) FROM outbox WHERE attempts > 1"
+        ).fetchone()[0]
+
+        oldest = conn.execute(
+            "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'sending')"
+        ).fetchone()[0]
+
+        return {
+            "queue_depth": counts.get("pending", 0) + counts.get("sending", 0),
+            "sent": counts.get("sent", 0),
+            "failed": counts.get("failed", 0),
+            "retries": retried,
+            "oldest_queued_age": round(time.time() - oldest, 1) if oldest else 0.0,
+            "latency_avg": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "latency_p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None,
+            "worker": dict(self.stats),
+        }
+
+    async def metrics(self) -> Dict[str, Any]:
+        """
+        Returns queue depth, delivery latency (seconds, over the last 200 sent
+        messages), retry and failure counts for the spool.
+        """
+
+        return await asyncio.to_thread(self._metrics)
+
+    def _recent_failures(self, limit: int) -> List[sqlite3.Row]:
+        return self._connect().execute(
+            "SELECT id, to_addrs, subject, last_error FROM outbox WHERE status = 'failed' "
+            "ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+    async def recent_failures(self, limit: int = 5) -> List[Dict[str, Any]]:
+        rows = await asyncio.to_thread(self._recent_failures, limit)
+        return [
+            {
+                "id": row["id"],
+                "to": json.loads(row["to_addrs"]),
+                "subject": row["subject"],
+                "error": row["last_error"],
+            }
+            for row in rows
+        ]
+
+
+    def _batch_status(self, batch_id: int) -> List[sqlite3.Row]:
+        return self._connect().execute(
+            "SELECT to_addrs, status, attempts, next_attempt_at, last_error FROM outbox "
+            "WHERE batch_id = ? ORDER BY id",
+            (batch_id,),
+        ).fetchall()
+
+    async def batch_status(self, batch_id: int) -> List[Dict[str, Any]]:
+        """
+        Returns the delivery status of every message in a batch, in the order queued.
+        """
+
+        rows = await asyncio.to_thread(self._batch_status, batch_id)
+        return [
+            {
+                "to": json.loads(row["to_addrs"]),
+                "status": row["status"],
+                "attempts": row["attempts"],
+                "next_attempt_at": row["next_attempt_at"],
+                "error": row["last_error"],
+            }
+            for row in rows
+        ]
+
+
+_spool: Optional[EmailSpool] = None
+
+
+def get_email_spool() -> EmailSpool:
+    """
+    Returns the shared email spool, creating it on first use.
+    """
+
+    global _spool
+    if _spool is None:
+        _spool = EmailSpool()
+    return _spool
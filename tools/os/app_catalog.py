@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import os
+import re
+import shlex
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("JARVIS.OS.AppCatalog")
+
+APPLICATION_DIRS = [
+    "/Applications",
+    "/Applications/Utilities",
+    "/System/Applications",
+    "/System/Applications/Utilities",
+    str(Path.home() / "Applications"),
+]
+
+# Seconds between checks of the watched folders for installed or removed apps
+WATCH_INTERVAL = 5
+# Launchers whose name says nothing about the app they start
+GENERIC_COMMANDS = {"env", "sh", "bash", "flatpak", "snap", "gtk-launch", "python", "python3", "java", "wine"}
+
+_FIELD_CODE_RE = re.compile(r"%[a-zA-Z%]")
+# Field codes that stand for a whole argument and are dropped when launching without files
+_ARGUMENT_CODES = {"%f", "%F", "%u", "%U", "%d", "%D", "%n", "%N", "%i", "%v", "%m"}
+_ESCAPES = {"s": " ", "n": "\n", "t": "\t", "r": "\r", "\\": "\\"}
+_ESCAPE_RE = re.compile(r"\\(.)")
+
+
+class App(NamedTuple):
+    name: str
+    # Other names the app is known by: generic name, desktop id, binary and window class
+    aliases: Tuple[str, ...]
+    keywords: Tuple[str, ...]
+    # Command line to launch the app with no files, empty for macOS bundles
+    exec: Tuple[str, ...]
+    # The .app bundle or .desktop file
+    path: str
+    # Desktop file id such as "org.gnome.Nautilus", empty for macOS bundles
+    desktop_id: str = ""
+    wm_class: str = ""
+
+
+def xdg_application_dirs() -> List[str]:
+    """
+    Returns the XDG `applications` folders in precedence order: the user's
+    own entries first, so they override system ones with the same id.
+    """
+
+    data_home = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [data_home] + [d for d in data_dirs.split(":") if d]
+    # Flatpak and snap export their entries here, not always listed in XDG_DATA_DIRS
+    dirs += [
+        str(Path(data_home) / "flatpak" / "exports" / "share"),
+        "/var/lib/flatpak/exports/share",
+        "/var/lib/snapd/desktop",
+    ]
+
+    seen, result = set(), []
+    for d in dirs:
+        path = os.path.join(d, "applications")
+        if path not in seen:
+            seen.add(path)
+            result.append(path)
+    return result
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def normalize(name: str) -> str:
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", name.lower()).split())
+
+
+def _unescape(value: str) -> str:
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(0)), value)
+
+
+def parse_exec(value: str, name: str = "", path: str = "") -> Tuple[str, ...]:
+    """
+    Splits a desktop entry Exec line into an argv for launching the app with
+    no files: file and URL field codes are dropped and %c, %k and %% expanded.
+    """
+
+    try:
+        args = shlex.split(value)
+    except ValueError:
+        return ()
+
+    expand = {"%%": "%", "%c": name, "%k": path}
+    argv = []
+    for arg in args:
+        if arg in _ARGUMENT_CODES:
+            continue
+        argv.append(_FIELD_CODE_RE.sub(lambda m: expand.get(m.group(0), ""), arg))
+    return tuple(argv)
+
+
+def parse_desktop_file(path: str) -> Optional[Dict[str, str]]:
+    """
+    Reads the [Desktop Entry] group of a .desktop file. Localized keys are skipped.
+    """
+
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    entry: Dict[str, str] = {}
+    in_group = False
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("["):
+            if in_group:
+                break
+            in_group = line == "[Desktop Entry]"
+            continue
+        if in_group and "=" in line:
+            key, value = line.split("=", 1)
+            key = key.strip()
+            if "[" not in key:
+                entry[key] = _unescape(value.strip())
+    return entry or None
+
+
+def _split_list(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in value.split(";") if item.strip())
+
+
+def _desktop_app(path: str, desktop_id: str, entry: Dict[str, str]) -> Optional[App]:
+    name = entry.get("Name", "").strip()
+    if not name or entry.get("Type", "Application") != "Application":
+        return None
+
+    try_exec = entry.get("TryExec")
+    if try_exec and shutil.which(try_exec) is None:
+        return None
+
+    argv = parse_exec(entry.get("Exec", ""), name, path)
+    wm_class = entry.get("StartupWMClass", "")
+
+    aliases = []
+    generic = entry.get("GenericName", "").strip()
+    if generic:
+        aliases.append(generic)
+    stem = desktop_id[:-len(".desktop")] if desktop_id.endswith(".desktop") else desktop_id
+    aliases.append(stem)
+    # "org.gnome.Nautilus" is also known as "Nautilus"
+    if "." in stem:
+        aliases.append(stem.rsplit(".", 1)[-1])
+    if argv:
+        binary = os.path.basename(argv[0])
+        if binary not in GENERIC_COMMANDS:
+            aliases.append(binary)
+    if wm_class:
+        aliases.append(wm_class)
+
+    seen = {normalize(name)}
+    unique = []
+    for alias in aliases:
+        key = normalize(alias)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(alias)
+
+    return App(
+        name=name,
+        aliases=tuple(unique),
+        keywords=_split_list(entry.get("Keywords", "")),
+        exec=argv,
+        path=path,
+        desktop_id=stem,
+        wm_class=wm_class,
+    )
+
+
+class AppCatalog:
+    """
+    In-memory catalog of installed applications: macOS .app bundles and
+    Linux desktop entries from the XDG data folders. It is built once and
+    rebuilt off the request path whenever one of the watched folders
+    changes, so lookups never touch the filesystem. Installs and removals
+    add or delete entries and so change a folder's mtime, which is all the
+    watcher compares.
+    """
+
+    def __init__(self):
+        self.apps: Tuple[App, ...] = ()
+        self.built_at: Optional[float] = None
+        self.generation = 0
+        self._by_key: Dict[str, App] = {}
+        self._signature: Tuple[Tuple[str, Optional[int]], ...] = ()
+        self._build_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _scan(self) -> Tuple[List[App], List[Tuple[str, Optional[int]]]]:
+        apps: List[App] = []
+        # Each folder's mtime is taken before it is listed, so a change during the scan triggers another
+        watched: List[Tuple[str, Optional[int]]] = []
+
+        for directory in APPLICATION_DIRS:
+            watched.append((directory, _mtime(directory)))
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for item in names:
+                if item.endswith(".app"):
+                    apps.append(App(item[:-len(".app")], (), (), (), os.path.join(directory, item)))
+
+        # An id found in an earlier folder hides the same id further down, even if that entry is hidden
+        claimed = set()
+        for root in xdg_application_dirs():
+            stack = [root]
+            while stack:
+                directory = stack.pop()
+                watched.append((directory, _mtime(directory)))
+                try:
+                    entries = list(os.scandir(directory))
+                except OSError:
+                    continue
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    if not entry.name.endswith(".desktop"):
+                        continue
+                    # Entries in subfolders get ids like "kde4-konsole.desktop"
+                    desktop_id = os.path.relpath(entry.path, root).replace(os.sep, "-")
+                    if desktop_id in claimed:
+                        continue
+                    claimed.add(desktop_id)
+
+                    fields = parse_desktop_file(entry.path)
+                    if not fields or fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+                        continue
+                    app = _desktop_app(entry.path, desktop_id, fields)
+                    if app is not None:
+                        apps.append(app)
+
+        return apps, watched
+
+    def build(self) -> int:
+        """
+        Rescans the application folders and swaps in the new catalog. Blocking.
+        Returns:
+            int: The number of applications found.
+        """
+
+        with self._build_lock:
+            started = time.perf_counter()
+            apps, watched = self._scan()
+
+            apps.sort(key=lambda app: app.name.lower())
+            by_key: Dict[str, App] = {}
+            # Real names win over aliases of other apps
+            for app in apps:
+                by_key.setdefault(normalize(app.name), app)
+            for app in apps:
+                for alias in app.aliases:
+                    by_key.setdefault(normalize(alias), app)
+
+            self.apps = tuple(apps)
+            self._by_key = by_key
+            self._signature = tuple(watched)
+            self.built_at = time.time()
+            self.generation += 1
+
+            logger.info(f"Application catalog built with {len(apps)} apps in {time.perf_counter() - started:.3f}s")
+            return len(apps)
+
+    def changed(self) -> bool:
+        return self.built_at is None or any(_mtime(folder) != mtime for folder, mtime in self._signature)
+
+    def refresh(self) -> bool:
+        """
+        Rebuilds the catalog if a watched folder changed. Blocking.
+        Returns:
+            bool: Whether the catalog was rebuilt.
+        """
+
+        if not self.changed():
+            return False
+        self.build()
+        return True
+
+    def is_built(self) -> bool:
+        return self.built_at is not None
+
+    def ensure_built(self) -> None:
+        if self.built_at is None:
+            self.build()
+
+    def get(self, name: str) -> Optional[App]:
+        """
+        Returns the app whose name or alias matches `name` exactly, ignoring case and punctuation.
+        """
+
+        return self._by_key.get(normalize(name))
+
+    def names(self) -> List[str]:
+        return [app.name for app in self.apps]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Application catalog refresh failed")
+            await asyncio.sleep(WATCH_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Builds the catalog and starts watching for installed or removed apps
+        on the running event loop if that is not already happening.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_catalog: Optional[AppCatalog] = None
+
+
+def get_app_catalog() -> AppCatalog:
+    """
+    Returns the shared application catalog, creating it on first use.
+    """
+
+    global _catalog
+    if _catalog is None:
+        _catalog = AppCatalog()
+    return _catalog
@@ -1,43 +1,138 @@
+import asyncio
 import logging
-import subprocess
 import os
-from pathlib import Path
-from difflib import get_close_matches
+import platform
+import shutil
+import subprocess
+from typing import List, Optional, Tuple
+
+import psutil
 from livekit.agents import function_tool, RunContext
 
-logger = logging.getLogger("JARVIS.OS.Apps")
+from tools.os.app_catalog import GENERIC_COMMANDS, App, get_app_catalog
+from tools.os.app_matcher import MIN_SCORE, QUIT_MIN_SCORE, get_app_matcher
 
-APPLICATION_DIRS = [
-    "/Applications",
-    "/System/Applications",
-    str(Path.home() / "Applications")
-]
+logger = logging.getLogger("JARVIS.OS.Apps")
 
 
 def _run_applescript(script: str):
     return subprocess.check_output(["osascript", "-e", script], text=True)
 
 
-def _list_installed_apps():
-    apps = []
-    for directory in APPLICATION_DIRS:
-        if os.path.exists(directory):
-            for item in os.listdir(directory):
-                if item.endswith(".app"):
-                    apps.append(item.replace(".app", ""))
-    return apps
+async def _resolve_app(name: str, min_score: float = MIN_SCORE) -> Tuple[Optional[App], List[App]]:
+    """
+    Returns the app `name` refers to, or None and the close candidates
+    when several apps match about equally well.
+    """
+
+    catalog = get_app_catalog()
+    if not catalog.is_built():
+        await asyncio.to_thread(catalog.ensure_built)
+
+    app = catalog.get(name)
+    if app is not None:
+        return app, []
+
+    matcher = get_app_matcher()
+    if matcher.generation != catalog.generation:
+        await asyncio.to_thread(matcher.sync, catalog)
+    return matcher.resolve(name, min_score)
+
+
+async def _record_use(name: str) -> None:
+    # Apps opened often win close calls in later lookups
+    app = get_app_catalog().get(name)
+    if app is None:
+        return
+    try:
+        await asyncio.to_thread(get_app_matcher().record_use, app)
+    except Exception:
+        logger.exception(f"Could not record use of {name}")
+
+
+async def _resolve_app_name(name: str, min_score: float = MIN_SCORE) -> Tuple[str, List[App]]:
+    app, candidates = await _resolve_app(name, min_score)
+    return (app.name if app is not None else name), candidates
+
 
+def _not_found(name: str, candidates: List[App]) -> str:
+    if not candidates:
+        return f"Could not find an application called {name}"
+    names = [app.name for app in candidates]
+    return f"'{name}' could mean {', '.join(names[:-1])} or {names[-1]}. Which one?"
 
-def _resolve_app_name(name: str) -> str:
-    installed = _list_installed_apps()
-    match = get_close_matches(name, installed, n=1, cutoff=0.6)
-    return match[0] if match else name
+
+def _launch(app: App) -> None:
+    if app.exec:
+        argv = list(app.exec)
+    elif app.desktop_id and shutil.which("gtk-launch"):
+        argv = ["gtk-launch", app.desktop_id]
+    else:
+        raise RuntimeError(f"{app.path} has no command to run")
+
+    # Detached from the agent so the app outlives it and its output does not reach our logs
+    subprocess.Popen(
+        argv,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=os.path.expanduser("~"),
+        start_new_session=True,
+    )
+
+
+def _app_processes(app: App) -> List[psutil.Process]:
+    if not app.exec:
+        return []
+    binary = os.path.basename(app.exec[0])
+    if binary in GENERIC_COMMANDS:
+        return []
+
+    uid = os.getuid()
+    found = []
+    for proc in psutil.process_iter(["name", "exe", "uids"]):
+        info = proc.info
+        if info["uids"] is None or info["uids"].real != uid:
+            continue
+        if info["name"] == binary or os.path.basename(info["exe"] or "") == binary:
+            found.append(proc)
+    return found
+
+
+def _quit_linux(app: App) -> bool:
+    if app.exec and os.path.basename(app.exec[0]) == "flatpak" and app.desktop_id:
+        return subprocess.run(["flatpak", "kill", app.desktop_id], capture_output=True).returncode == 0
+
+    processes = _app_processes(app)
+    for proc in processes:
+        try:
+            proc.terminate()
+        except psutil.Error:
+            continue
+    return bool(processes)
+
+
+def _focus_linux(app: App) -> bool:
+    """
+    Raises an open window of the app with wmctrl or xdotool.
+    Returns False when neither is installed or no window matched.
+    """
+
+    window_class = app.wm_class or (os.path.basename(app.exec[0]) if app.exec else "")
+    if shutil.which("wmctrl"):
+        if window_class and subprocess.run(["wmctrl", "-x", "-a", window_class], capture_output=True).returncode == 0:
+            return True
+        return subprocess.run(["wmctrl", "-a", app.name], capture_output=True).returncode == 0
+    if shutil.which("xdotool") and window_class:
+        command = ["xdotool", "search", "--onlyvisible", "--class", window_class, "windowactivate"]
+        return subprocess.run(command, capture_output=True).returncode == 0
+    return False
 
 
 @function_tool()
 async def open_app(context: RunContext, app_name: str) -> str:
     """
-    Asynchronously opens a specified application on macOS using AppleScript.
+    Asynchronously opens a specified application.
     Args:
         context (RunContext): The runtime context in which the function is executed.
         app_name (str): The name of the application to open.
@@ -47,15 +142,27 @@ async def open_app(context: RunContext, app_name: str) -> str:
     Raises:
         Exception: Logs an exception if the application cannot be opened.
     Note:
-        This function uses AppleScript to activate the application. Ensure that the
-        application name is resolvable and that the script has the necessary permissions.
+        On macOS this uses AppleScript to activate the application. On Linux the
+        command from the app's desktop entry is started, detached from the agent.
     """
 
     try:
-        resolved = _resolve_app_name(app_name)
-        logger.info(f"Opening app: {resolved}")
-        _run_applescript(f'tell application "{resolved}" to activate')
-        return f"Opened {resolved}"
+        if platform.system() == "Darwin":
+            resolved, candidates = await _resolve_app_name(app_name)
+            if candidates:
+                return _not_found(app_name, candidates)
+            logger.info(f"Opening app: {resolved}")
+            await asyncio.to_thread(_run_applescript, f'tell application "{resolved}" to activate')
+            await _record_use(resolved)
+            return f"Opened {resolved}"
+
+        app, candidates = await _resolve_app(app_name)
+        if app is None:
+            return _not_found(app_name, candidates)
+        logger.info(f"Opening app: {app.name} ({' '.join(app.exec)})")
+        _launch(app)
+        await _record_use(app.name)
+        return f"Opened {app.name}"
     except Exception:
         logger.exception(f"Failed to open app {app_name}")
         return f"Could not open application: {app_name}"
@@ -64,10 +171,11 @@ async def open_app(context: RunContext, app_name: str) -> str:
 @function_tool()
 async def quit_app(context: RunContext, app_name: str) -> str:
     """
-    Asynchronously quits a specified application on macOS.
+    Asynchronously quits a specified application.
     This function attempts to resolve the given application name, logs the action,
-    and uses AppleScript to quit the application. If the operation fails, it logs
-    the exception and returns an error message.
+    and asks the application to quit: with AppleScript on macOS, or by sending its
+    processes SIGTERM on Linux. If the operation fails, it logs the exception and
+    returns an error message.
     Args:
         context (RunContext): The runtime context in which the function is executed.
         app_name (str): The name of the application to quit.
@@ -77,10 +185,21 @@ async def quit_app(context: RunContext, app_name: str) -> str:
     """
 
     try:
-        resolved = _resolve_app_name(app_name)
-        logger.info(f"Quitting app: {resolved}")
-        _run_applescript(f'tell application "{resolved}" to quit')
-        return f"Closed {resolved}"
+        if platform.system() == "Darwin":
+            resolved, candidates = await _resolve_app_name(app_name, QUIT_MIN_SCORE)
+            if candidates:
+                return _not_found(app_name, candidates)
+            logger.info(f"Quitting app: {resolved}")
+            await asyncio.to_thread(_run_applescript, f'tell application "{resolved}" to quit')
+            return f"Closed {resolved}"
+
+        app, candidates = await _resolve_app(app_name, QUIT_MIN_SCORE)
+        if app is None:
+            return _not_found(app_name, candidates)
+        logger.info(f"Quitting app: {app.name}")
+        if not await asyncio.to_thread(_quit_linux, app):
+            return f"{app.name} is not running"
+        return f"Closed {app.name}"
     except Exception:
         logger.exception(f"Failed to quit app {app_name}")
         return f"Could not close application: {app_name}"
@@ -98,16 +217,29 @@ async def focus_app(context: RunContext, app_name: str) -> str:
     Raises:
         Exception: Logs an exception if the application cannot be focused.
     Notes:
-        - The function resolves the application name using `_resolve_app_name`.
-        - It uses AppleScript to activate the application.
-        - Ensure that the application name provided is valid and resolvable.
+        - The function resolves the application name from the application catalog.
+        - On macOS it uses AppleScript to activate the application.
+        - On Linux it raises the app's window with wmctrl or xdotool, and starts
+          the app if it has no window to raise.
     """
 
     try:
-        resolved = _resolve_app_name(app_name)
-        logger.info(f"Focusing app: {resolved}")
-        _run_applescript(f'tell application "{resolved}" to activate')
-        return f"Focused on {resolved}"
+        if platform.system() == "Darwin":
+            resolved, candidates = await _resolve_app_name(app_name)
+            if candidates:
+                return _not_found(app_name, candidates)
+            logger.info(f"Focusing app: {resolved}")
+            await asyncio.to_thread(_run_applescript, f'tell application "{resolved}" to activate')
+            return f"Focused on {resolved}"
+
+        app, candidates = await _resolve_app(app_name)
+        if app is None:
+            return _not_found(app_name, candidates)
+        logger.info(f"Focusing app: {app.name}")
+        if not await asyncio.to_thread(_focus_linux, app):
+            # Most desktop apps bring their existing window forward when started again
+            _launch(app)
+        return f"Focused on {app.name}"
     except Exception:
         logger.exception(f"Failed to focus app {app_name}")
         return f"Could not focus application: {app_name}"
@@ -128,9 +260,12 @@ async def list_apps(context: RunContext) -> str:
     """
 
     try:
-        apps = _list_installed_apps()
+        catalog = get_app_catalog()
+        if not catalog.is_built():
+            await asyncio.to_thread(catalog.ensure_built)
+        apps = sorted(set(catalog.names()), key=str.lower)
         logger.info("Fetched installed applications list")
-        return "\n".join(sorted(apps))
+        return "\n".join(apps)
     except Exception:
         logger.exception("Failed to list applications")
-        return "Could not retrieve applications."
\ No newline at end of file
+        return "Could not retrieve applications."
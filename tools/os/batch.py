@@ -0,0 +1,669 @@
+import asyncio
+import errno
+import fnmatch
+import json
+import logging
+import os
+import psutil
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from livekit.agents import function_tool, RunContext
+
+from config.paths import DATA_DIR
+from tools.os.file_index import _format_size
+from tools.os.path_resolver import describe_missing, expand_path
+
+logger = logging.getLogger("JARVIS.OS.Batch")
+
+BATCH_DB = DATA_DIR / "file_batches.db"
+# Deleted files are parked here so a batch delete can be undone
+TRASH_DIR = DATA_DIR / "batch_trash"
+TRASH_DAYS = 7
+
+ACTIONS = ("move", "copy", "delete", "rename")
+BATCH_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+MAX_SELECTION = 50_000
+# Completed operations are written back to the journal in groups
+JOURNAL_FLUSH = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    destination TEXT,
+    selector TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    pid INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS batch_ops (
+    batch_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    PRIMARY KEY (batch_id, seq)
+);
+"""
+
+RENAME_FIELDS = "{name}, {stem}, {ext}, {n}, {date}, {parent}"
+
+
+def select_files(
+    folder: Path,
+    pattern: str = "",
+    extension: str = "",
+    older_than: Optional[float] = None,
+    newer_than: Optional[float] = None,
+    min_bytes: int = 0,
+    max_bytes: int = 0,
+    recursive: bool = False,
+    exclude: Optional[Path] = None,
+) -> List[Tuple[Path, int, float]]:
+    """
+    Returns (path, size, mtime) for every regular file under `folder` that
+    matches all the given criteria, in path order. Hidden entries are skipped,
+    as is `exclude` (typically the destination folder) when it lies inside.
+    """
+
+    pattern = pattern.lower()
+    extension = extension.lower().lstrip(".")
+    excluded = str(exclude) if exclude is not None else None
+
+    selected = []
+    stack = [str(folder)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and entry.path != excluded:
+                                stack.append(entry.path)
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
+
+                    lowered = name.lower()
+                    if pattern and not fnmatch.fnmatchcase(lowered, pattern):
+                        continue
+                    if extension and not lowered.endswith("." + extension):
+                        continue
+
+                    st = entry.stat(follow_symlinks=False)
+                    if older_than is not None and st.st_mtime > older_than:
+                        continue
+                    if newer_than is not None and st.st_mtime < newer_than:
+                        continue
+                    if min_bytes and st.st_size < min_bytes:
+                        continue
+                    if max_bytes and st.st_size > max_bytes:
+                        continue
+
+                    selected.append((Path(entry.path), st.st_size, st.st_mtime))
+                    if len(selected) > MAX_SELECTION:
+                        raise ValueError(
+                            f"More than {MAX_SELECTION} files match; narrow the selection."
+                        )
+        except OSError:
+            continue
+
+    selected.sort()
+    return selected
+
+
+def _rename_target(template: str, path: Path, n: int, mtime: float) -> str:
+    name = template.format(
+        name=path.name,
+        stem=path.stem,
+        ext=path.suffix,
+        n=n,
+        date=datetime.fromtimestamp(mtime).strftime("%Y-%m-%d"),
+        parent=path.parent.name,
+    )
+    if not name or os.sep in name or (os.altsep and os.altsep in name) or name in (".", ".."):
+        raise ValueError(f"'{template}' does not produce a valid file name.")
+    return name
+
+
+def plan_operations(
+    action: str,
+    folder: Path,
+    files: List[Tuple[Path, int, float]],
+    destination: Optional[Path],
+    rename_to: str,
+) -> List[Tuple[Path, Path, int]]:
+    """
+    Maps each selected file to where it will end up. Moves and copies keep
+    the layout below `folder`; deletes target a per-batch trash folder that
+    is filled in when the batch id is known.
+    """
+
+    ops = []
+    for n, (path, size, mtime) in enumerate(files, start=1):
+        if action in ("move", "copy"):
+            target = destination / path.relative_to(folder)
+        elif action == "rename":
+            target = path.with_name(_rename_target(rename_to, path, n, mtime))
+        else:
+            target = Path(f"{n:06d}_{path.name}")
+        ops.append((path, target, size))
+
+    if action == "rename":
+        targets = [str(t) for _, t, _ in ops]
+        if len(set(targets)) != len(targets):
+            raise ValueError(f"'{rename_to}' gives several files the same name; add {{n}} to number them.")
+
+    return ops
+
+
+def _place(src: Path, dst: Path, keep_source: bool) -> None:
+    """
+    Puts `src` at `dst` without ever exposing a half-written `dst`: renames
+    within a filesystem, otherwise copies to a temporary name and renames it
+    into place before removing the source.
+    """
+
+    if not keep_source:
+        try:
+            os.rename(src, dst)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+    partial = dst.with_name(dst.name + ".partial")
+    try:
+        shutil.copy2(src, partial)
+        os.replace(partial, dst)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    if not keep_source:
+        src.unlink()
+
+
+def _same_file_data(a: Path, b: Path) -> bool:
+    # copy2 preserves mtime, so a finished copy matches its source on both
+    sa, sb = a.stat(), b.stat()
+    return sa.st_size == sb.st_size and int(sa.st_mtime) == int(sb.st_mtime)
+
+
+def _same_device(path: Path, trash: Path) -> bool:
+    trash.mkdir(parents=True, exist_ok=True)
+    return path.stat().st_dev == trash.stat().st_dev
+
+
+def _apply(action: str, src: Path, dst: Path, resuming: bool = False) -> str:
+    if dst.exists():
+        # A resumed batch re-runs operations whose outcome was not journaled, and may
+        # find them already done. On a first run an existing target is never ours,
+        # so it is skipped and undo leaves it alone
+        if resuming and action != "copy" and not src.exists():
+            return "done"
+        if resuming and action == "copy" and _same_file_data(src, dst):
+            return "done"
+        return "skipped"
+    if action == "delete":
+        # Deletes must stay renames into the trash; copying would duplicate the data
+        try:
+            os.rename(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            raise OSError(e.errno, "on a different drive from the batch trash, so it was not deleted") from e
+        return "done"
+    _place(src, dst, keep_source=action == "copy")
+    return "done"
+
+
+def _revert(action: str, src: Path, dst: Path) -> str:
+    if action == "copy":
+        dst.unlink(missing_ok=True)
+        return "undone"
+    if src.exists():
+        return "skipped"
+    if not dst.exists():
+        return "failed"
+    src.parent.mkdir(parents=True, exist_ok=True)
+    _place(dst, src, keep_source=False)
+    return "undone"
+
+
+class BatchJournal:
+    """
+    Write-ahead journal and executor for batch file operations.
+    The full plan is committed to SQLite before any file is touched, and
+    completed operations are recorded as the worker pool finishes them, so
+    a batch interrupted by a crash can be resumed, and any finished batch
+    can be undone, from the journal alone.
+    """
+
+    def __init__(self, path=BATCH_DB, workers: int = BATCH_WORKERS):
+        self.path = str(path)
+        self.workers = workers
+        self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Batches this process is executing right now
+        self._active = set()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        return self._pool
+
+    def create(
+        self,
+        action: str,
+        folder: Path,
+        destination: Optional[Path],
+        selector: Dict[str, Any],
+        ops: List[Tuple[Path, Path, int]],
+    ) -> int:
+        with self._connect() as conn:
+            batch_id = conn.execute(
+                "INSERT INTO batches (action, folder, destination, selector, pid, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (action, str(folder), str(destination) if destination else None,
+                 json.dumps(selector), os.getpid(), time.time()),
+            ).lastrowid
+
+            if action == "delete":
+                trash = TRASH_DIR / str(batch_id)
+                ops = [(src, trash / dst, size) for src, dst, size in ops]
+
+            conn.executemany(
+                "INSERT INTO batch_ops (batch_id, seq, src, dst, size) VALUES (?, ?, ?, ?, ?)",
+                ((batch_id, seq, str(src), str(dst), size) for seq, (src, dst, size) in enumerate(ops)),
+            )
+        return batch_id
+
+    def get(self, batch_id: int = 0) -> Optional[sqlite3.Row]:
+        conn = self._connect()
+        if batch_id:
+            return conn.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        return conn.execute("SELECT * FROM batches ORDER BY id DESC LIMIT 1").fetchone()
+
+    def interrupted(self) -> List[sqlite3.Row]:
+        rows = self._connect().execute(
+            "SELECT * FROM batches WHERE status IN ('running', 'undoing') ORDER BY id"
+        ).fetchall()
+        return [
+            row for row in rows
+            if row["id"] not in self._active and (row["pid"] == os.getpid() or not psutil.pid_exists(row["pid"]))
+        ]
+
+    def _set_status(self, batch_id: int, status: str, finished: bool = False) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE batches SET status = ?, pid = ?, finished_at = ? WHERE id = ?",
+                (status, os.getpid(), time.time() if finished else None, batch_id),
+            )
+
+    def _execute(
+        self, batch_id: int, action: str, from_status: str, undo: bool, resuming: bool = False
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT seq, src, dst, size FROM batch_ops WHERE batch_id = ? AND status = ? "
+            "ORDER BY seq" + (" DESC" if undo else ""),
+            (batch_id, from_status),
+        ).fetchall()
+
+        # Create target folders up front so the workers only move data
+        folders = {Path(row["dst"]).parent for row in rows} if not undo else set()
+        for folder in folders:
+            folder.mkdir(parents=True, exist_ok=True)
+
+        pool = self._get_pool()
+        futures = {
+            (
+                pool.submit(_revert, action, Path(row["src"]), Path(row["dst"])) if undo
+                else pool.submit(_apply, action, Path(row["src"]), Path(row["dst"]), resuming)
+            ): row
+            for row in rows
+        }
+
+        counts = {"done": 0, "undone": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        errors: List[str] = []
+        pending: List[Tuple[str, Optional[str], int, int]] = []
+
+        def flush():
+            with conn:
+                conn.executemany(
+                    "UPDATE batch_ops SET status = ?, error = ? WHERE batch_id = ? AND seq = ?",
+                    pending,
+                )
+            pending.clear()
+
+        for future in as_completed(futures):
+            row = futures[future]
+            try:
+                status, error = future.result(), None
+            except Exception as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+                errors.append(f"{row['src']}: {e}")
+            counts[status] += 1
+            if status in ("done", "undone"):
+                counts["bytes"] += row["size"]
+            # Undo failures leave the operation done so it can be tried again
+            pending.append((status if not (undo and status == "failed") else "done", error, batch_id, row["seq"]))
+            if len(pending) >= JOURNAL_FLUSH:
+                flush()
+        flush()
+
+        counts["errors"] = errors
+        counts["elapsed"] = time.perf_counter() - started
+        return counts
+
+    def run(self, batch_id: int, resuming: bool = False) -> Dict[str, Any]:
+        """
+        Executes every pending operation of a batch. Blocking.
+        `resuming` counts targets left by an earlier, interrupted run as done.
+        """
+
+        batch = self.get(batch_id)
+        self._active.add(batch_id)
+        try:
+            self._set_status(batch_id, "running")
+            result = self._execute(batch_id, batch["action"], "pending", undo=False, resuming=resuming)
+            self._set_status(batch_id, "done", finished=True)
+        finally:
+            self._active.discard(batch_id)
+        logger.info(
+            f"Batch {batch_id} {batch['action']}: {result['done']} done, {result['skipped']} skipped, "
+            f"{result['failed']} failed in {result['elapsed']:.2f}s"
+        )
+        return result
+
+    def undo(self, batch_id: int) -> Dict[str, Any]:
+        """
+        Reverses the completed operations of a batch, newest first. Blocking.
+        """
+
+        batch = self.get(batch_id)
+        self._active.add(batch_id)
+        try:
+            self._set_status(batch_id, "undoing")
+            result = self._execute(batch_id, batch["action"], "done", undo=True)
+            self._set_status(batch_id, "undone" if not result["failed"] else "done", finished=True)
+        finally:
+            self._active.discard(batch_id)
+        if batch["action"] == "delete" and not result["failed"]:
+            shutil.rmtree(TRASH_DIR / str(batch_id), ignore_errors=True)
+        elif batch["destination"]:
+            self._remove_empty_folders(batch_id, Path(batch["destination"]))
+        logger.info(f"Batch {batch_id} undo: {result['undone']} undone, {result['failed']} failed")
+        return result
+
+    def _remove_empty_folders(self, batch_id: int, destination: Path) -> None:
+        # Folders created to hold moved or copied files go once they are empty again
+        rows = self._connect().execute("SELECT DISTINCT dst FROM batch_ops WHERE batch_id = ?", (batch_id,))
+        folders = {Path(row["dst"]).parent for row in rows}
+        for folder in sorted(folders, key=lambda p: len(p.parts), reverse=True):
+            while folder != destination.parent and destination in (folder, *folder.parents):
+                try:
+                    folder.rmdir()
+                except OSError:
+                    break
+                folder = folder.parent
+
+    def purge_trash(self) -> None:
+        """
+        Permanently removes files from delete batches older than `TRASH_DAYS`.
+        Those batches can no longer be undone.
+        """
+
+        cutoff = time.time() - TRASH_DAYS * 86400
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM batches WHERE action = 'delete' AND status = 'done' AND finished_at < ?",
+                (cutoff,),
+            ).fetchall()
+            for row in rows:
+                shutil.rmtree(TRASH_DIR / str(row["id"]), ignore_errors=True)
+                conn.execute("UPDATE batches SET status = 'purged' WHERE id = ?", (row["id"],))
+
+
+_journal: Optional[BatchJournal] = None
+
+
+def get_batch_journal() -> BatchJournal:
+    """
+    Returns the shared batch journal, creating it on first use.
+    """
+
+    global _journal
+    if _journal is None:
+        _journal = BatchJournal()
+    return _journal
+
+
+_PAST = {"move": "Moved", "copy": "Copied", "delete": "Deleted", "rename": "Renamed"}
+
+
+def _summary(batch_id: int, action: str, folder: str, destination: Optional[str], result: Dict[str, Any]) -> str:
+    where = f" in {folder}" if action == "rename" else f" from {folder}"
+    if destination:
+        where += f" to {destination}"
+    parts = [
+        f"{_PAST[action]} {result['done']} files ({_format_size(result['bytes'])}){where} in {result['elapsed']:.1f}s."
+    ]
+    if result["skipped"]:
+        parts.append(f"{result['skipped']} skipped because the target already exists.")
+    if result["failed"]:
+        parts.append(f"{result['failed']} failed, e.g. {result['errors'][0]}.")
+    parts.append(f"This was batch {batch_id}; it can be reversed with undo_batch.")
+    return " ".join(parts)
+
+
+@function_tool()
+async def batch_files(
+    context: RunContext,
+    action: str,
+    folder: str,
+    pattern: str = "",
+    extension: str = "",
+    older_than_days: float = 0,
+    newer_than_days: float = 0,
+    min_size_mb: float = 0,
+    max_size_mb: float = 0,
+    recursive: bool = False,
+    destination: str = "",
+    rename_to: str = "",
+    dry_run: bool = False,
+) -> str:
+    """
+    Moves, copies, deletes or renames many files in one step, e.g. "move all PDFs older than a month
+    from Downloads into Archive". Use this instead of calling move_file or delete_file once per file.
+    Every batch is journaled and can be undone with undo_batch; deleted files are kept for a week.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        action (str): "move", "copy", "delete" or "rename".
+        folder (str): The folder to select files from, e.g. "downloads".
+        pattern (str, optional): Only file names matching this glob, e.g. "invoice*" or "*.jpg".
+        extension (str, optional): Only files with this extension, without the dot, e.g. "pdf".
+        older_than_days (float, optional): Only files not modified for at least N days.
+        newer_than_days (float, optional): Only files modified in the last N days.
+        min_size_mb (float, optional): Only files at least this many megabytes.
+        max_size_mb (float, optional): Only files at most this many megabytes.
+        recursive (bool, optional): Also select files in subfolders. Defaults to False.
+        destination (str, optional): Target folder for "move" and "copy"; created if missing, but its parent
+            folder must exist.
+        rename_to (str, optional): New name template for "rename", using {name}, {stem}, {ext}, {n},
+            {date} and {parent}, e.g. "holiday_{n:03}{ext}".
+        dry_run (bool, optional): Only report what would happen. Defaults to False.
+    Returns:
+        str: A one-paragraph summary with counts, size and the batch id, or an error message.
+    """
+
+    action = action.lower().strip()
+    if action not in ACTIONS:
+        return f"Unknown action '{action}'. Use one of: {', '.join(ACTIONS)}."
+    if action in ("move", "copy") and not destination:
+        return f"A destination folder is needed to {action} files."
+    if action == "rename" and not rename_to:
+        return f"A rename_to template is needed, using {RENAME_FIELDS}."
+
+    try:
+        # Exact paths only: a close match for a misheard folder could move or delete the wrong files
+        source = expand_path(folder)
+        if not source.is_dir():
+            return describe_missing(source, "Folder")
+        target = expand_path(destination) if action in ("move", "copy") else None
+        # The destination itself may be new, but not a folder under a misheard parent
+        if target is not None and not target.is_dir() and not target.parent.is_dir():
+            return describe_missing(target.parent, "Destination folder")
+
+        now = time.time()
+        selector = {
+            "pattern": pattern,
+            "extension": extension,
+            "older_than": now - older_than_days * 86400 if older_than_days > 0 else None,
+            "newer_than": now - newer_than_days * 86400 if newer_than_days > 0 else None,
+            "min_bytes": int(min_size_mb * 1024 * 1024),
+            "max_bytes": int(max_size_mb * 1024 * 1024),
+            "recursive": recursive,
+        }
+
+        files = await asyncio.to_thread(select_files, source, exclude=target, **selector)
+        if not files:
+            return f"No files in {source} match."
+
+        # Deleted files are renamed into the trash; across drives that would mean copying them all
+        if action == "delete" and not _same_device(source, TRASH_DIR):
+            return (
+                f"{source} is on a different drive from the batch trash, so a batch delete there "
+                f"could not be undone. Delete the files individually with delete_file instead."
+            )
+
+        ops = plan_operations(action, source, files, target, rename_to)
+    except (ValueError, KeyError, IndexError) as e:
+        if isinstance(e, KeyError):
+            return f"Unknown placeholder {e} in rename_to. Use {RENAME_FIELDS}."
+        return str(e)
+    except Exception:
+        logger.exception(f"Batch {action} selection in {folder} failed")
+        return f"Could not select files in {folder}"
+
+    total = sum(size for _, _, size in ops)
+    if dry_run:
+        examples = ", ".join(
+            f"{src.name} -> {dst.name}" if action == "rename" else src.name for src, dst, _ in ops[:5]
+        )
+        more = f" and {len(ops) - 5} more" if len(ops) > 5 else ""
+        where = f" to {target}" if target else ""
+        return f"Would {action} {len(ops)} files ({_format_size(total)}){where}: {examples}{more}."
+
+    try:
+        journal = get_batch_journal()
+        await asyncio.to_thread(journal.purge_trash)
+        batch_id = await asyncio.to_thread(journal.create, action, source, target, selector, ops)
+        result = await asyncio.to_thread(journal.run, batch_id)
+        return _summary(batch_id, action, str(source), str(target) if target else None, result)
+    except Exception:
+        logger.exception(f"Batch {action} in {folder} failed")
+        return f"Batch {action} failed; use resume_batch to finish it or undo_batch to reverse it."
+
+
+@function_tool()
+async def undo_batch(context: RunContext, batch_id: int = 0) -> str:
+    """
+    Reverses a batch of file operations made by batch_files: moved and renamed files go back,
+    copies are removed and deleted files are restored.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        batch_id (int, optional): The batch to undo. 0 undoes the most recent batch.
+    Returns:
+        str: How many files were restored, or an error message.
+    """
+
+    try:
+        journal = get_batch_journal()
+        batch = await asyncio.to_thread(journal.get, batch_id)
+        if batch is None:
+            return "There is no batch to undo." if not batch_id else f"No batch with id {batch_id}."
+        if batch["status"] == "undone":
+            return f"Batch {batch['id']} has already been undone."
+        if batch["status"] == "purged":
+            return f"Batch {batch['id']} deleted its files more than {TRASH_DAYS} days ago; they are gone."
+        if batch["status"] in ("running", "undoing"):
+            interrupted = await asyncio.to_thread(journal.interrupted)
+            if batch["id"] not in [b["id"] for b in interrupted]:
+                return f"Batch {batch['id']} is still running."
+
+        result = await asyncio.to_thread(journal.undo, batch["id"])
+    except Exception:
+        logger.exception(f"Undo of batch {batch_id} failed")
+        return f"Could not undo batch {batch_id}"
+
+    message = f"Undid batch {batch['id']}: {result['undone']} files restored in {result['elapsed']:.1f}s."
+    if result["skipped"]:
+        message += f" {result['skipped']} left alone because something now exists at their original path."
+    if result["failed"]:
+        message += f" {result['failed']} could not be restored, e.g. {result['errors'][0] if result['errors'] else 'the file is missing'}."
+    return message
+
+
+@function_tool()
+async def resume_batch(context: RunContext, batch_id: int = 0) -> str:
+    """
+    Finishes a batch of file operations that was interrupted, e.g. by a crash or restart.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        batch_id (int, optional): The batch to resume. 0 resumes every interrupted batch.
+    Returns:
+        str: A summary per resumed batch, or a message if nothing was interrupted.
+    """
+
+    try:
+        journal = get_batch_journal()
+        interrupted = await asyncio.to_thread(journal.interrupted)
+        if batch_id:
+            interrupted = [b for b in interrupted if b["id"] == batch_id]
+        if not interrupted:
+            return "No interrupted batches." if not batch_id else f"Batch {batch_id} is not interrupted."
+
+        summaries = []
+        for batch in interrupted:
+            if batch["status"] == "undoing":
+                result = await asyncio.to_thread(journal.undo, batch["id"])
+                summaries.append(f"Finished undoing batch {batch['id']}: {result['undone']} more files restored.")
+            else:
+                result = await asyncio.to_thread(journal.run, batch["id"], True)
+                summaries.append(_summary(batch["id"], batch["action"], batch["folder"], batch["destination"], result))
+        return "\n".join(summaries)
+    except Exception:
+        logger.exception(f"Resume of batch {batch_id} failed")
+        return f"Could not resume batch {batch_id}"
@@ -1,41 +1,101 @@
+import asyncio
 import logging
-import webbrowser
+import os
 import subprocess
 import platform
-from urllib.parse import quote_plus
+from typing import List, Set
+from urllib.parse import quote_plus, urlparse
 from livekit.agents import function_tool, RunContext
 
+from tools.browser.control import is_running, open_pages
+
 logger = logging.getLogger("JARVIS.OS.Browser")
 
+# "auto" opens links in the assistant's browser once it is running and in the
+# default browser otherwise; "playwright" and "system" always use one or the other
+BROWSER_MODE = os.getenv("CORTEX_BROWSER_MODE", "auto").lower()
+MAX_URLS = 10
+
+# Keeps the tasks that wait on opener processes alive until they have been reaped
+_reapers: Set[asyncio.Task] = set()
+
+
+def _normalize_url(url: str) -> str:
+    url = url.strip()
+    if not url.startswith("http"):
+        url = "https://" + url
+    return url
 
-def _open(url: str):
+
+async def _open_system(url: str) -> None:
     """
     Open a URL in the default web browser based on the operating system.
-    Args:
-        url (str): The URL to be opened.
     Behavior:
+        - On Windows, it uses `os.startfile`, which starts no child process.
         - On macOS (Darwin), it uses the `open` command.
-        - On Windows, it uses the `start` command.
         - On Linux/Unix, it uses the `xdg-open` command.
     Note:
-        This function spawns a subprocess to execute the appropriate command
-        for opening the URL in the default browser.
+        The opener exits once it has handed the URL to the browser; it is
+        waited on in the background so it does not linger as a zombie.
     """
 
     system = platform.system()
 
-    if system == "Darwin":
-        subprocess.Popen(["open", url])
-    elif system == "Windows":
-        subprocess.Popen(["start", url], shell=True)
-    else:
-        subprocess.Popen(["xdg-open", url])
+    if system == "Windows":
+        os.startfile(url)
+        return
+
+    command = ["open", url] if system == "Darwin" else ["xdg-open", url]
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    task = asyncio.get_running_loop().create_task(process.wait())
+    _reapers.add(task)
+    task.add_done_callback(_reapers.discard)
+
+
+def _use_playwright() -> bool:
+    if BROWSER_MODE == "playwright":
+        return True
+    if BROWSER_MODE == "system":
+        return False
+    return is_running()
+
+
+async def _open(*urls: str) -> List[str]:
+    """
+    Opens URLs in new tabs of the assistant's browser, where the tab tools can
+    control them, or in the default browser, depending on `BROWSER_MODE`.
+    URLs the assistant's browser could not load are handed to the default browser.
+    Returns:
+        list: The URLs that could not be opened at all.
+    """
+
+    pending = list(urls)
+    if _use_playwright():
+        try:
+            results = await open_pages(pending)
+            pending = [url for url, error in results if error is not None]
+        except Exception:
+            logger.exception("Could not open links in the assistant's browser")
+
+    failed = []
+    for url in pending:
+        try:
+            await _open_system(url)
+        except Exception:
+            logger.exception(f"Could not open {url} in the default browser")
+            failed.append(url)
+    return failed
 
 
 @function_tool()
 async def open_url(context: RunContext, url: str) -> str:
     """
-    Asynchronously opens a given URL in the default web browser.
+    Asynchronously opens a given URL in a web browser.
     Args:
         context (RunContext): The execution context for the function.
         url (str): The URL to be opened. If the URL does not start with "http",
@@ -47,10 +107,10 @@ async def open_url(context: RunContext, url: str) -> str:
     """
 
     try:
-        if not url.startswith("http"):
-            url = "https://" + url
+        url = _normalize_url(url)
 
-        _open(url)
+        if await _open(url):
+            return f"Could not open {url}"
         logger.info(f"Opened URL: {url}")
         return f"Opened {url}"
 
@@ -59,12 +119,48 @@ async def open_url(context: RunContext, url: str) -> str:
         return f"Could not open {url}"
 
 
+@function_tool()
+async def open_urls(context: RunContext, urls: List[str]) -> str:
+    """
+    Opens several links at once, each in its own browser tab, e.g. "open these three articles".
+    Args:
+        context (RunContext): The execution context for the function.
+        urls (List[str]): The URLs to open, at most 10. "https://" is added where the scheme is missing.
+    Returns:
+        str: How many links were opened, listing any that could not be.
+    """
+
+    try:
+        normalized = [_normalize_url(url) for url in urls if url and url.strip()]
+        normalized = [url for url in normalized if urlparse(url).netloc]
+        if not normalized:
+            return "No valid links given."
+        normalized = list(dict.fromkeys(normalized))
+        skipped = len(normalized) - MAX_URLS
+        normalized = normalized[:MAX_URLS]
+
+        failed = await _open(*normalized)
+        opened = len(normalized) - len(failed)
+        logger.info(f"Opened {opened} of {len(normalized)} URLs")
+
+        message = f"Opened {opened} link{'s' if opened != 1 else ''}."
+        if failed:
+            message += " Could not open: " + ", ".join(failed)
+        if skipped > 0:
+            message += f" Skipped {skipped} more; at most {MAX_URLS} are opened at once."
+        return message
+
+    except Exception:
+        logger.exception("Failed to open URLs")
+        return "Could not open the links."
+
+
 @function_tool()
 async def search_google(context: RunContext, query: str) -> str:
     """
     Perform a Google search for the given query.
     This function constructs a Google search URL using the provided query,
-    opens the URL in the default web browser, and logs the search activity.
+    opens the URL in a web browser, and logs the search activity.
     Args:
         context (RunContext): The runtime context in which the function is executed.
         query (str): The search query string.
@@ -76,7 +172,8 @@ async def search_google(context: RunContext, query: str) -> str:
 
     try:
         url = f"https://www.google.com/search?q={quote_plus(query)}"
-        _open(url)
+        if await _open(url):
+            return "Google search failed"
         logger.info(f"Google search: {query}")
         return f"Searched Google for: {query}"
 
@@ -88,7 +185,7 @@ async def search_google(context: RunContext, query: str) -> str:
 @function_tool()
 async def search_youtube(context: RunContext, query: str) -> str:
     """
-    Searches YouTube for the given query and opens the results page in the default web browser.
+    Searches YouTube for the given query and opens the results page in a web browser.
     Args:
         context (RunContext): The runtime context in which the function is executed.
         query (str): The search query to look up on YouTube.
@@ -100,7 +197,8 @@ async def search_youtube(context: RunContext, query: str) -> str:
 
     try:
         url = f"https://www.youtube.com/results?search_query={quote_plus(query)}"
-        _open(url)
+        if await _open(url):
+            return "YouTube search failed"
         logger.info(f"YouTube search: {query}")
         return f"Searched YouTube for: {query}"
 
@@ -112,7 +210,7 @@ async def search_youtube(context: RunContext, query: str) -> str:
 @function_tool()
 async def open_github(context: RunContext, repo: str) -> str:
     """
-    Asynchronously opens a GitHub repository in the default web browser.
+    Asynchronously opens a GitHub repository in a web browser.
     Args:
         context (RunContext): The runtime context in which the function is executed.
         repo (str): The GitHub repository in the format "owner/repository".
@@ -128,7 +226,8 @@ async def open_github(context: RunContext, repo: str) -> str:
 
     try:
         url = f"https://github.com/{repo}"
-        _open(url)
+        if await _open(url):
+            return "Failed to open GitHub repository"
         logger.info(f"Opened GitHub repo: {repo}")
         return f"Opened GitHub repo {repo}"
 
@@ -152,7 +251,8 @@ async def open_stackoverflow(context: RunContext, query: str) -> str:
 
     try:
         url = f"https://stackoverflow.com/search?q={quote_plus(query)}"
-        _open(url)
+        if await _open(url):
+            return "StackOverflow search failed"
         logger.info(f"StackOverflow search: {query}")
         return f"Searched StackOverflow for: {query}"
 
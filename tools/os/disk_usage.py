@@ -0,0 +1,266 @@
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from livekit.agents import function_tool, RunContext
+
+from tools.os.file_index import _format_size
+from tools.os.path_resolver import describe_missing, resolve_path, substitution_note
+
+logger = logging.getLogger("JARVIS.OS.DiskUsage")
+
+SCAN_WORKERS = min(16, (os.cpu_count() or 2) * 4)
+# Each folder remembers only its largest files; the overall top list is drawn from these
+TOP_FILES_PER_DIR = 20
+# A folder's mtime only changes when entries are added, removed or renamed, not when
+# a file inside grows, so cached folders are re-read at least this often
+MAX_CACHE_AGE = 600
+MAX_CACHED_DIRS = 500_000
+
+
+class _Node(NamedTuple):
+    mtime_ns: int
+    scanned: float
+    own_bytes: int
+    own_files: int
+    subdirs: Tuple[str, ...]
+    # (bytes, name, mtime) of the largest files directly inside
+    top_files: Tuple[Tuple[int, str, float], ...]
+    readable: bool
+
+
+def _disk_bytes(st: os.stat_result) -> int:
+    # Allocated blocks like `du`, so sparse files and tiny files are counted as the disk sees them
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+class DiskUsageScanner:
+    """
+    Measures folder trees with a thread pool over `os.scandir`.
+    Per-folder results are cached against the folder's mtime, so a repeat
+    scan only lists folders whose entries changed and costs one `stat` for
+    every other folder. Like `du -x`, scans stay on the starting filesystem
+    and never follow symlinks.
+    """
+
+    def __init__(self, workers: int = SCAN_WORKERS):
+        self.workers = workers
+        self._cache: Dict[str, _Node] = {}
+        self._cache_lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="disk-usage")
+        return self._pool
+
+    def _scan_dir(self, path: str, device: int, now: float) -> Tuple[str, Optional[_Node], bool]:
+        """
+        Returns the folder's node and whether it came from the cache.
+        The node is None for folders on another filesystem or that vanished.
+        """
+
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return path, None, False
+        if st.st_dev != device:
+            return path, None, False
+
+        cached = self._cache.get(path)
+        if cached is not None and cached.mtime_ns == st.st_mtime_ns and now - cached.scanned < MAX_CACHE_AGE:
+            return path, cached, True
+
+        # The folder's own blocks count too, as in `du`
+        own_bytes, own_files = _disk_bytes(st), 0
+        subdirs: List[str] = []
+        top: List[Tuple[int, str, float]] = []
+        readable = True
+
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                            continue
+                        entry_stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+
+                    size = _disk_bytes(entry_stat)
+                    own_bytes += size
+                    own_files += 1
+                    item = (size, entry.name, entry_stat.st_mtime)
+                    if len(top) < TOP_FILES_PER_DIR:
+                        heapq.heappush(top, item)
+                    elif size > top[0][0]:
+                        heapq.heapreplace(top, item)
+        except OSError:
+            readable = False
+
+        node = _Node(st.st_mtime_ns, now, own_bytes, own_files, tuple(subdirs), tuple(top), readable)
+        with self._cache_lock:
+            self._cache[path] = node
+        return path, node, False
+
+    def scan(self, root: str) -> Dict[str, Any]:
+        """
+        Walks `root` and returns per-folder totals. Blocking.
+        Returns:
+            dict: `totals` mapping each folder to (bytes, files), `nodes`,
+                  `folders`, `cached` (folders served from the cache),
+                  `unreadable` and `elapsed` seconds.
+        """
+
+        with self._scan_lock:
+            started = time.perf_counter()
+            now = time.time()
+            device = os.stat(root).st_dev
+            pool = self._get_pool()
+
+            nodes: Dict[str, _Node] = {}
+            cached = unreadable = 0
+
+            pending = {pool.submit(self._scan_dir, root, device, now)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, node, hit = future.result()
+                    if node is None:
+                        continue
+                    nodes[path] = node
+                    cached += hit
+                    unreadable += not node.readable
+                    for name in node.subdirs:
+                        pending.add(pool.submit(self._scan_dir, os.path.join(path, name), device, now))
+
+            # Deepest folders first so every child total is ready before its parent
+            totals: Dict[str, Tuple[int, int]] = {}
+            for path in sorted(nodes, key=lambda p: p.rstrip(os.sep).count(os.sep), reverse=True):
+                node = nodes[path]
+                size, files = node.own_bytes, node.own_files
+                for name in node.subdirs:
+                    child = totals.get(os.path.join(path, name))
+                    if child is not None:
+                        size += child[0]
+                        files += child[1]
+                totals[path] = (size, files)
+
+            self._forget_missing(root, nodes)
+
+            return {
+                "totals": totals,
+                "nodes": nodes,
+                "folders": len(nodes),
+                "cached": cached,
+                "unreadable": unreadable,
+                "elapsed": time.perf_counter() - started,
+            }
+
+    def _forget_missing(self, root: str, seen: Dict[str, _Node]) -> None:
+        prefix = root.rstrip(os.sep) + os.sep
+        with self._cache_lock:
+            for path in [p for p in self._cache if (p == root or p.startswith(prefix)) and p not in seen]:
+                del self._cache[path]
+
+            if len(self._cache) > MAX_CACHED_DIRS:
+                # Keep the most recently scanned folders
+                keep = sorted(self._cache.items(), key=lambda item: item[1].scanned, reverse=True)
+                self._cache = dict(keep[:MAX_CACHED_DIRS])
+
+
+_scanner: Optional[DiskUsageScanner] = None
+
+
+def get_disk_usage_scanner() -> DiskUsageScanner:
+    """
+    Returns the shared disk usage scanner, creating it on first use.
+    """
+
+    global _scanner
+    if _scanner is None:
+        _scanner = DiskUsageScanner()
+    return _scanner
+
+
+def largest_folders(result: Dict[str, Any], root: str, depth: int, limit: int) -> List[Tuple[str, int]]:
+    base = root.rstrip(os.sep).count(os.sep)
+    candidates = (
+        (path, size)
+        for path, (size, _) in result["totals"].items()
+        if path != root and path.count(os.sep) - base <= depth
+    )
+    return heapq.nlargest(limit, candidates, key=lambda item: item[1])
+
+
+def largest_files(result: Dict[str, Any], limit: int) -> List[Tuple[str, int, float]]:
+    candidates = (
+        (os.path.join(path, name), size, mtime)
+        for path, node in result["nodes"].items()
+        for size, name, mtime in node.top_files
+    )
+    return heapq.nlargest(limit, candidates, key=lambda item: item[1])
+
+
+@function_tool()
+async def disk_usage(context: RunContext, path: str = "~", top: int = 10, depth: int = 2) -> str:
+    """
+    Shows what is taking up disk space in a folder: its total size and its largest subfolders and files.
+    Use this instead of running `du` for questions like "what's eating my disk".
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        path (str, optional): The folder to analyse. Defaults to the home folder ("~").
+        top (int, optional): How many folders and files to list. Defaults to 10.
+        depth (int, optional): How many levels below `path` folders may be listed from. Defaults to 2.
+    Returns:
+        str: The total size followed by the largest folders and files, or an error message.
+    """
+
+    try:
+        resolved = resolve_path(path)
+        root = str(resolved)
+        if not os.path.isdir(root):
+            return describe_missing(resolved, "Folder")
+
+        top = max(1, min(top, 50))
+        result = await asyncio.to_thread(get_disk_usage_scanner().scan, root)
+    except Exception:
+        logger.exception(f"Disk usage scan of {path} failed")
+        return f"Could not analyse disk usage of {path}"
+
+    size, files = result["totals"].get(root, (0, 0))
+    logger.info(
+        f"Scanned {result['folders']} folders under {root} in {result['elapsed']:.2f}s "
+        f"({result['cached']} unchanged)"
+    )
+
+    note = substitution_note(path, resolved)
+    lines = [note] if note else []
+    lines += [f"{root} uses {_format_size(size)} in {files:,} files and {result['folders'] - 1:,} folders."]
+
+    folders = largest_folders(result, root, max(1, depth), top)
+    if folders:
+        lines.append("Largest folders:")
+        for folder, folder_size in folders:
+            share = 100 * folder_size / size if size else 0
+            lines.append(f"{folder}/ | {_format_size(folder_size)} | {share:.0f}%")
+
+    biggest = largest_files(result, top)
+    if biggest:
+        lines.append("Largest files:")
+        for file_path, file_size, mtime in biggest:
+            modified = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
+            lines.append(f"{file_path} | {_format_size(file_size)} | modified {modified}")
+
+    if result["unreadable"]:
+        lines.append(f"{result['unreadable']} folders could not be read and are not counted.")
+
+    return "\n".join(lines)
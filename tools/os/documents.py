@@ -0,0 +1,434 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from livekit.agents import function_tool, RunContext
+
+from config.paths import DATA_DIR
+from tools.os.file_index import SKIP_DIRS
+from tools.os.path_resolver import COMMON_PATHS
+
+logger = logging.getLogger("JARVIS.OS.Documents")
+
+DOCUMENTS_DB = DATA_DIR / "documents.db"
+
+# Extra roots to index, separated by os.pathsep
+EXTRA_ROOTS = [r for r in os.getenv("CORTEX_DOCUMENT_ROOTS", "").split(os.pathsep) if r]
+
+DOCUMENT_EXTENSIONS = {"txt", "md", "markdown", "pdf", "docx"}
+MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+INGEST_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+REINDEX_INTERVAL = 600
+
+CHUNK_WORDS = 180
+CHUNK_OVERLAP = 30
+CHARS_PER_TOKEN = 4
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "about", "as", "at", "be", "by", "did", "do", "does", "for", "from",
+    "how", "i", "in", "is", "it", "my", "of", "on", "or", "say", "said", "that", "the", "this",
+    "to", "was", "what", "when", "where", "which", "who", "why", "with", "me", "tell", "any",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    hash TEXT NOT NULL,
+    chunk_count INTEGER NOT NULL,
+    first_chunk INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5 (
+    doc_id UNINDEXED, location UNINDEXED, title, text,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+Chunk = Tuple[str, str]
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=INGEST_WORKERS)
+    return _pool
+
+
+def default_roots() -> List[str]:
+    return [
+        str(Path(p).expanduser())
+        for p in [COMMON_PATHS["documents"], COMMON_PATHS["downloads"], *EXTRA_ROOTS]
+    ]
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunk(sections: List[Tuple[str, str]]) -> List[Chunk]:
+    """
+    Splits (location, text) sections into overlapping chunks of about
+    CHUNK_WORDS words, each remembering where in the document it came from.
+    """
+
+    chunks = []
+    for location, text in sections:
+        words = text.split()
+        step = CHUNK_WORDS - CHUNK_OVERLAP
+        for start in range(0, max(len(words) - CHUNK_OVERLAP, 1), step):
+            piece = " ".join(words[start:start + CHUNK_WORDS])
+            if piece:
+                chunks.append((location, piece))
+    return chunks
+
+
+def _sections_text(path: str) -> List[Tuple[str, str]]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+
+    if path.lower().endswith((".md", ".markdown")):
+        # One section per heading so passages carry their heading as location
+        sections, heading, lines = [], "", []
+        for line in text.splitlines():
+            if line.startswith("#"):
+                if lines:
+                    sections.append((heading, "\n".join(lines)))
+                heading, lines = line.lstrip("#").strip(), []
+            else:
+                lines.append(line)
+        sections.append((heading, "\n".join(lines)))
+        return sections
+
+    return [("", text)]
+
+
+def _sections_pdf(path: str) -> List[Tuple[str, str]]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [(f"page {number}", page.extract_text() or "") for number, page in enumerate(reader.pages, start=1)]
+
+
+def _sections_docx(path: str) -> List[Tuple[str, str]]:
+    import docx
+
+    sections, heading, paragraphs = [], "", []
+    for paragraph in docx.Document(path).paragraphs:
+        if paragraph.style is not None and paragraph.style.name.startswith("Heading"):
+            if paragraphs:
+                sections.append((heading, "\n".join(paragraphs)))
+            heading, paragraphs = paragraph.text.strip(), []
+        elif paragraph.text.strip():
+            paragraphs.append(paragraph.text)
+    sections.append((heading, "\n".join(paragraphs)))
+    return sections
+
+
+_EXTRACTORS = {
+    "txt": _sections_text,
+    "md": _sections_text,
+    "markdown": _sections_text,
+    "pdf": _sections_pdf,
+    "docx": _sections_docx,
+}
+
+
+def _ingest(path: str, known_hash: Optional[str]) -> Dict[str, Any]:
+    """
+    Hashes and, if the content changed, extracts and chunks one document.
+    Runs in a worker process.
+    Returns:
+        Dict: path, hash, and chunks (None when the hash matched `known_hash`)
+        or an error string.
+    """
+
+    try:
+        digest = _file_hash(path)
+        if digest == known_hash:
+            return {"path": path, "hash": digest, "chunks": None}
+
+        ext = os.path.splitext(path)[1].lower().lstrip(".")
+        return {"path": path, "hash": digest, "chunks": _chunk(_EXTRACTORS[ext](path))}
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def _delete_chunks(conn: sqlite3.Connection, doc: sqlite3.Row) -> None:
+    # doc_id is UNINDEXED, so filtering on it scans every chunk; the rowid range is a direct lookup
+    if doc["chunk_count"]:
+        conn.execute(
+            "DELETE FROM chunks WHERE rowid BETWEEN ? AND ?",
+            (doc["first_chunk"], doc["first_chunk"] + doc["chunk_count"] - 1),
+        )
+
+
+def _fts_query(question: str) -> str:
+    """
+    Turns a spoken question into an FTS5 query: stopwords are dropped and the
+    remaining terms are OR-ed, so BM25 ranks passages with more of them higher.
+    """
+
+    words = [w for w in re.findall(r"\w+", question.lower()) if w not in _STOPWORDS]
+    return " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+
+
+class DocumentIndex:
+    """
+    Full-text index of the user's documents, stored as BM25-ranked chunks in SQLite FTS5.
+    Reindexing compares each file's size and mtime with the catalog and only
+    hands changed files to the worker pool; a file whose content hash is
+    unchanged (e.g. it was only touched) is not re-extracted. Each document's
+    chunks take a contiguous rowid range recorded in the catalog, so they
+    are replaced or removed without scanning the chunk table.
+    """
+
+    def __init__(self, path=DOCUMENTS_DB, roots: Optional[List[str]] = None):
+        self.path = str(path)
+        self.roots = roots if roots is not None else default_roots()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_reindex: Dict[str, Any] = {}
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _candidates(self) -> Dict[str, os.stat_result]:
+        found = {}
+        stack = [root for root in self.roots if os.path.isdir(root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(".") or entry.name in SKIP_DIRS:
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif os.path.splitext(entry.name)[1].lower().lstrip(".") in DOCUMENT_EXTENSIONS:
+                                st = entry.stat()
+                                if 0 < st.st_size <= MAX_DOCUMENT_BYTES:
+                                    found[entry.path] = st
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+
+    def _store(self, conn: sqlite3.Connection, result: Dict[str, Any], st: os.stat_result, known: Optional[sqlite3.Row]) -> None:
+        if result["chunks"] is None:
+            conn.execute(
+                "UPDATE documents SET size = ?, mtime = ? WHERE id = ?",
+                (st.st_size, st.st_mtime, known["id"]),
+            )
+            return
+
+        if known is not None:
+            _delete_chunks(conn, known)
+
+        # FTS5 keeps rows in rowid order, so the largest rowid is found without a scan
+        row = conn.execute("SELECT rowid FROM chunks ORDER BY rowid DESC LIMIT 1").fetchone()
+        first_chunk = (row[0] if row else 0) + 1
+
+        cursor = conn.execute(
+            "INSERT INTO documents (path, size, mtime, hash, chunk_count, first_chunk, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, "
+            "hash = excluded.hash, chunk_count = excluded.chunk_count, first_chunk = excluded.first_chunk, "
+            "indexed_at = excluded.indexed_at "
+            "RETURNING id",
+            (result["path"], st.st_size, st.st_mtime, result["hash"], len(result["chunks"]), first_chunk, time.time()),
+        )
+        doc_id = cursor.fetchone()[0]
+        title = Path(result["path"]).stem.replace("_", " ").replace("-", " ")
+        conn.executemany(
+            "INSERT INTO chunks (rowid, doc_id, location, title, text) VALUES (?, ?, ?, ?, ?)",
+            [
+                (first_chunk + i, doc_id, location, title, text)
+                for i, (location, text) in enumerate(result["chunks"])
+            ],
+        )
+
+    def reindex(self) -> Dict[str, Any]:
+        """
+        Brings the index up to date with the roots. Blocking.
+        """
+
+        with self._lock:
+            started = time.perf_counter()
+            conn = self._connect()
+            stats = {"scanned": 0, "indexed": 0, "touched": 0, "removed": 0, "failed": 0}
+
+            candidates = self._candidates()
+            known = {
+                row["path"]: row
+                for row in conn.execute("SELECT id, path, size, mtime, hash, chunk_count, first_chunk FROM documents")
+            }
+            stats["scanned"] = len(candidates)
+
+            with conn:
+                for path in set(known) - set(candidates):
+                    _delete_chunks(conn, known[path])
+                    conn.execute("DELETE FROM documents WHERE id = ?", (known[path]["id"],))
+                    stats["removed"] += 1
+
+            changed = [
+                path for path, st in candidates.items()
+                if path not in known or known[path]["mtime"] != st.st_mtime or known[path]["size"] != st.st_size
+            ]
+
+            if changed:
+                hashes = [known[p]["hash"] if p in known else None for p in changed]
+                results = _get_pool().map(_ingest, changed, hashes, chunksize=4)
+
+                pending = 0
+                for result in results:
+                    path = result["path"]
+                    if "error" in result:
+                        stats["failed"] += 1
+                        logger.warning(f"Could not index {path}: {result['error']}")
+                        # Record it without content so it is only retried once the file changes
+                        self._store(conn, {"path": path, "hash": "", "chunks": []}, candidates[path], known.get(path))
+                    else:
+                        self._store(conn, result, candidates[path], known.get(path))
+                        stats["indexed" if result["chunks"] is not None else "touched"] += 1
+
+                    pending += 1
+                    if pending >= 50:
+                        conn.commit()
+                        pending = 0
+                conn.commit()
+
+            stats["seconds"] = round(time.perf_counter() - started, 3)
+            self.last_reindex = stats
+            logger.info(f"Document index refreshed: {stats}")
+            return stats
+
+    def is_built(self) -> bool:
+        return bool(self.last_reindex) or self._connect().execute("SELECT 1 FROM documents LIMIT 1").fetchone() is not None
+
+    def search(self, question: str, limit: int = 10) -> List[sqlite3.Row]:
+        query = _fts_query(question)
+        if not query:
+            return []
+
+        return self._connect().execute(
+            "SELECT d.path, c.location, c.text, bm25(chunks, 0.0, 0.0, 2.0, 1.0) AS score "
+            "FROM chunks c JOIN documents d ON d.id = c.doc_id "
+            "WHERE chunks MATCH ? ORDER BY score LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.reindex)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Document reindex failed")
+            await asyncio.sleep(REINDEX_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Starts periodic background reindexing on the running event loop if it is not already running.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_index: Optional[DocumentIndex] = None
+
+
+def get_document_index() -> DocumentIndex:
+    """
+    Returns the shared document index over Documents, Downloads and CORTEX_DOCUMENT_ROOTS, creating it on first use.
+    """
+
+    global _index
+    if _index is None:
+        _index = DocumentIndex()
+    return _index
+
+
+@function_tool()
+async def search_documents(context: RunContext, question: str, max_tokens: int = 800) -> str:
+    """
+    Searches the content of the user's own documents (text, Markdown, PDF and Word files in
+    Documents and Downloads) and returns the most relevant passages, e.g. to answer
+    "what did the lease say about pets".
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        question (str): The question or keywords to look for.
+        max_tokens (int, optional): Approximate size limit of the returned passages. Defaults to 800.
+    Returns:
+        str: The best matching passages, each headed by its file and location, or a message
+             saying nothing relevant was found.
+    """
+
+    try:
+        index = get_document_index()
+
+        if not index.is_built():
+            await asyncio.to_thread(index.reindex)
+
+        rows = await asyncio.to_thread(index.search, question)
+        if not rows:
+            return "No relevant passages found in your documents."
+
+        budget = max_tokens * CHARS_PER_TOKEN
+        passages = []
+        for row in rows:
+            header = row["path"] + (f" ({row['location']})" if row["location"] else "")
+            text = row["text"]
+            remaining = budget - len(header) - 1
+            if remaining <= 80:
+                break
+            if len(text) > remaining:
+                text = text[:remaining].rsplit(" ", 1)[0] + "..."
+            passages.append(f"{header}\n{text}")
+            budget -= len(header) + len(text) + 2
+
+        logger.info(f"Document search for '{question}' returned {len(passages)} passages")
+        return "\n\n".join(passages)
+
+    except Exception:
+        logger.exception(f"Document search for '{question}' failed")
+        return "Document search failed."
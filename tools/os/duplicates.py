@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from livekit.agents import function_tool, RunContext
+
+from config.paths import DATA_DIR
+from tools.os.file_index import SKIP_DIRS, _format_size, default_roots, get_file_index
+from tools.os.path_resolver import describe_missing, resolve_path, substitution_note
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+logger = logging.getLogger("JARVIS.OS.Duplicates")
+
+HASH_CACHE_DB = DATA_DIR / "file_hashes.db"
+HASH_NAME = "xxh3_128" if xxhash is not None else "blake2b"
+
+# Bytes read from each end of a file for the cheap first comparison
+PARTIAL_BYTES = 64 * 1024
+READ_BYTES = 1024 * 1024
+PARTIAL_WORKERS = 8
+HASH_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial TEXT,
+    full TEXT,
+    PRIMARY KEY (dev, inode)
+);
+"""
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _pool
+
+
+def _new_hash():
+    return xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+
+
+def _partial_hash(path: str, size: int) -> Optional[str]:
+    """
+    Hashes the first and last `PARTIAL_BYTES` of a file. Files no larger
+    than both ends together are read whole, so for them this is the full hash.
+    """
+
+    digest = _new_hash()
+    try:
+        with open(path, "rb") as f:
+            if size <= 2 * PARTIAL_BYTES:
+                digest.update(f.read())
+            else:
+                digest.update(f.read(PARTIAL_BYTES))
+                f.seek(-PARTIAL_BYTES, os.SEEK_END)
+                digest.update(f.read(PARTIAL_BYTES))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _full_hash(path: str) -> Optional[str]:
+    digest = _new_hash()
+    buffer = bytearray(READ_BYTES)
+    view = memoryview(buffer)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                digest.update(view[:n])
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class _File:
+    __slots__ = ("path", "size", "dev", "inode", "mtime_ns", "partial", "full")
+
+    def __init__(self, path: str, st: os.stat_result):
+        self.path = path
+        self.size = st.st_size
+        self.dev = st.st_dev
+        self.inode = st.st_ino
+        self.mtime_ns = st.st_mtime_ns
+        self.partial: Optional[str] = None
+        self.full: Optional[str] = None
+
+
+def _walk_sizes(folder: str, min_size: int) -> List[Tuple[str, int]]:
+    # Used for folders outside the file index roots
+    found = []
+    stack = [folder]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or entry.name in SKIP_DIRS:
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            size = entry.stat(follow_symlinks=False).st_size
+                            if size >= min_size:
+                                found.append((entry.path, size))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return found
+
+
+def _regroup(groups: List[List[_File]], key) -> List[List[_File]]:
+    regrouped = []
+    for group in groups:
+        buckets: Dict[Any, List[_File]] = defaultdict(list)
+        for item in group:
+            value = key(item)
+            if value is not None:
+                buckets[value].append(item)
+        regrouped.extend(bucket for bucket in buckets.values() if len(bucket) > 1)
+    return regrouped
+
+
+class DuplicateFinder:
+    """
+    Finds files with identical content in stages, each only looking at what
+    the previous one could not rule out: equal sizes (from the file index),
+    then a hash of the head and tail of each file, then a full content hash
+    computed in a process pool. Hashes are cached by (device, inode, size,
+    mtime), so a repeat run only reads files that changed.
+    """
+
+    def __init__(self, path=HASH_CACHE_DB):
+        self.path = str(path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'algorithm'").fetchone()
+            if row is None or row["value"] != HASH_NAME:
+                # Hashes from another algorithm can never match; start over
+                conn.execute("DELETE FROM hashes")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('algorithm', ?)", (HASH_NAME,))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _candidates(self, folder: str, min_size: int) -> List[Tuple[str, int]]:
+        roots = default_roots()
+        covered = not folder or any(folder == r or folder.startswith(r.rstrip(os.sep) + os.sep) for r in roots)
+        if not covered:
+            return _walk_sizes(folder, min_size)
+
+        index = get_file_index()
+        if not index.is_built():
+            index.refresh(True)
+        return [(row["path"], row["size"]) for row in index.same_size_files(min_size, folder)]
+
+    def find(self, folder: str = "", min_size: int = 1) -> Dict[str, Any]:
+        """
+        Returns duplicate sets under `folder` (or all indexed roots). Blocking.
+        Returns:
+            dict: `groups` (lists of paths, oldest first, with their size), and
+                  counts of files considered and hashed at each stage.
+        """
+
+        with self._lock:
+            return self._find(folder, max(min_size, 1))
+
+    def _find(self, folder: str, min_size: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        stats = {"files": 0, "partial_hashed": 0, "full_hashed": 0, "cached": 0}
+
+        # Stage 1: equal sizes, re-checked against the disk since the index may lag
+        by_size: Dict[int, List[str]] = defaultdict(list)
+        for path, size in self._candidates(folder, min_size):
+            by_size[size].append(path)
+
+        groups: List[List[_File]] = []
+        for size, paths in by_size.items():
+            if len(paths) < 2:
+                continue
+            files, inodes = [], set()
+            for path in paths:
+                try:
+                    st = os.stat(path, follow_symlinks=False)
+                except OSError:
+                    continue
+                # Hard links share an inode and take no extra space
+                if st.st_size != size or (st.st_dev, st.st_ino) in inodes:
+                    continue
+                inodes.add((st.st_dev, st.st_ino))
+                files.append(_File(path, st))
+            if len(files) > 1:
+                groups.append(files)
+        stats["files"] = sum(len(g) for g in groups)
+
+        conn = self._connect()
+        cache = {
+            (row["dev"], row["inode"]): row
+            for row in conn.execute("SELECT * FROM hashes")
+        }
+        for group in groups:
+            for item in group:
+                row = cache.get((item.dev, item.inode))
+                if row is not None and row["size"] == item.size and row["mtime_ns"] == item.mtime_ns:
+                    item.partial, item.full = row["partial"], row["full"]
+                    stats["cached"] += 1
+
+        # Stage 2: head and tail
+        missing = [item for group in groups for item in group if item.partial is None]
+        dirty = {id(item): item for item in missing}
+        with ThreadPoolExecutor(max_workers=PARTIAL_WORKERS, thread_name_prefix="dup-partial") as threads:
+            for item, digest in zip(missing, threads.map(lambda f: _partial_hash(f.path, f.size), missing)):
+                item.partial = digest
+                if digest is not None and item.size <= 2 * PARTIAL_BYTES:
+                    item.full = digest
+        stats["partial_hashed"] = len(missing)
+        groups = _regroup(groups, lambda f: f.partial)
+
+        # Stage 3: full content, largest files first so they do not finish last
+        missing = sorted(
+            (item for group in groups for item in group if item.full is None),
+            key=lambda f: f.size,
+            reverse=True,
+        )
+        if missing:
+            for item, digest in zip(missing, _get_pool().map(_full_hash, [f.path for f in missing])):
+                item.full = digest
+                dirty[id(item)] = item
+        stats["full_hashed"] = len(missing)
+        groups = _regroup(groups, lambda f: f.full)
+
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO hashes (dev, inode, size, mtime_ns, partial, full) VALUES (?, ?, ?, ?, ?, ?)",
+                [(f.dev, f.inode, f.size, f.mtime_ns, f.partial, f.full) for f in dirty.values() if f.partial],
+            )
+
+        result = []
+        for group in groups:
+            group.sort(key=lambda f: f.mtime_ns)
+            result.append({"size": group[0].size, "paths": [f.path for f in group]})
+        result.sort(key=lambda g: g["size"] * (len(g["paths"]) - 1), reverse=True)
+
+        stats["elapsed"] = time.perf_counter() - started
+        logger.info(
+            f"Duplicate scan: {stats['files']} same-size files, {stats['partial_hashed']} partial and "
+            f"{stats['full_hashed']} full hashes ({stats['cached']} cached), {len(result)} sets "
+            f"in {stats['elapsed']:.2f}s"
+        )
+        return {"groups": result, **stats}
+
+
+_finder: Optional[DuplicateFinder] = None
+
+
+def get_duplicate_finder() -> DuplicateFinder:
+    """
+    Returns the shared duplicate finder, creating it on first use.
+    """
+
+    global _finder
+    if _finder is None:
+        _finder = DuplicateFinder()
+    return _finder
+
+
+@function_tool()
+async def find_duplicates(context: RunContext, folder: str = "", min_size_mb: float = 0, limit: int = 10) -> str:
+    """
+    Finds files with identical content in the user's Desktop, Downloads and Documents (or one folder)
+    and reports how much space deleting the extra copies would free.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        folder (str, optional): Only look inside this folder, e.g. "downloads". Defaults to all indexed folders.
+        min_size_mb (float, optional): Ignore files smaller than this many megabytes. Defaults to 0.
+        limit (int, optional): Maximum number of duplicate sets to list, largest savings first. Defaults to 10.
+    Returns:
+        str: The total reclaimable space followed by each duplicate set with its paths, oldest copy first,
+             or a message saying no duplicates were found.
+    """
+
+    limit = max(1, min(limit, 50))
+    try:
+        note = ""
+        if folder:
+            resolved = resolve_path(folder)
+            if not resolved.is_dir():
+                return describe_missing(resolved, "Folder")
+            note = substitution_note(folder, resolved)
+            folder = str(resolved)
+
+        result = await asyncio.to_thread(
+            get_duplicate_finder().find, folder, int(min_size_mb * 1024 * 1024)
+        )
+    except Exception:
+        logger.exception("Duplicate scan failed")
+        return "Duplicate scan failed."
+
+    groups = result["groups"]
+    if not groups:
+        return f"{note} No duplicate files found." if note else "No duplicate files found."
+
+    reclaimable = sum(g["size"] * (len(g["paths"]) - 1) for g in groups)
+    lines = [note] if note else []
+    lines += [f"Found {len(groups)} set{'s' if len(groups) != 1 else ''} of duplicates; deleting the extra copies would free {_format_size(reclaimable)}."]
+
+    for i, group in enumerate(groups[:limit], start=1):
+        paths = group["paths"]
+        name = os.path.basename(paths[0])
+        saving = group["size"] * (len(paths) - 1)
+        lines.append(
+            f"{i}. {len(paths)} copies of {name}, {_format_size(group['size'])} each "
+            f"({_format_size(saving)} reclaimable):"
+        )
+        lines.append(f"   {paths[0]} (oldest)")
+        lines.extend(f"   {path}" for path in paths[1:5])
+        if len(paths) > 5:
+            lines.append(f"   and {len(paths) - 5} more")
+
+    if len(groups) > limit:
+        lines.append(f"{len(groups) - limit} smaller sets not shown.")
+    return "\n".join(lines)
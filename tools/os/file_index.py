@@ -0,0 +1,473 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from livekit.agents import function_tool, RunContext
+
+from config.paths import DATA_DIR
+from tools.os.path_resolver import COMMON_PATHS, resolve_path, substitution_note
+
+logger = logging.getLogger("JARVIS.OS.FileIndex")
+
+FILE_INDEX_DB = DATA_DIR / "file_index.db"
+
+# Extra roots to index, separated by os.pathsep
+EXTRA_ROOTS = [r for r in os.getenv("CORTEX_INDEX_ROOTS", "").split(os.pathsep) if r]
+
+RESCAN_INTERVAL = 60
+# Every Nth rescan also re-stats files in unchanged directories, catching in-place edits
+DEEP_RESCAN_EVERY = 30
+BATCH_SIZE = 5000
+
+SKIP_DIRS = {"node_modules", "__pycache__", "venv", ".venv", "site-packages", "Library", "AppData"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    is_dir INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_parent ON files (parent);
+CREATE INDEX IF NOT EXISTS files_ext ON files (ext, mtime);
+CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime);
+CREATE INDEX IF NOT EXISTS files_size ON files (size);
+CREATE VIRTUAL TABLE IF NOT EXISTS files_name USING fts5 (
+    name, content = 'files', content_rowid = 'id', tokenize = 'trigram'
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+"""
+
+# Keep the name index in step with row changes. Dropped during the initial
+# build, where one bulk rebuild of the name index is far cheaper
+_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_name (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_name (files_name, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE OF name ON files BEGIN
+    INSERT INTO files_name (files_name, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO files_name (rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+_DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS files_ai;
+DROP TRIGGER IF EXISTS files_ad;
+DROP TRIGGER IF EXISTS files_au;
+"""
+
+Entry = Tuple[str, str, str, str, int, float, int]
+
+
+def default_roots() -> List[str]:
+    return [str(Path(p).expanduser()) for p in [*COMMON_PATHS.values(), *EXTRA_ROOTS]]
+
+
+def _skip(name: str) -> bool:
+    return name.startswith(".") or name in SKIP_DIRS
+
+
+def _entry(path: str, parent: str, name: str, st: os.stat_result, is_dir: bool) -> Entry:
+    ext = "" if is_dir else os.path.splitext(name)[1].lower().lstrip(".")
+    return (path, parent, name, ext, 0 if is_dir else st.st_size, st.st_mtime, int(is_dir))
+
+
+def _subtree_bounds(path: str) -> Tuple[str, str]:
+    # Every descendant path sorts between "<path>/" and "<path>0" ("0" follows "/")
+    return path + os.sep, path + chr(ord(os.sep) + 1)
+
+
+class FileIndex:
+    """
+    SQLite catalog of files and folders under a set of root directories.
+    Names are searchable by substring through an FTS5 trigram index; size,
+    extension and modification time are indexed columns.
+    The catalog is kept current by rescans that compare each directory's
+    mtime with the stored one and only re-list directories that changed,
+    so a rescan of an unchanged tree costs one stat per directory.
+    """
+
+    def __init__(self, path=FILE_INDEX_DB, roots: Optional[List[str]] = None):
+        self.path = str(path)
+        self.roots = roots if roots is not None else default_roots()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.scans = 0
+        self.last_scan: Dict[str, Any] = {}
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            conn.executescript(_TRIGGERS)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _children(self, conn: sqlite3.Connection, parent: str) -> Dict[str, sqlite3.Row]:
+        return {
+            row["path"]: row
+            for row in conn.execute("SELECT path, size, mtime, is_dir FROM files WHERE parent = ?", (parent,))
+        }
+
+    def _remove(self, conn: sqlite3.Connection, path: str, is_dir: bool) -> None:
+        conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        if is_dir:
+            low, high = _subtree_bounds(path)
+            conn.execute("DELETE FROM files WHERE path > ? AND path < ?", (low, high))
+            conn.execute("DELETE FROM dirs WHERE path = ? OR (path > ? AND path < ?)", (path, low, high))
+
+    def roots_of(self, dirs: Dict[str, float]) -> List[str]:
+        """
+        Returns the indexed directories that are not inside another indexed directory, i.e. past roots.
+        """
+
+        return [d for d in dirs if os.path.dirname(d) not in dirs]
+
+    def _scan(self, deep: bool) -> Dict[str, Any]:
+        conn = self._connect()
+        started = time.perf_counter()
+        stats = {"dirs": 0, "relisted": 0, "added": 0, "updated": 0, "removed": 0}
+        known_dirs = {row["path"]: row["mtime"] for row in conn.execute("SELECT path, mtime FROM dirs")}
+
+        # Forget roots that are no longer configured
+        stale = [d for d in self.roots_of(known_dirs) if d not in self.roots]
+        with conn:
+            for directory in stale:
+                self._remove(conn, directory, True)
+                stats["removed"] += 1
+        if stale:
+            known_dirs = {row["path"]: row["mtime"] for row in conn.execute("SELECT path, mtime FROM dirs")}
+
+        bulk = not known_dirs
+        if bulk:
+            conn.executescript(_DROP_TRIGGERS)
+
+        try:
+            upserts: List[Entry] = []
+            dir_marks: List[Tuple[str, float]] = []
+
+            def flush():
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO files (path, parent, name, ext, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime",
+                        upserts,
+                    )
+                    conn.executemany("INSERT OR REPLACE INTO dirs (path, mtime) VALUES (?, ?)", dir_marks)
+                upserts.clear()
+                dir_marks.clear()
+
+            for root in self.roots:
+                if not os.path.isdir(root):
+                    continue
+
+                stack = [root]
+                while stack:
+                    directory = stack.pop()
+                    stats["dirs"] += 1
+                    try:
+                        dir_mtime = os.stat(directory).st_mtime
+                    except OSError:
+                        continue
+
+                    if known_dirs.get(directory) == dir_mtime and not deep:
+                        # Listing unchanged: only descend into the subdirectories we already know
+                        stack.extend(
+                            row[0] for row in conn.execute(
+                                "SELECT path FROM files WHERE parent = ? AND is_dir = 1", (directory,)
+                            )
+                        )
+                        continue
+
+                    stats["relisted"] += 1
+                    existing = self._children(conn, directory)
+                    seen = set()
+
+                    try:
+                        with os.scandir(directory) as entries:
+                            for entry in entries:
+                                if _skip(entry.name) or entry.is_symlink():
+                                    continue
+                                try:
+                                    is_dir = entry.is_dir()
+                                    st = entry.stat()
+                                except OSError:
+                                    continue
+
+                                seen.add(entry.path)
+                                if is_dir:
+                                    stack.append(entry.path)
+
+                                old = existing.get(entry.path)
+                                if old is None:
+                                    stats["added"] += 1
+                                elif old["mtime"] != st.st_mtime or (not is_dir and old["size"] != st.st_size):
+                                    stats["updated"] += 1
+                                else:
+                                    continue
+                                upserts.append(_entry(entry.path, directory, entry.name, st, is_dir))
+                    except OSError:
+                        continue
+
+                    gone = [row for path, row in existing.items() if path not in seen]
+                    if gone:
+                        with conn:
+                            for row in gone:
+                                self._remove(conn, row["path"], bool(row["is_dir"]))
+                        stats["removed"] += len(gone)
+
+                    dir_marks.append((directory, dir_mtime))
+                    if len(upserts) >= BATCH_SIZE:
+                        flush()
+
+            flush()
+        finally:
+            # The name index must be rebuilt and kept live even if the walk fails part way
+            if bulk:
+                with conn:
+                    conn.execute("INSERT INTO files_name (files_name) VALUES ('rebuild')")
+                conn.executescript(_TRIGGERS)
+
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        stats["deep"] = deep
+        return stats
+
+    def refresh(self, deep: bool = False) -> Dict[str, Any]:
+        """
+        Brings the catalog up to date with the disk. Blocking.
+        Args:
+            deep (bool): Also re-stat files in directories whose listing did not change.
+        """
+
+        with self._lock:
+            stats = self._scan(deep)
+            self.scans += 1
+            self.last_scan = stats
+            logger.info(f"File index refreshed: {stats}")
+            return stats
+
+    def is_built(self) -> bool:
+        return self.scans > 0 or self._connect().execute("SELECT 1 FROM dirs LIMIT 1").fetchone() is not None
+
+    def find(
+        self,
+        name: str = "",
+        extension: str = "",
+        min_size: int = 0,
+        max_size: int = 0,
+        modified_after: Optional[float] = None,
+        folder: str = "",
+        kind: str = "any",
+        limit: int = 20,
+    ) -> List[sqlite3.Row]:
+        """
+        Queries the catalog. Every filter is optional and they combine with AND.
+        Name matching is a case-insensitive substring match; exact name matches
+        rank first, then the most recently modified.
+        """
+
+        where, params = [], []
+        name = name.strip()
+
+        if len(name) >= 3:
+            where.append("f.id IN (SELECT rowid FROM files_name WHERE files_name MATCH ?)")
+            params.append('"' + name.replace('"', '""') + '"')
+        elif name:
+            where.append("f.name LIKE ?")
+            params.append(f"%{name}%")
+
+        if extension:
+            where.append("f.ext = ?")
+            params.append(extension.lower().lstrip("."))
+        if min_size:
+            where.append("f.size >= ?")
+            params.append(min_size)
+        if max_size:
+            where.append("f.size <= ?")
+            params.append(max_size)
+        if modified_after is not None:
+            where.append("f.mtime >= ?")
+            params.append(modified_after)
+        if folder:
+            low, high = _subtree_bounds(folder.rstrip(os.sep))
+            where.append("f.path > ? AND f.path < ?")
+            params += [low, high]
+        if kind in ("file", "folder"):
+            where.append("f.is_dir = ?")
+            params.append(int(kind == "folder"))
+
+        sql = "SELECT f.path, f.name, f.size, f.mtime, f.is_dir FROM files f"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if name:
+            sql += " ORDER BY lower(f.name) = lower(?) DESC, f.mtime DESC LIMIT ?"
+            params.append(name)
+        else:
+            sql += " ORDER BY f.mtime DESC LIMIT ?"
+
+        return self._connect().execute(sql, (*params, limit)).fetchall()
+
+    def same_size_files(self, min_size: int = 1, folder: str = "") -> List[sqlite3.Row]:
+        """
+        Returns every file whose size is shared with at least one other file,
+        ordered by size, i.e. the candidates for duplicate detection.
+        """
+
+        where, params = "is_dir = 0 AND size >= ?", [max(min_size, 1)]
+        if folder:
+            low, high = _subtree_bounds(folder.rstrip(os.sep))
+            where += " AND path > ? AND path < ?"
+            params += [low, high]
+
+        return self._connect().execute(
+            f"SELECT path, size FROM files WHERE {where} AND size IN "
+            f"(SELECT size FROM files WHERE {where} GROUP BY size HAVING COUNT(*) > 1) ORDER BY size",
+            (*params, *params),
+        ).fetchall()
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh, self.scans % DEEP_RESCAN_EVERY == 0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("File index refresh failed")
+            await asyncio.sleep(RESCAN_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Starts periodic background rescans on the running event loop if they are not already running.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_index: Optional[FileIndex] = None
+
+
+def get_file_index() -> FileIndex:
+    """
+    Returns the shared file index over `COMMON_PATHS` and CORTEX_INDEX_ROOTS, creating it on first use.
+    """
+
+    global _index
+    if _index is None:
+        _index = FileIndex()
+    return _index
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+@function_tool()
+async def find_files(
+    context: RunContext,
+    name: str = "",
+    extension: str = "",
+    min_size_mb: float = 0,
+    max_size_mb: float = 0,
+    modified_within_days: float = 0,
+    folder: str = "",
+    kind: str = "any",
+    limit: int = 20,
+) -> str:
+    """
+    Finds files and folders in the user's Desktop, Downloads and Documents instantly from an index,
+    instead of listing directories one at a time.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        name (str, optional): Part of the file or folder name, e.g. "invoice" or "report.pdf".
+        extension (str, optional): File extension without the dot, e.g. "pdf".
+        min_size_mb (float, optional): Only files at least this many megabytes.
+        max_size_mb (float, optional): Only files at most this many megabytes.
+        modified_within_days (float, optional): Only items modified in the last N days, e.g. 1 for today.
+        folder (str, optional): Only search inside this folder, e.g. "downloads" or "~/Documents/work".
+        kind (str, optional): "file", "folder" or "any". Defaults to "any".
+        limit (int, optional): Maximum number of results. Defaults to 20.
+    Returns:
+        str: One line per match with path, size and modification date, best matches first,
+             or a message saying nothing matched.
+    """
+
+    try:
+        index = get_file_index()
+
+        if not index.is_built():
+            # First use: build synchronously so the answer is complete
+            await asyncio.to_thread(index.refresh, True)
+
+        note = ""
+        if folder:
+            resolved = resolve_path(folder)
+            note = substitution_note(folder, resolved)
+            folder = str(resolved)
+
+        rows = await asyncio.to_thread(
+            index.find,
+            name,
+            extension,
+            int(min_size_mb * 1024 * 1024),
+            int(max_size_mb * 1024 * 1024),
+            time.time() - modified_within_days * 86400 if modified_within_days > 0 else None,
+            folder,
+            kind,
+            max(1, min(limit, 100)),
+        )
+
+        if not rows:
+            return f"{note} No matching files found." if note else "No matching files found."
+
+        lines = [note] if note else []
+        for row in rows:
+            modified = datetime.fromtimestamp(row["mtime"]).strftime("%Y-%m-%d %H:%M")
+            if row["is_dir"]:
+                lines.append(f"{row['path']}/ | folder | modified {modified}")
+            else:
+                lines.append(f"{row['path']} | {_format_size(row['size'])} | modified {modified}")
+
+        logger.info(f"find_files name='{name}' ext='{extension}' returned {len(rows)} results")
+        return "\n".join(lines)
+
+    except Exception:
+        logger.exception("File search failed")
+        return "File search failed."
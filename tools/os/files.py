@@ -1,60 +1,85 @@
+import asyncio
 import logging
-import os
-import shutil
-from pathlib import Path
 from livekit.agents import function_tool, RunContext
+from tools.os.path_resolver import describe_missing, expand_path
+from tools.os.reader import read_lines, read_range, read_tail
+from tools.os.transfer import get_transfer, list_transfers, start_transfer
 
 logger = logging.getLogger("JARVIS.OS.File")
 
-
-def _resolve_path(path: str) -> Path:
-    """
-    Resolves and returns the absolute path of a given file or directory.
-    This function expands the user directory symbol (`~`) in the input path
-    and converts it to an absolute path.
-    Args:
-        path (str): The input file or directory path as a string.
-    Returns:
-        Path: The resolved absolute path as a `Path` object.
-    """
-
-    home = str(Path.home())
-
-    if "yourusername" in path.lower():
-        return path.lower().replace("/users/yourusername", home)
-
-    if "your_username" in path.lower():
-        return path.lower().replace("/users/your_username", home)
-
-    path = os.path.expanduser(path)
-    return Path(path).resolve()
+# How long copy_file and move_file wait before handing a transfer to the background
+TRANSFER_WAIT = 3
 
 
 @function_tool()
-async def read_file(context: RunContext, path: str, max_chars: int = 4000) -> str:
+async def read_file(
+    context: RunContext,
+    path: str,
+    max_chars: int = 4000,
+    offset: int = 0,
+    tail: bool = False,
+    start_line: int = 0,
+    end_line: int = 0,
+) -> str:
     """
-    Reads the content of a file up to a specified maximum number of characters.
+    Reads part of a file without loading the whole file, so large logs and data files are cheap to inspect.
+    By default returns the beginning of the file.
     Args:
         context (RunContext): The execution context in which the function is called.
         path (str): The path to the file to be read.
-        max_chars (int, optional): The maximum number of characters to read from the file. Defaults to 4000.
+        max_chars (int, optional): The maximum number of characters to return. Defaults to 4000.
+        offset (int, optional): Byte position to start reading from. Negative values count back from the end.
+        tail (bool, optional): Return the end of the file instead of the beginning, e.g. the latest log entries.
+        start_line (int, optional): First line to return (1-based). A negative value returns that many
+            lines from the end of the file, e.g. -50 for the last 50 lines.
+        end_line (int, optional): Last line to return (inclusive) when `start_line` is given.
     Returns:
-        str: The content of the file up to the specified maximum number of characters, or an error message
-             if the file could not be found or read.
+        str: The requested content, followed by a note giving the position to continue from when the file
+             has more content, or an error message if the file could not be found or read.
     Raises:
         Exception: Logs an exception if an error occurs while reading the file.
     """
 
-    try:
-        file_path = _resolve_path(path)
-
-        if not file_path.exists() or not file_path.is_file():
-            return f"File not found: {file_path}"
+    if end_line < 0:
+        return f"end_line must be a line number from 1, got {end_line}."
+    if end_line and start_line > 0 and end_line < start_line:
+        return f"end_line {end_line} comes before start_line {start_line}; nothing to read."
 
-        content = file_path.read_text(errors="ignore")
-        logger.info(f"Read file: {file_path}")
+    try:
+        file_path = expand_path(path)
 
-        return content[:max_chars]
+        if not file_path.exists():
+            return describe_missing(file_path, "File")
+        if not file_path.is_file():
+            return f"Not a file: {file_path}"
+
+        if start_line:
+            result = await asyncio.to_thread(
+                read_lines, str(file_path), start_line, end_line or None, max_chars
+            )
+        elif tail:
+            result = await asyncio.to_thread(read_tail, str(file_path), max_chars)
+        else:
+            result = await asyncio.to_thread(read_range, str(file_path), offset, max_chars)
+
+        if result["encoding"] is None:
+            return f"Binary file, cannot display as text: {file_path} ({result['size']} bytes)"
+
+        logger.info(f"Read bytes {result['start']}-{result['end']} of {result['size']} from file: {file_path}")
+
+        content = result["text"]
+        if start_line > 0:
+            if result["last_line"] < result["first_line"]:
+                return f"File has fewer than {start_line} lines: {file_path}"
+            if result["partial"]:
+                return content + f"\n\n[Line {result['first_line']} is longer than {max_chars} characters. Use offset={result['end']} to read the rest of it.]"
+            return content + f"\n\n[Lines {result['first_line']}-{result['last_line']}. Use start_line={result['last_line'] + 1} to read more.]"
+        if result["end"] < result["size"] and not start_line:
+            content += f"\n\n[Showing bytes {result['start']}-{result['end']} of {result['size']}. Use offset={result['end']} to read more.]"
+        elif result["start"] > 0 and not start_line:
+            content = f"[Showing bytes {result['start']}-{result['end']} of {result['size']}]\n\n" + content
+
+        return content
 
     except Exception as e:
         logger.exception(f"Failed to read file {path}")
@@ -76,7 +101,7 @@ async def write_file(context: RunContext, path: str, content: str) -> str:
     """
 
     try:
-        file_path = _resolve_path(path)
+        file_path = expand_path(path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
         file_path.write_text(content)
@@ -89,71 +114,149 @@ async def write_file(context: RunContext, path: str, content: str) -> str:
         return f"Could not write file: {path}"
 
 
+def _describe(progress: dict) -> str:
+    line = (
+        f"{progress['kind'].capitalize()} {progress['id']} {progress['status']}: "
+        f"{progress['source']} -> {progress['destination']}, "
+        f"{progress['bytes'] / 1e6:.1f} of {progress['total_bytes'] / 1e6:.1f} MB ({progress['percent']}%), "
+        f"{progress['files']} of {progress['total_files']} files, {progress['mb_per_s']} MB/s"
+    )
+    if progress["eta"] is not None:
+        line += f", about {progress['eta']:.0f}s left"
+    if progress["error"]:
+        line += f". Error: {progress['error']}"
+    return line + _skipped_note(progress)
+
+
+def _skipped_note(progress: dict) -> str:
+    skipped = progress["skipped"]
+    if not skipped:
+        return ""
+    shown = ", ".join(skipped[:5]) + (f" and {len(skipped) - 5} more" if len(skipped) > 5 else "")
+    return f". Skipped {len(skipped)} special files (pipes, sockets or devices): {shown}"
+
+
+async def _transfer(kind: str, source: str, destination: str) -> str:
+    src = expand_path(source)
+    dst = expand_path(destination)
+
+    if not src.exists() and not src.is_symlink():
+        return describe_missing(src, "Source file")
+
+    transfer = start_transfer(kind, src, dst)
+    logger.info(f"Started {kind} {transfer.id} from {src} to {transfer.destination}")
+
+    # Small transfers report their result directly; large ones keep running in the background
+    await asyncio.wait({transfer.future}, timeout=TRANSFER_WAIT)
+
+    progress = transfer.progress()
+    if progress["status"] == "done":
+        verb = "Copied" if kind == "copy" else "Moved"
+        if not progress["bytes"]:
+            return f"{verb} to {transfer.destination}" + _skipped_note(progress)
+        return (
+            f"{verb} to {transfer.destination} ({progress['bytes'] / 1e6:.1f} MB in {progress['elapsed']}s)"
+            + _skipped_note(progress)
+        )
+    if progress["status"] == "running":
+        return _describe(progress) + ". Still running in the background; use transfer_status to check on it."
+    return _describe(progress)
+
+
 @function_tool()
 async def copy_file(context: RunContext, source: str, destination: str) -> str:
     """
-    Asynchronously copies a file from the source path to the destination path.
+    Copies a file or a whole folder from the source path to the destination path.
+    Large copies continue in the background without blocking the conversation.
     Args:
         context (RunContext): The runtime context for the operation.
-        source (str): The path to the source file to be copied.
-        destination (str): The path to the destination where the file should be copied.
+        source (str): The path to the file or folder to be copied.
+        destination (str): The destination path. If it is an existing folder, the source is copied into it.
     Returns:
-        str: A message indicating the result of the operation. If the source file does not exist,
-             it returns a message stating that the source file does not exist. If the operation
-             is successful, it returns a message indicating the destination path. If an error
-             occurs, it returns "File copy failed".
+        str: A message with the destination, size and time taken, or a progress report with a transfer id
+             if the copy is still running, or an error message.
     Raises:
         Exception: Logs and handles any exceptions that occur during the file copy operation.
     """
 
     try:
-        src = _resolve_path(source)
-        dst = _resolve_path(destination)
-
-        if not src.exists():
-            return f"Source file does not exist: {src}"
-
-        shutil.copy2(src, dst)
-        logger.info(f"Copied file from {src} to {dst}")
-
-        return f"Copied file to {dst}"
+        return await _transfer("copy", source, destination)
 
     except Exception as e:
         logger.exception(f"Failed to copy file {source} to {destination}")
-        return "File copy failed"
+        return f"File copy failed: {e}"
 
 
 @function_tool()
 async def move_file(context: RunContext, source: str, destination: str) -> str:
     """
-    Asynchronously moves a file from the source path to the destination path.
+    Moves a file or a whole folder from the source path to the destination path.
+    Moves within the same disk are instant; moves across disks copy in the background
+    and remove the source once the copy is complete.
     Args:
         context (RunContext): The runtime context in which the function is executed.
-        source (str): The path to the source file to be moved.
-        destination (str): The path to the destination where the file should be moved.
+        source (str): The path to the file or folder to be moved.
+        destination (str): The destination path. If it is an existing folder, the source is moved into it.
     Returns:
-        str: A message indicating the result of the operation. If successful, it returns
-             a message with the destination path. If the source file does not exist or
-             an error occurs, it returns an appropriate error message.
+        str: A message with the destination path, or a progress report with a transfer id if the move is
+             still running, or an error message.
     Raises:
         Exception: Logs and handles any exceptions that occur during the file move operation.
     """
 
     try:
-        src = _resolve_path(source)
-        dst = _resolve_path(destination)
+        return await _transfer("move", source, destination)
 
-        if not src.exists():
-            return f"Source file does not exist: {src}"
+    except Exception as e:
+        logger.exception(f"Failed to move file {source} to {destination}")
+        return f"File move failed: {e}"
 
-        shutil.move(str(src), str(dst))
-        logger.info(f"Moved file from {src} to {dst}")
 
-        return f"Moved file to {dst}"
+@function_tool()
+async def transfer_status(context: RunContext, transfer_id: int = 0) -> str:
+    """
+    Reports progress of background copies and moves: bytes and files done, throughput and time left.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        transfer_id (int, optional): The transfer to report on. 0 reports all recent transfers.
+    Returns:
+        str: One progress line per transfer, or a message if there are none.
+    """
 
-    except Exception as e:
-        logger.exception(f"Failed to move file {source} to {destination}")
-        return "File move failed"
+    if transfer_id:
+        transfer = get_transfer(transfer_id)
+        if transfer is None:
+            return f"No transfer with id {transfer_id}"
+        return _describe(transfer.progress())
+
+    transfers = list_transfers()
+    if not transfers:
+        return "No copies or moves in progress"
+    return "\n".join(_describe(t.progress()) for t in transfers)
+
+
+@function_tool()
+async def cancel_transfer(context: RunContext, transfer_id: int) -> str:
+    """
+    Cancels a running background copy or move. Partially copied files are removed
+    and the source is left untouched.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        transfer_id (int): The id of the transfer to cancel, as reported by copy_file, move_file or transfer_status.
+    Returns:
+        str: The final state of the transfer.
+    """
+
+    transfer = get_transfer(transfer_id)
+    if transfer is None:
+        return f"No transfer with id {transfer_id}"
+
+    if transfer.status == "running":
+        transfer.cancel()
+        await transfer.future
+        logger.warning(f"Cancelled transfer {transfer_id}")
+
+    return _describe(transfer.progress())
 
 
 @function_tool()
@@ -173,10 +276,10 @@ async def delete_file(context: RunContext, path: str) -> str:
     """
 
     try:
-        file_path = _resolve_path(path)
+        file_path = expand_path(path)
 
         if not file_path.exists():
-            return f"File does not exist: {file_path}"
+            return describe_missing(file_path, "File")
 
         file_path.unlink()
         logger.warning(f"Deleted file: {file_path}")
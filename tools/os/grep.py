@@ -0,0 +1,389 @@
+import argparse
+import asyncio
+import fnmatch
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from livekit.agents import function_tool, RunContext
+
+from tools.os.file_index import SKIP_DIRS
+from tools.os.path_resolver import describe_missing, resolve_path, substitution_note
+
+logger = logging.getLogger("JARVIS.OS.Grep")
+
+GREP_WORKERS = max(1, os.cpu_count() or 1)
+MAX_FILE_BYTES = 20 * 1024 * 1024
+# Files are handed to workers in batches of roughly this many bytes
+BATCH_BYTES = 4 * 1024 * 1024
+BATCH_FILES = 64
+BINARY_SNIFF_BYTES = 8192
+MAX_LINE_CHARS = 200
+
+BINARY_EXTENSIONS = {
+    "png", "jpg", "jpeg", "gif", "bmp", "ico", "webp", "heic", "tiff", "psd",
+    "mp3", "mp4", "m4a", "mov", "avi", "mkv", "wav", "flac", "ogg", "webm",
+    "zip", "gz", "tgz", "bz2", "xz", "7z", "rar", "dmg", "iso", "pkg", "deb",
+    "exe", "dll", "so", "dylib", "o", "a", "class", "jar", "pyc", "wasm",
+    "pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "key", "pages", "numbers",
+    "sqlite", "db", "ttf", "otf", "woff", "woff2",
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=GREP_WORKERS)
+    return _pool
+
+
+def _read_ignore(directory: str) -> List[str]:
+    """
+    Reads the plain glob patterns from a directory's .gitignore.
+    Negations and anchored patterns are treated as ordinary globs.
+    """
+
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="ignore") as f:
+            lines = [line.strip() for line in f]
+    except OSError:
+        return []
+    return [line.strip("/") for line in lines if line and not line.startswith(("#", "!"))]
+
+
+def _ignored(name: str, patterns: List[str]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def collect_files(roots: List[str], max_file_bytes: int = MAX_FILE_BYTES) -> Tuple[List[Tuple[str, int]], int]:
+    """
+    Walks the roots and returns (path, size) for every file worth searching,
+    plus the number of files skipped. Hidden entries, dependency folders,
+    .gitignore matches, known binary formats and files over the size cap
+    are skipped.
+    """
+
+    files, skipped = [], 0
+    stack = [(root, []) for root in roots if os.path.isdir(root)]
+    stack += [(None, [root]) for root in roots if os.path.isfile(root)]
+
+    while stack:
+        directory, inherited = stack.pop()
+        if directory is None:
+            files.append((inherited[0], os.path.getsize(inherited[0])))
+            continue
+
+        patterns = inherited + _read_ignore(directory)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith(".") or name in SKIP_DIRS or _ignored(name, patterns):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, patterns))
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        size = entry.stat().st_size
+                    except OSError:
+                        continue
+
+                    ext = os.path.splitext(name)[1].lower().lstrip(".")
+                    if ext in BINARY_EXTENSIONS or size > max_file_bytes or size == 0:
+                        skipped += 1
+                        continue
+                    files.append((entry.path, size))
+        except OSError:
+            continue
+
+    return files, skipped
+
+
+def _batches(files: List[Tuple[str, int]]) -> List[List[str]]:
+    batches, current, current_bytes = [], [], 0
+    for path, size in files:
+        current.append(path)
+        current_bytes += size
+        if current_bytes >= BATCH_BYTES or len(current) >= BATCH_FILES:
+            batches.append(current)
+            current, current_bytes = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+@lru_cache(maxsize=16)
+def _compile(pattern: str, regex: bool, case_sensitive: bool) -> "re.Pattern[str]":
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(pattern if regex else re.escape(pattern), flags | re.MULTILINE)
+
+
+def _clip(line) -> str:
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    line = line.rstrip("\r")
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS] + "..."
+
+
+def _literal_positions(data: bytes, needle: bytes, case_sensitive: bool) -> Iterator[int]:
+    # bytes.lower() only folds ASCII, which is all an ASCII needle needs
+    haystack = data if case_sensitive else data.lower()
+    pos = haystack.find(needle)
+    while pos >= 0:
+        yield pos
+        pos = haystack.find(needle, pos + 1)
+
+
+def _grep_batch(
+    paths: List[str],
+    pattern: str,
+    regex: bool,
+    case_sensitive: bool,
+    context_lines: int,
+    max_per_file: int,
+) -> Dict[str, Any]:
+    """
+    Searches a batch of files. Runs in a worker process.
+    ASCII literals are matched on the raw bytes with `bytes.find`; other
+    patterns use a compiled regex on the decoded text. Either way each file
+    is searched as a whole and only split into lines around actual matches.
+    Returns:
+        Dict: matches (path, line number, line, context before and after),
+        bytes scanned and the number of binary files skipped.
+    """
+
+    literal = not regex and pattern.isascii()
+    if literal:
+        needle = (pattern if case_sensitive else pattern.lower()).encode()
+    else:
+        compiled = _compile(pattern, regex, case_sensitive)
+
+    matches, scanned, binary = [], 0, 0
+
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read(MAX_FILE_BYTES)
+        except OSError:
+            continue
+
+        scanned += len(data)
+        if b"\x00" in data[:BINARY_SNIFF_BYTES]:
+            binary += 1
+            continue
+
+        if literal:
+            buffer, newline = data, b"\n"
+            positions = _literal_positions(data, needle, case_sensitive)
+        else:
+            buffer, newline = data.decode("utf-8", errors="replace"), "\n"
+            positions = (m.start() for m in compiled.finditer(buffer))
+
+        line_no, last_pos, found, last_line = 1, 0, 0, 0
+        lines, line_count = None, 0
+
+        for pos in positions:
+            line_no += buffer.count(newline, last_pos, pos)
+            last_pos = pos
+            if line_no == last_line:
+                continue
+            last_line = line_no
+
+            if lines is None:
+                lines = buffer.split(newline)
+                # A trailing newline ends the last line rather than starting an empty one
+                line_count = len(lines) - (not lines[-1])
+            matches.append({
+                "path": path,
+                "line": line_no,
+                "text": _clip(lines[line_no - 1]),
+                "before": [_clip(l) for l in lines[max(0, line_no - 1 - context_lines):line_no - 1]],
+                "after": [_clip(l) for l in lines[line_no:min(line_no + context_lines, line_count)]],
+            })
+
+            found += 1
+            if found >= max_per_file:
+                break
+
+    return {"matches": matches, "bytes": scanned, "binary": binary}
+
+
+async def grep_stream(
+    pattern: str,
+    roots: List[str],
+    regex: bool = False,
+    case_sensitive: bool = False,
+    context_lines: int = 1,
+    max_per_file: int = 5,
+    max_file_bytes: int = MAX_FILE_BYTES,
+    stats: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yields matches as worker batches complete. Breaking out of the loop
+    cancels the batches that have not started yet. If `stats` is given it
+    is filled with files, bytes scanned, elapsed time and throughput.
+    """
+
+    stats = stats if stats is not None else {}
+    started = time.perf_counter()
+
+    files, skipped = await asyncio.to_thread(collect_files, roots, max_file_bytes)
+    stats.update({"files": len(files), "skipped": skipped, "bytes": 0, "binary": 0, "matches": 0})
+
+    pool = _get_pool()
+    futures = [
+        asyncio.wrap_future(pool.submit(_grep_batch, batch, pattern, regex, case_sensitive, context_lines, max_per_file))
+        for batch in _batches(files)
+    ]
+
+    try:
+        for next_done in asyncio.as_completed(futures):
+            result = await next_done
+            stats["bytes"] += result["bytes"]
+            stats["binary"] += result["binary"]
+            for match in result["matches"]:
+                stats["matches"] += 1
+                yield match
+    finally:
+        for future in futures:
+            future.cancel()
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 3)
+        stats["mb_per_s"] = round(stats["bytes"] / 1e6 / elapsed, 1) if elapsed else 0.0
+
+
+@function_tool()
+async def grep_files(
+    context: RunContext,
+    text: str,
+    folder: str = "documents",
+    regex: bool = False,
+    case_sensitive: bool = False,
+    context_lines: int = 1,
+    max_matches: int = 20,
+) -> str:
+    """
+    Searches inside files for text, e.g. "which of my documents mention the Q3 budget".
+    Scans every text file under a folder in parallel and reports matching lines.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        text (str): The text to look for.
+        folder (str, optional): Folder to search, e.g. "documents", "desktop", "downloads" or a path.
+            Defaults to "documents".
+        regex (bool, optional): Treat `text` as a regular expression. Defaults to False.
+        case_sensitive (bool, optional): Match case exactly. Defaults to False.
+        context_lines (int, optional): Lines of context shown around each match. Defaults to 1.
+        max_matches (int, optional): Stop after this many matching lines. Defaults to 20.
+    Returns:
+        str: Matches grouped by file with line numbers and context, followed by a summary line,
+             or a message saying nothing matched.
+    """
+
+    try:
+        resolved = resolve_path(folder)
+        if not resolved.is_dir():
+            return describe_missing(resolved, "Folder")
+        root = str(resolved)
+        note = substitution_note(folder, resolved)
+
+        stats: Dict[str, Any] = {}
+        matches = []
+        stream = grep_stream(
+            text, [root], regex, case_sensitive, max(0, min(context_lines, 3)), stats=stats
+        )
+        async for match in stream:
+            matches.append(match)
+            if len(matches) >= max_matches:
+                break
+        await stream.aclose()
+
+        logger.info(f"grep_files '{text}' in {root}: {stats}")
+
+        if not matches:
+            message = f"No matches for '{text}' in {stats['files']} files under {root}."
+            return f"{note} {message}" if note else message
+
+        # Context shared by nearby matches is shown once, like grep; "--" separates disjoint windows
+        by_file: Dict[str, Dict[int, Tuple[str, str]]] = {}
+        for match in matches:
+            shown = by_file.setdefault(match["path"], {})
+            for offset, before in enumerate(match["before"]):
+                shown.setdefault(match["line"] - len(match["before"]) + offset, ("-", before))
+            for offset, after in enumerate(match["after"], start=1):
+                shown.setdefault(match["line"] + offset, ("-", after))
+            shown[match["line"]] = (":", match["text"])
+
+        lines = [note] if note else []
+        for path in sorted(by_file):
+            lines.append(f"{path}:")
+            previous = None
+            for line_no in sorted(by_file[path]):
+                if previous is not None and line_no > previous + 1:
+                    lines.append("  --")
+                marker, line = by_file[path][line_no]
+                lines.append(f"  {line_no}{marker} {line}")
+                previous = line_no
+
+        limited = " (stopped at the match limit)" if len(matches) >= max_matches else ""
+        lines.append(
+            f"{len(matches)} matches{limited}; scanned {stats['bytes'] / 1e6:.1f} MB "
+            f"in {stats['seconds']}s"
+        )
+        return "\n".join(lines)
+
+    except re.error as e:
+        return f"Invalid search pattern: {e}"
+    except Exception:
+        logger.exception(f"Content search for '{text}' failed")
+        return "Content search failed."
+
+
+def _make_corpus(directory: str, total_mb: int) -> None:
+    words = "budget quarter revenue forecast meeting notes project plan review draft".split()
+    line = " ".join(words) + "\n"
+    per_file = 256 * 1024
+    body = (line * (per_file // len(line) + 1))[:per_file]
+    for i in range(total_mb * 4):
+        sub = os.path.join(directory, f"dir{i % 32}")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"doc{i}.txt"), "w") as f:
+            f.write(body)
+            if i % 50 == 0:
+                f.write("The Q3 budget was approved.\n")
+
+
+async def benchmark(total_mb: int = 256, pattern: str = "q3 budget") -> Dict[str, Any]:
+    """
+    Builds a synthetic corpus of `total_mb` MB of text files in a temporary
+    directory, greps it for a needle and returns the scan statistics,
+    including throughput in MB/s.
+    """
+
+    directory = tempfile.mkdtemp(prefix="cortex-grep-bench-")
+    try:
+        await asyncio.to_thread(_make_corpus, directory, total_mb)
+        _get_pool().submit(int).result()  # start the workers outside the timed run
+
+        stats: Dict[str, Any] = {}
+        async for _ in grep_stream(pattern, [directory], stats=stats):
+            pass
+        stats["workers"] = GREP_WORKERS
+        return stats
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark grep_files on a synthetic corpus")
+    parser.add_argument("--mb", type=int, default=256, help="corpus size in MB")
+    args = parser.parse_args()
+    print(asyncio.run(benchmark(args.mb)))
@@ -0,0 +1,368 @@
+import asyncio
+import itertools
+import logging
+import os
+import shutil
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from livekit.agents import function_tool, RunContext
+
+from config.paths import DATA_DIR
+from tools.os.path_resolver import describe_missing, expand_path
+from tools.os.reader import read_lines
+from tools.os.shell import DRAIN_TIMEOUT, READ_BYTES, kill_tree, process_group_kwargs, wait_exit
+
+logger = logging.getLogger("JARVIS.OS.Jobs")
+
+JOBS_DIR = DATA_DIR / "jobs"
+# Each job's output file rotates at this size, keeping this many older files
+LOG_MAX_BYTES = 8 * 1024 * 1024
+LOG_BACKUPS = 2
+MAX_RUNNING = 8
+MAX_FINISHED = 20
+DEFAULT_WAIT = 30
+
+_ids = itertools.count(1)
+_jobs: Dict[int, "Job"] = {}
+
+
+class RotatingLog:
+    """
+    Append-only output file that rolls over to `output.log.1`, `.2`, ... once
+    it reaches `LOG_MAX_BYTES`, so a chatty job uses bounded disk space.
+    Writes are small and go to the page cache, so they are made directly on
+    the event loop.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.total = 0
+        self._file = open(path, "ab", buffering=0)
+        self._size = self._file.tell()
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        if self._size + len(data) > self.max_bytes and self._size:
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._file = open(self.path, "ab", buffering=0)
+        self._size = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Job:
+    """
+    A shell command running detached from the conversation turn that
+    started it. Output (stdout and stderr interleaved) is spooled to a
+    rotating log under `JOBS_DIR`; when the command ends, the owning
+    session is told so the assistant can report back.
+    """
+
+    def __init__(self, command: str, name: str, cwd: Optional[str], session: Any = None):
+        self.id = next(_ids)
+        self.command = command
+        self.name = name or (command.split() or ["job"])[0]
+        self.cwd = cwd
+        self.status = "running"
+        self.exit_code: Optional[int] = None
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.task: Optional[asyncio.Task] = None
+        self.done = asyncio.Event()
+
+        self.dir = JOBS_DIR / str(self.id)
+        # Ids restart with the process; drop output left by an earlier run
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.log = RotatingLog(self.dir / "output.log")
+
+        try:
+            self._session = weakref.ref(session) if session is not None else None
+        except TypeError:
+            self._session = lambda: session
+
+    @property
+    def log_path(self) -> Path:
+        return self.log.path
+
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - self.started
+
+    async def _run(self) -> None:
+        try:
+            self.process = await asyncio.create_subprocess_shell(
+                self.command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=self.cwd,
+                **process_group_kwargs(),
+            )
+            if self.status == "killed":
+                # Stopped while the shell was starting
+                await kill_tree(self.process)
+
+            reader = asyncio.ensure_future(self._spool())
+            try:
+                self.exit_code = await wait_exit(self.process)
+                # A child left running in the background can hold the pipe open forever
+                await asyncio.wait([reader], timeout=DRAIN_TIMEOUT)
+            finally:
+                reader.cancel()
+            if self.status == "running":
+                self.status = "done" if self.exit_code == 0 else "failed"
+        except asyncio.CancelledError:
+            if self.process is not None:
+                await asyncio.shield(kill_tree(self.process))
+            self.status = "killed"
+            raise
+        except Exception as e:
+            self.status = "failed"
+            self.log.write(f"\n[could not run: {e}]\n".encode())
+            logger.exception(f"Job {self.id} failed to run")
+        finally:
+            self.finished = time.time()
+            self.log.close()
+            self.done.set()
+            logger.info(f"Job {self.id} ({self.name}) {self.status} with exit code {self.exit_code} "
+                        f"after {self.elapsed():.1f}s, {self.log.total} bytes of output")
+            self._notify()
+
+    async def _spool(self) -> None:
+        while True:
+            data = await self.process.stdout.read(READ_BYTES)
+            if not data:
+                break
+            self.log.write(data)
+
+    def _notify(self) -> None:
+        session = self._session() if self._session is not None else None
+        # A job stopped on request needs no announcement
+        if session is None or self.status == "killed":
+            return
+        try:
+            session.generate_reply(
+                instructions=(
+                    f"The background job {self.id} ('{self.name}') has just {describe_status(self)}. "
+                    "Briefly let the user know, without reading out its output unless it failed."
+                )
+            )
+        except Exception:
+            logger.exception(f"Could not announce completion of job {self.id}")
+
+    async def kill(self) -> None:
+        if self.status != "running":
+            return
+        self.status = "killed"
+        if self.process is not None:
+            await kill_tree(self.process)
+        await self.done.wait()
+
+
+def describe_status(job: Job) -> str:
+    if job.status == "running":
+        return f"been running for {job.elapsed():.0f}s"
+    if job.status == "killed":
+        return f"been stopped after {job.elapsed():.0f}s"
+    return f"finished with exit code {job.exit_code} after {job.elapsed():.0f}s"
+
+
+def _forget_finished() -> None:
+    finished = [job for job in _jobs.values() if job.status != "running"]
+    for job in finished[:-MAX_FINISHED]:
+        _jobs.pop(job.id, None)
+        shutil.rmtree(job.dir, ignore_errors=True)
+
+
+def start_job(command: str, name: str = "", cwd: Optional[str] = None, session: Any = None) -> Job:
+    """
+    Starts `command` in the background on the running event loop and returns immediately.
+    """
+
+    running = [job for job in _jobs.values() if job.status == "running"]
+    if len(running) >= MAX_RUNNING:
+        raise RuntimeError(f"{MAX_RUNNING} jobs are already running; wait for one or stop it first.")
+
+    _forget_finished()
+    job = Job(command, name, cwd, session)
+    _jobs[job.id] = job
+    job.task = asyncio.get_running_loop().create_task(job._run())
+    return job
+
+
+async def stop_session_jobs(session: Any) -> None:
+    """
+    Kills the jobs started from `session` that are still running, e.g. when its conversation ends.
+    """
+
+    jobs = [
+        job for job in _jobs.values()
+        if job.status == "running" and job._session is not None and job._session() is session
+    ]
+    for job in jobs:
+        logger.warning(f"Stopping job {job.id} ({job.name}) because its session ended")
+    await asyncio.gather(*(job.kill() for job in jobs), return_exceptions=True)
+
+
+def get_job(job_id: int) -> Optional[Job]:
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> List[Job]:
+    return list(_jobs.values())
+
+
+def _tail(job: Job, lines: int, max_chars: int = 2000) -> str:
+    try:
+        text = read_lines(str(job.log_path), -max(1, lines), max_chars=max_chars)["text"]
+    except (OSError, ValueError):
+        return ""
+    return text.rstrip()
+
+
+def _describe(job: Job) -> str:
+    return f"Job {job.id} '{job.name}' has {describe_status(job)} ({job.log.total:,} bytes of output)"
+
+
+@function_tool()
+async def start_background_job(context: RunContext, command: str, name: str = "", folder: str = "") -> str:
+    """
+    Starts a long-running shell command, such as a build, backup or download, in the background
+    and returns right away. The user is told when it finishes. Use run_command for quick commands.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        command (str): The shell command to run.
+        name (str, optional): A short name to refer to the job by, e.g. "backup".
+        folder (str, optional): The folder to run the command in. Defaults to the agent's folder.
+    Returns:
+        str: The job id to use with job_status, job_output, wait_for_job and stop_job, or an error message.
+    """
+
+    try:
+        cwd = None
+        if folder:
+            cwd = str(expand_path(folder))
+            if not os.path.isdir(cwd):
+                return describe_missing(Path(cwd), "Folder")
+
+        job = start_job(command, name, cwd, getattr(context, "session", None))
+        logger.info(f"Started job {job.id}: {command}")
+        return f"Started job {job.id} ('{job.name}') in the background."
+    except RuntimeError as e:
+        return str(e)
+    except Exception:
+        logger.exception(f"Could not start job: {command}")
+        return f"Could not start the job: {command}"
+
+
+@function_tool()
+async def job_status(context: RunContext, job_id: int = 0) -> str:
+    """
+    Reports whether background jobs are still running, how long they have run and their exit codes.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        job_id (int, optional): The job to report on. 0 reports all recent jobs.
+    Returns:
+        str: One line per job, or a message if there are none.
+    """
+
+    if job_id:
+        job = get_job(job_id)
+        if job is None:
+            return f"No job with id {job_id}"
+        return _describe(job)
+
+    jobs = list_jobs()
+    if not jobs:
+        return "No background jobs"
+    return "\n".join(_describe(job) for job in jobs)
+
+
+@function_tool()
+async def job_output(context: RunContext, job_id: int, lines: int = 20) -> str:
+    """
+    Shows the most recent output lines of a background job.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        job_id (int): The job to show output for.
+        lines (int, optional): How many of the last lines to show. Defaults to 20.
+    Returns:
+        str: The job's status followed by its latest output lines.
+    """
+
+    job = get_job(job_id)
+    if job is None:
+        return f"No job with id {job_id}"
+
+    tail = await asyncio.to_thread(_tail, job, min(lines, 200))
+    return _describe(job) + (f". Last output:\n{tail}" if tail else ". No output yet.")
+
+
+@function_tool()
+async def wait_for_job(context: RunContext, job_id: int, timeout: float = DEFAULT_WAIT) -> str:
+    """
+    Waits up to `timeout` seconds for a background job to finish.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        job_id (int): The job to wait for.
+        timeout (float, optional): Maximum seconds to wait. Defaults to 30.
+    Returns:
+        str: The job's final status and last output lines, or its progress if it is still running.
+    """
+
+    job = get_job(job_id)
+    if job is None:
+        return f"No job with id {job_id}"
+
+    try:
+        await asyncio.wait_for(asyncio.shield(job.done.wait()), max(0.0, min(timeout, 300)))
+    except asyncio.TimeoutError:
+        return _describe(job) + ". Still running."
+
+    tail = await asyncio.to_thread(_tail, job, 10)
+    return _describe(job) + (f". Last output:\n{tail}" if tail else ".")
+
+
+@function_tool()
+async def stop_job(context: RunContext, job_id: int) -> str:
+    """
+    Stops a running background job and everything it started.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        job_id (int): The job to stop.
+    Returns:
+        str: A confirmation, or a message if the job is not running.
+    """
+
+    job = get_job(job_id)
+    if job is None:
+        return f"No job with id {job_id}"
+    if job.status != "running":
+        return _describe(job)
+
+    try:
+        await job.kill()
+        logger.warning(f"Stopped job {job.id}: {job.command}")
+        return _describe(job)
+    except Exception:
+        logger.exception(f"Could not stop job {job_id}")
+        return f"Could not stop job {job_id}"
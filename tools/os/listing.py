@@ -0,0 +1,180 @@
+import base64
+import fnmatch
+import heapq
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger("JARVIS.OS.Listing")
+
+SORT_KEYS = ("name", "size", "modified", "type")
+KINDS = ("any", "file", "folder")
+
+# Upper bound on entries returned per page, whatever the token budget allows
+MAX_PAGE = 200
+
+
+def _entry_kind(entry: os.DirEntry) -> str:
+    try:
+        if entry.is_dir():
+            return "folder"
+        if entry.is_file():
+            return "file"
+    except OSError:
+        pass
+    return "other"
+
+
+def _stat(entry: os.DirEntry) -> Tuple[int, float]:
+    try:
+        st = entry.stat()
+        return st.st_size, st.st_mtime
+    except OSError:
+        # Dangling symlinks and entries removed mid-scan still get listed
+        return 0, 0.0
+
+
+def _stat_path(path: str) -> Tuple[int, float]:
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    except OSError:
+        return 0, 0.0
+
+
+def _sort_key(sort: str, item: Dict[str, Any]) -> Tuple:
+    name = item["name"]
+    if sort == "size":
+        return (item["size"], name.lower(), name)
+    if sort == "modified":
+        return (item["mtime"], name.lower(), name)
+    if sort == "type":
+        # Folders first, then files grouped by extension
+        return (item["kind"] != "folder", os.path.splitext(name)[1].lower(), name.lower(), name)
+    return (name.lower(), name)
+
+
+def cursor_after(item: Dict[str, Any], sort: str, descending: bool) -> str:
+    """
+    Returns an opaque cursor that resumes the listing just after `item`.
+    """
+
+    raw = json.dumps([sort, descending, list(_sort_key(sort, item))], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Optional[Tuple]:
+    """
+    Returns the sort key a page ended on, or None if the cursor is malformed
+    or was issued for a different ordering.
+    """
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_desc, key = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    if cursor_sort != sort or cursor_desc != descending:
+        return None
+    return tuple(key)
+
+
+def scan_directory(
+    path: str,
+    pattern: str = "",
+    kind: str = "any",
+    modified_after: Optional[float] = None,
+    modified_before: Optional[float] = None,
+    include_hidden: bool = False,
+    need_stat: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the entries of one directory that pass the filters.
+    Types come from the directory listing itself; `stat` is only called when
+    `need_stat` is set or a date filter requires it, so name-ordered listings
+    of huge folders stay cheap.
+    """
+
+    pattern = pattern.lower()
+    dated = modified_after is not None or modified_before is not None
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name = entry.name
+            if not include_hidden and name.startswith("."):
+                continue
+            if pattern and not fnmatch.fnmatchcase(name.lower(), pattern):
+                continue
+
+            entry_kind = _entry_kind(entry)
+            if kind != "any" and entry_kind != kind:
+                continue
+
+            item = {"name": name, "path": entry.path, "kind": entry_kind, "size": None, "mtime": None}
+            if need_stat or dated:
+                item["size"], item["mtime"] = _stat(entry)
+                if modified_after is not None and item["mtime"] < modified_after:
+                    continue
+                if modified_before is not None and item["mtime"] > modified_before:
+                    continue
+
+            yield item
+
+
+def list_page(
+    path: str,
+    sort: str = "name",
+    descending: bool = False,
+    cursor: str = "",
+    limit: int = MAX_PAGE,
+    **filters: Any,
+) -> Dict[str, Any]:
+    """
+    Returns one page of a directory listing in the requested order.
+    Pages are keyed on the sort value of the last entry returned rather than
+    an offset, so files created or deleted between calls do not shift later
+    pages. Only the page itself is kept in memory: entries after the cursor
+    are streamed through a bounded heap.
+    Returns:
+        dict: `entries`, `total` (entries matching the filters), `position`
+              (index of the first entry on this page) and `has_more`.
+    """
+
+    after = decode_cursor(cursor, sort, descending) if cursor else None
+    if cursor and after is None:
+        raise ValueError("The cursor does not match this listing; start again without it.")
+
+    # Name and type order can be decided from the listing alone; stat only the page
+    name_ordered = sort in ("name", "type")
+    limit = max(1, min(limit, MAX_PAGE))
+
+    counts = {"total": 0, "skipped": 0}
+
+    def remaining():
+        for item in scan_directory(path, need_stat=not name_ordered, **filters):
+            counts["total"] += 1
+            key = _sort_key(sort, item)
+            if after is not None and (key >= after if descending else key <= after):
+                counts["skipped"] += 1
+                continue
+            yield key, item
+
+    # One more than the page so the caller knows whether anything follows
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    page = pick(limit + 1, remaining(), key=lambda pair: pair[0])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    entries = []
+    for _, item in page:
+        if item["size"] is None:
+            item["size"], item["mtime"] = _stat_path(item["path"])
+        entries.append(item)
+
+    return {
+        "entries": entries,
+        "total": counts["total"],
+        "position": counts["skipped"],
+        "has_more": has_more,
+    }
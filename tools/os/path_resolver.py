@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger("JARVIS.OS.Paths")
+
+HOME = str(Path.home())
+
+COMMON_PATHS = {
+    "desktop": str(Path.home() / "Desktop"),
+    "downloads": str(Path.home() / "Downloads"),
+    "documents": str(Path.home() / "Documents"),
+}
+
+MAX_DEPTH = 5
+MAX_ENTRIES = 300_000
+REFRESH_INTERVAL = 300
+# A fuzzy match is only used in place of the spoken path when it scores at least this
+MIN_SCORE = 0.55
+# Candidates are gathered from the rarest query trigrams only
+SEED_TRIGRAMS = 4
+MAX_CANDIDATES = 5000
+
+SKIP_NAMES = {"node_modules", "__pycache__", "venv", ".venv", "site-packages", "Library", "AppData"}
+
+_NORMALIZE_RE = re.compile(r"[^0-9a-z]+")
+
+
+def _normalize(text: str) -> str:
+    # Spoken paths drop punctuation and merge or split words freely, so compare without separators
+    return _NORMALIZE_RE.sub("", text.lower())
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class PathIndex:
+    """
+    In-memory trigram index of file and folder names under the home directory.
+    Each entry is indexed twice, by its name and by its parent and name
+    together, so "project cortex" matches ~/Projects/Cortex-OS. The index is
+    rebuilt off the request path and swapped in whole, so lookups never wait
+    on a rebuild.
+    """
+
+    def __init__(self, root: str = HOME, max_depth: int = MAX_DEPTH, max_entries: int = MAX_ENTRIES):
+        self.root = root
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self.built_at: Optional[float] = None
+        self.generation = 0
+
+        self._paths: List[str] = []
+        self._depths: List[int] = []
+        self._grams: List[Tuple[FrozenSet[str], FrozenSet[str]]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+        self._build_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _walk(self) -> List[Tuple[str, int]]:
+        found = []
+        stack = [(self.root, 0)]
+        while stack and len(found) < self.max_entries:
+            directory, depth = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(".") or entry.name in SKIP_NAMES:
+                            continue
+                        found.append((entry.path, depth + 1))
+                        try:
+                            if depth + 1 < self.max_depth and entry.is_dir(follow_symlinks=False):
+                                stack.append((entry.path, depth + 1))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+
+    def build(self) -> None:
+        """
+        Walks the home directory and replaces the index. Blocking.
+        """
+
+        if not self._build_lock.acquire(blocking=False):
+            return
+
+        try:
+            started = time.perf_counter()
+            paths, depths, grams = [], [], []
+            postings: Dict[str, List[int]] = {}
+
+            for i, (path, depth) in enumerate(self._walk()):
+                parent, name = os.path.split(path)
+                name_grams = _trigrams(_normalize(name))
+                pair_grams = _trigrams(_normalize(os.path.basename(parent) + name))
+
+                paths.append(path)
+                depths.append(depth)
+                grams.append((name_grams, pair_grams))
+                for gram in name_grams | pair_grams:
+                    postings.setdefault(gram, []).append(i)
+
+            self._paths, self._depths, self._grams, self._postings = paths, depths, grams, postings
+            self.built_at = time.time()
+            self.generation += 1
+            logger.info(f"Indexed {len(paths)} paths under {self.root} in {time.perf_counter() - started:.2f}s")
+        finally:
+            self._build_lock.release()
+
+    def build_in_background(self) -> None:
+        if not self._build_lock.locked():
+            threading.Thread(target=self.build, name="path-index", daemon=True).start()
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Ranks indexed paths against a spoken or mistyped path.
+        Only the last two components of `query` are compared. Scores are
+        Dice coefficients over trigrams, from 0 to 1, with a small penalty
+        for deeply nested entries.
+        """
+
+        return list(_search(self, self.generation, query, limit))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.build)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Path index refresh failed")
+            await asyncio.sleep(REFRESH_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Starts periodic background refreshes on the running event loop if they are not already running.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+@lru_cache(maxsize=512)
+def _search(index: PathIndex, generation: int, query: str, limit: int) -> Tuple[Tuple[str, float], ...]:
+    # `generation` is part of the cache key so results are dropped after each rebuild
+    parts = [p for p in re.split(r"[\\/]+", query) if p]
+    if not parts:
+        return ()
+
+    name_query = _trigrams(_normalize(parts[-1]))
+    pair_query = _trigrams(_normalize("".join(parts[-2:])))
+
+    seeds = sorted(
+        (g for g in name_query | pair_query if g in index._postings),
+        key=lambda g: len(index._postings[g]),
+    )
+    candidates = set()
+    for gram in seeds[:SEED_TRIGRAMS]:
+        candidates.update(index._postings[gram][:MAX_CANDIDATES])
+
+    scored = []
+    for i in candidates:
+        name_grams, pair_grams = index._grams[i]
+        score = max(
+            2 * len(name_query & name_grams) / (len(name_query) + len(name_grams)),
+            2 * len(pair_query & pair_grams) / (len(pair_query) + len(pair_grams)),
+            2 * len(name_query & pair_grams) / (len(name_query) + len(pair_grams)),
+        )
+        scored.append((index._paths[i], round(score - 0.01 * index._depths[i], 3)))
+
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return tuple(scored[:limit])
+
+
+_index: Optional[PathIndex] = None
+
+
+def get_path_index() -> PathIndex:
+    """
+    Returns the shared index of names under the home directory, creating it on first use.
+    """
+
+    global _index
+    if _index is None:
+        _index = PathIndex()
+    return _index
+
+
+def expand_path(path: str) -> Path:
+    """
+    Applies only the exact rules: placeholder usernames, `COMMON_PATHS` aliases
+    and `~`. Used directly where guessing would be unsafe, such as deletes.
+    """
+
+    lowered = path.lower().strip()
+
+    for placeholder in ("/users/yourusername", "/users/your_username", "/home/yourusername", "/home/your_username"):
+        if lowered.startswith(placeholder):
+            path = HOME + path.strip()[len(placeholder):]
+            break
+
+    if lowered in COMMON_PATHS:
+        return Path(COMMON_PATHS[lowered])
+
+    first, _, rest = path.strip().partition("/")
+    if first.lower() in COMMON_PATHS and rest:
+        return Path(COMMON_PATHS[first.lower()]) / rest
+
+    return Path(os.path.expanduser(path.strip())).resolve()
+
+
+def _query_for(path: Path) -> str:
+    try:
+        return str(path.relative_to(HOME))
+    except ValueError:
+        return str(path)
+
+
+def suggest_paths(path: str, limit: int = 3) -> List[str]:
+    """
+    Returns existing paths that best match a path that could not be found, best first.
+    Empty while the index is still being built.
+    """
+
+    index = get_path_index()
+    if index.built_at is None:
+        index.build_in_background()
+        return []
+    return [p for p, _ in index.search(_query_for(expand_path(path)), limit)]
+
+
+def _best_match(path: Path) -> Optional[Path]:
+    index = get_path_index()
+    if index.built_at is None:
+        index.build_in_background()
+        return None
+
+    matches = index.search(_query_for(path), 1)
+    if matches and matches[0][1] >= MIN_SCORE:
+        logger.info(f"Resolved '{path}' to '{matches[0][0]}' (score {matches[0][1]})")
+        return Path(matches[0][0])
+    return None
+
+
+def resolve_path(path: str) -> Path:
+    """
+    Resolves a spoken or typed path to an absolute path.
+    Exact rules are applied first: placeholder usernames, `COMMON_PATHS`
+    aliases such as "downloads", and `~`. If the result does not exist, the
+    closest name under the home directory is used instead, provided it is a
+    confident match. Only for opening, listing and searching: anything that
+    reads or changes a file uses `expand_path`, and callers report the
+    substitution with `substitution_note`.
+    Args:
+        path (str): The input path string to resolve.
+    Returns:
+        Path: The resolved absolute path.
+    """
+
+    resolved = expand_path(path)
+    if resolved.exists():
+        return resolved
+    return _best_match(resolved) or resolved
+
+
+def substitution_note(path: str, resolved: Path) -> str:
+    """
+    Says which path was used when `resolve_path` replaced `path` with a
+    close match, so a reply never silently refers to a different file.
+    Empty when the path was used as given.
+    """
+
+    requested = expand_path(path)
+    if requested == resolved:
+        return ""
+    return f"{requested} does not exist; using the closest match, {resolved}."
+
+
+def describe_missing(path: Path, kind: str = "File or folder") -> str:
+    """
+    Builds a not-found message that offers the closest existing paths.
+    """
+
+    suggestions = suggest_paths(str(path))
+    message = f"{kind} does not exist: {path}"
+    if suggestions:
+        message += ". Did you mean: " + ", ".join(suggestions) + "?"
+    return message
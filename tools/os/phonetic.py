@@ -0,0 +1,369 @@
+import re
+from typing import Tuple
+
+MAX_CODE = 4
+
+_VOWELS = "AEIOUY"
+_NON_LETTERS_RE = re.compile(r"[^A-ZÇÑ]")
+
+
+def double_metaphone(word: str) -> Tuple[str, str]:
+    """
+    Lawrence Philips' Double Metaphone. Returns a primary and a secondary
+    phonetic key of up to four characters ("0" stands for "th", "X" for
+    "sh"/"ch"); words that sound alike share at least one key, so speech
+    recognition spellings like "spotifai" and "spotify" compare equal.
+    The secondary key is the same as the primary when there is no
+    alternative pronunciation.
+    """
+
+    word = _NON_LETTERS_RE.sub("", word.upper())
+    length = len(word)
+    if not length:
+        return "", ""
+
+    # Padding lets lookahead run past the end without bounds checks
+    w = word + "     "
+    last = length - 1
+    slavo_germanic = any(s in word for s in ("W", "K", "CZ", "WITZ"))
+    primary, secondary = [], []
+
+    def at(pos: int, *subs: str) -> bool:
+        if pos < 0:
+            return False
+        return any(w[pos:pos + len(s)] == s for s in subs)
+
+    def vowel(pos: int) -> bool:
+        return 0 <= pos < len(w) and w[pos] in _VOWELS
+
+    def add(main: str, alt: str = None) -> None:
+        primary.append(main)
+        secondary.append(main if alt is None else alt)
+
+    current = 0
+    if at(0, "GN", "KN", "PN", "WR", "PS"):
+        current = 1
+    if w[0] == "X":
+        # "Xavier" starts with an S sound
+        add("S")
+        current = 1
+
+    while current < length and (len("".join(primary)) < MAX_CODE or len("".join(secondary)) < MAX_CODE):
+        c = w[current]
+
+        if c in _VOWELS:
+            if current == 0:
+                add("A")
+            current += 1
+
+        elif c == "B":
+            add("P")
+            current += 2 if w[current + 1] == "B" else 1
+
+        elif c == "Ç":
+            add("S")
+            current += 1
+
+        elif c == "C":
+            if (current > 1 and not vowel(current - 2) and at(current - 1, "ACH")
+                    and w[current + 2] != "I" and (w[current + 2] != "E" or at(current - 2, "BACHER", "MACHER"))):
+                add("K")
+                current += 2
+            elif current == 0 and at(current, "CAESAR"):
+                add("S")
+                current += 2
+            elif at(current, "CHIA"):
+                add("K")
+                current += 2
+            elif at(current, "CH"):
+                if current > 0 and at(current, "CHAE"):
+                    add("K", "X")
+                elif (current == 0 and (at(current + 1, "HARAC", "HARIS") or at(current + 1, "HOR", "HYM", "HIA", "HEM"))
+                        and not at(0, "CHORE")):
+                    add("K")
+                elif (at(0, "VAN ", "VON ", "SCH") or at(current - 2, "ORCHES", "ARCHIT", "ORCHID")
+                        or at(current + 2, "T", "S")
+                        or ((at(current - 1, "A", "O", "U", "E") or current == 0)
+                            and at(current + 2, "L", "R", "N", "M", "B", "H", "F", "V", "W", " "))):
+                    add("K")
+                elif current > 0:
+                    if at(0, "MC"):
+                        add("K")
+                    else:
+                        add("X", "K")
+                else:
+                    add("X")
+                current += 2
+            elif at(current, "CZ") and not at(current - 2, "WICZ"):
+                add("S", "X")
+                current += 2
+            elif at(current + 1, "CIA"):
+                add("X")
+                current += 3
+            elif at(current, "CC") and not (current == 1 and w[0] == "M"):
+                if at(current + 2, "I", "E", "H") and not at(current + 2, "HU"):
+                    if (current == 1 and w[0] == "A") or at(current - 1, "UCCEE", "UCCES"):
+                        add("KS")
+                    else:
+                        add("X")
+                    current += 3
+                else:
+                    add("K")
+                    current += 2
+            elif at(current, "CK", "CG", "CQ"):
+                add("K")
+                current += 2
+            elif at(current, "CI", "CE", "CY"):
+                if at(current, "CIO", "CIE", "CIA"):
+                    add("S", "X")
+                else:
+                    add("S")
+                current += 2
+            else:
+                add("K")
+                if at(current + 1, " C", " Q", " G"):
+                    current += 3
+                elif at(current + 1, "C", "K", "Q") and not at(current + 1, "CE", "CI"):
+                    current += 2
+                else:
+                    current += 1
+
+        elif c == "D":
+            if at(current, "DG"):
+                if at(current + 2, "I", "E", "Y"):
+                    add("J")
+                    current += 3
+                else:
+                    add("TK")
+                    current += 2
+            elif at(current, "DT", "DD"):
+                add("T")
+                current += 2
+            else:
+                add("T")
+                current += 1
+
+        elif c == "F":
+            add("F")
+            current += 2 if w[current + 1] == "F" else 1
+
+        elif c == "G":
+            if w[current + 1] == "H":
+                if current > 0 and not vowel(current - 1):
+                    add("K")
+                elif current == 0:
+                    add("J" if w[current + 2] == "I" else "K")
+                elif ((current > 1 and at(current - 2, "B", "H", "D"))
+                        or (current > 2 and at(current - 3, "B", "H", "D"))
+                        or (current > 3 and at(current - 4, "B", "H"))):
+                    pass
+                elif current > 2 and w[current - 1] == "U" and at(current - 3, "C", "G", "L", "R", "T"):
+                    add("F")
+                elif current > 0 and w[current - 1] != "I":
+                    add("K")
+                current += 2
+            elif w[current + 1] == "N":
+                if current == 1 and vowel(0) and not slavo_germanic:
+                    add("KN", "N")
+                elif not at(current + 2, "EY") and w[current + 1] != "Y" and not slavo_germanic:
+                    add("N", "KN")
+                else:
+                    add("KN")
+                current += 2
+            elif at(current + 1, "LI") and not slavo_germanic:
+                add("KL", "L")
+                current += 2
+            elif current == 0 and (w[1] == "Y" or at(1, "ES", "EP", "EB", "EL", "EY", "IB", "IL", "IN", "IE", "EI", "ER")):
+                add("K", "J")
+                current += 2
+            elif ((at(current + 1, "ER") or w[current + 1] == "Y")
+                    and not at(0, "DANGER", "RANGER", "MANGER")
+                    and not at(current - 1, "E", "I") and not at(current - 1, "RGY", "OGY")):
+                add("K", "J")
+                current += 2
+            elif at(current + 1, "E", "I", "Y") or at(current - 1, "AGGI", "OGGI"):
+                if at(0, "VAN ", "VON ", "SCH") or at(current + 1, "ET"):
+                    add("K")
+                elif at(current + 1, "IER "):
+                    add("J")
+                else:
+                    add("J", "K")
+                current += 2
+            else:
+                add("K")
+                current += 2 if w[current + 1] == "G" else 1
+
+        elif c == "H":
+            if (current == 0 or vowel(current - 1)) and vowel(current + 1):
+                add("H")
+                current += 2
+            else:
+                current += 1
+
+        elif c == "J":
+            if at(current, "JOSE") or at(0, "SAN "):
+                if (current == 0 and w[current + 4] == " ") or at(0, "SAN "):
+                    add("H")
+                else:
+                    add("J", "H")
+                current += 1
+            else:
+                if current == 0:
+                    add("J", "A")
+                elif vowel(current - 1) and not slavo_germanic and w[current + 1] in "AO":
+                    add("J", "H")
+                elif current == last:
+                    add("J", "")
+                elif not at(current + 1, "L", "T", "K", "S", "N", "M", "B", "Z") and not at(current - 1, "S", "K", "L"):
+                    add("J")
+                current += 2 if w[current + 1] == "J" else 1
+
+        elif c == "K":
+            add("K")
+            current += 2 if w[current + 1] == "K" else 1
+
+        elif c == "L":
+            if w[current + 1] == "L":
+                if ((current == length - 3 and at(current - 1, "ILLO", "ILLA", "ALLE"))
+                        or ((at(last - 1, "AS", "OS") or at(last, "A", "O")) and at(current - 1, "ALLE"))):
+                    add("L", "")
+                else:
+                    add("L")
+                current += 2
+            else:
+                add("L")
+                current += 1
+
+        elif c == "M":
+            add("M")
+            if (at(current - 1, "UMB") and (current + 1 == last or at(current + 2, "ER"))) or w[current + 1] == "M":
+                current += 2
+            else:
+                current += 1
+
+        elif c == "N":
+            add("N")
+            current += 2 if w[current + 1] == "N" else 1
+
+        elif c == "Ñ":
+            add("N")
+            current += 1
+
+        elif c == "P":
+            if w[current + 1] == "H":
+                add("F")
+                current += 2
+            else:
+                add("P")
+                current += 2 if w[current + 1] in "PB" else 1
+
+        elif c == "Q":
+            add("K")
+            current += 2 if w[current + 1] == "Q" else 1
+
+        elif c == "R":
+            if current == last and not slavo_germanic and at(current - 2, "IE") and not at(current - 4, "ME", "MA"):
+                add("", "R")
+            else:
+                add("R")
+            current += 2 if w[current + 1] == "R" else 1
+
+        elif c == "S":
+            if at(current - 1, "ISL", "YSL"):
+                current += 1
+            elif current == 0 and at(current, "SUGAR"):
+                add("X", "S")
+                current += 1
+            elif at(current, "SH"):
+                add("S" if at(current + 1, "HEIM", "HOEK", "HOLM", "HOLZ") else "X")
+                current += 2
+            elif at(current, "SIO", "SIA", "SIAN"):
+                if slavo_germanic:
+                    add("S")
+                else:
+                    add("S", "X")
+                current += 3
+            elif (current == 0 and at(current + 1, "M", "N", "L", "W")) or at(current + 1, "Z"):
+                add("S", "X")
+                current += 2 if at(current + 1, "Z") else 1
+            elif at(current, "SC"):
+                if w[current + 2] == "H":
+                    if at(current + 3, "OO", "ER", "EN", "UY", "ED", "EM"):
+                        if at(current + 3, "ER", "EN"):
+                            add("X", "SK")
+                        else:
+                            add("SK")
+                    elif current == 0 and not vowel(3) and w[3] != "W":
+                        add("X", "S")
+                    else:
+                        add("X")
+                elif at(current + 2, "I", "E", "Y"):
+                    add("S")
+                else:
+                    add("SK")
+                current += 3
+            else:
+                if current == last and at(current - 2, "AI", "OI"):
+                    add("", "S")
+                else:
+                    add("S")
+                current += 2 if w[current + 1] in "SZ" else 1
+
+        elif c == "T":
+            if at(current, "TION", "TIA", "TCH"):
+                add("X")
+                current += 3
+            elif at(current, "TH", "TTH"):
+                if at(current + 2, "OM", "AM") or at(0, "VAN ", "VON ", "SCH"):
+                    add("T")
+                else:
+                    add("0", "T")
+                current += 2
+            else:
+                add("T")
+                current += 2 if w[current + 1] in "TD" else 1
+
+        elif c == "V":
+            add("F")
+            current += 2 if w[current + 1] == "V" else 1
+
+        elif c == "W":
+            if at(current, "WR"):
+                add("R")
+                current += 2
+                continue
+            if current == 0 and (vowel(current + 1) or at(current, "WH")):
+                if vowel(current + 1):
+                    add("A", "F")
+                else:
+                    add("A")
+            if ((current == last and vowel(current - 1)) or at(current - 1, "EWSKI", "EWSKY", "OWSKI", "OWSKY")
+                    or at(0, "SCH")):
+                add("", "F")
+                current += 1
+            elif at(current, "WICZ", "WITZ"):
+                add("TS", "FX")
+                current += 4
+            else:
+                current += 1
+
+        elif c == "X":
+            if not (current == last and (at(current - 3, "IAU", "EAU") or at(current - 2, "AU", "OU"))):
+                add("KS")
+            current += 2 if w[current + 1] in "CX" else 1
+
+        elif c == "Z":
+            if w[current + 1] == "H":
+                add("J")
+                current += 2
+            else:
+                if at(current + 1, "ZO", "ZI", "ZA") or (slavo_germanic and current > 0 and w[current - 1] != "T"):
+                    add("S", "TS")
+                else:
+                    add("S")
+                current += 2 if w[current + 1] == "Z" else 1
+
+        else:
+            current += 1
+
+    return "".join(primary)[:MAX_CODE], "".join(secondary)[:MAX_CODE]
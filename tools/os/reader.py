@@ -0,0 +1,285 @@
+import codecs
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+try:
+    from charset_normalizer import from_bytes as _detect_charset
+except ImportError:
+    _detect_charset = None
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 1024 * 1024
+SNIFF_BYTES = 64 * 1024
+# Line counting scans the file in blocks of this size
+SCAN_CHUNK = 1024 * 1024
+# Upper bound on bytes per character, used to size reads for a character budget
+MAX_CHAR_BYTES = 4
+
+# Mapped to BOM-less codecs: the mark is skipped at offset 0 and never
+# present mid-file, so slices anywhere in the file decode the same way
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+def sniff_encoding(prefix: bytes) -> Optional[str]:
+    """
+    Guesses the text encoding of a file from its first bytes.
+    Byte order marks win; otherwise UTF-8 is tried (tolerating a character
+    cut off at the end of the prefix), then charset detection.
+    Returns:
+        Optional[str]: A codec name, or None if the prefix looks binary.
+    """
+
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    if b"\x00" in prefix:
+        return None
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    if _detect_charset is not None:
+        match = _detect_charset(prefix).best()
+        if match is not None:
+            return match.encoding
+
+    return "latin-1"
+
+
+@contextmanager
+def _open_view(path: str) -> Iterator[Buffer]:
+    """
+    Yields a read-only byte view of a file: a memory map for large files so
+    only the pages actually touched are read, plain bytes for small ones.
+    """
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield view
+        finally:
+            view.close()
+
+
+def _codec_unit(encoding: str) -> int:
+    name = codecs.lookup(encoding).name
+    if name.startswith("utf-32"):
+        return 4
+    if name.startswith("utf-16"):
+        return 2
+    return 1
+
+
+def _newline(encoding: str) -> bytes:
+    return "\n".encode(encoding)
+
+
+def _align_start(view: Buffer, start: int, encoding: str) -> int:
+    """
+    Moves a byte offset forward to the next character boundary so decoding
+    never starts in the middle of a multi-byte character.
+    """
+
+    unit = _codec_unit(encoding)
+    if unit > 1:
+        return start + (-start % unit)
+
+    if codecs.lookup(encoding).name == "utf-8":
+        end = min(start + 3, len(view))
+        while start < end and 0x80 <= view[start] <= 0xBF:
+            start += 1
+    return start
+
+
+def _skip_lines(view: Buffer, start: int, count: int, newline: bytes) -> int:
+    """
+    Returns the offset just past the `count`-th newline at or after `start`,
+    or -1 if the file has fewer lines. Whole blocks are skipped with a
+    single count so only the block holding the target line is searched.
+    """
+
+    step = len(newline)
+    size = len(view)
+    while start < size:
+        chunk = bytes(view[start:start + SCAN_CHUNK])
+        found = chunk.count(newline)
+        if found < count:
+            count -= found
+            start += len(chunk)
+            continue
+
+        pos = 0
+        for _ in range(count):
+            pos = chunk.find(newline, pos) + step
+        return start + pos
+
+    return -1
+
+
+def _decode(data: bytes, encoding: str, max_chars: int) -> Tuple[str, int]:
+    """
+    Decodes up to `max_chars` characters from the front of `data`.
+    Returns:
+        Tuple: The text and how many bytes of `data` it consumed.
+    """
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    text = decoder.decode(data, final=False)
+    if len(text) <= max_chars:
+        pending = len(decoder.getstate()[0])
+        return text, len(data) - pending
+
+    text = text[:max_chars]
+    return text, len(text.encode(encoding, errors="replace"))
+
+
+def _result(text: str, start: int, end: int, size: int, encoding: Optional[str], **extra: Any) -> Dict[str, Any]:
+    return {"text": text, "start": start, "end": end, "size": size, "encoding": encoding, **extra}
+
+
+def _skip_bom(view: Buffer, start: int, encoding: str) -> int:
+    if start == 0:
+        for bom, name in _BOMS:
+            if name == codecs.lookup(encoding).name and view[:len(bom)] == bom:
+                return len(bom)
+    return start
+
+
+def read_range(path: str, offset: int = 0, max_chars: int = 4000, encoding: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decodes at most `max_chars` characters starting at byte `offset`.
+    Reads no more than `max_chars * 4` bytes regardless of file size.
+    A negative offset counts back from the end of the file.
+    Returns:
+        Dict: text, the byte range it came from (start, end), the file size
+        and the encoding used. `encoding` is None for binary files.
+    """
+
+    with _open_view(path) as view:
+        size = len(view)
+        encoding = encoding or sniff_encoding(bytes(view[:SNIFF_BYTES]))
+        if encoding is None:
+            return _result("", 0, 0, size, None)
+
+        start = max(size + offset, 0) if offset < 0 else min(offset, size)
+        start = _align_start(view, _skip_bom(view, start, encoding), encoding)
+        data = bytes(view[start:start + max_chars * MAX_CHAR_BYTES])
+
+    text, consumed = _decode(data, encoding, max_chars)
+    return _result(text, start, start + consumed, size, encoding)
+
+
+def read_tail(path: str, max_chars: int = 4000, encoding: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decodes the last `max_chars` characters of a file by seeking from the end.
+    """
+
+    with _open_view(path) as view:
+        size = len(view)
+        encoding = encoding or sniff_encoding(bytes(view[:SNIFF_BYTES]))
+        if encoding is None:
+            return _result("", 0, 0, size, None)
+
+        start = max(size - max_chars * MAX_CHAR_BYTES, 0)
+        start = _align_start(view, _skip_bom(view, start, encoding), encoding)
+        data = bytes(view[start:size])
+
+    text = data.decode(encoding, errors="replace")[-max_chars:]
+    return _result(text, size - len(text.encode(encoding, errors="replace")), size, size, encoding)
+
+
+def read_lines(
+    path: str,
+    start_line: int,
+    end_line: Optional[int] = None,
+    max_chars: int = 4000,
+    encoding: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Returns lines `start_line` to `end_line` (1-based, inclusive).
+    A negative `start_line` selects that many lines from the end, scanning
+    backwards from the end of the file. Line boundaries are found by
+    searching the memory-mapped bytes, so only the selected lines are
+    decoded. Output is capped at `max_chars` characters; when the cap cuts
+    into the selection, the text ends on the last whole line that fits and
+    `last_line` is that line. `partial` is set when even the first line
+    does not fit and only its start is returned.
+    """
+
+    with _open_view(path) as view:
+        size = len(view)
+        encoding = encoding or sniff_encoding(bytes(view[:SNIFF_BYTES]))
+        if encoding is None:
+            return _result("", 0, 0, size, None, first_line=0, last_line=0, partial=False)
+
+        newline = _newline(encoding)
+        step = len(newline)
+        head = _skip_bom(view, 0, encoding)
+
+        if start_line < 0:
+            # Walk back over the trailing newline, then over N line breaks
+            end = size
+            pos = size - step if view[size - step:size] == newline else size
+            count = 0
+            while count < -start_line:
+                found = view.rfind(newline, head, pos)
+                if found < 0:
+                    pos = head - step
+                    break
+                pos = found
+                count += 1
+            start = pos + step
+            first_line, last_line = None, None
+        else:
+            start_line = max(start_line, 1)
+            start = _skip_lines(view, head, start_line - 1, newline) if start_line > 1 else head
+            if start < 0:
+                return _result(
+                    "", size, size, size, encoding, first_line=start_line, last_line=start_line - 1, partial=False
+                )
+
+            end, last_line = start, start_line - 1
+            while end < size and (end_line is None or last_line < end_line):
+                found = view.find(newline, end)
+                end = size if found < 0 else found + step
+                last_line += 1
+                # Stop scanning once the character budget is certainly exceeded
+                if end - start > max_chars * MAX_CHAR_BYTES:
+                    break
+            first_line = start_line
+
+        data = bytes(view[start:min(end, start + max_chars * MAX_CHAR_BYTES)])
+
+    text, consumed = _decode(data, encoding, max_chars)
+    partial = False
+    if first_line is not None and start + consumed < end:
+        cut = text.rfind("\n") + 1
+        if cut:
+            text = text[:cut]
+            consumed = len(text.encode(encoding, errors="replace"))
+        else:
+            partial = True
+        last_line = first_line + max(text.count("\n") - (text.endswith("\n")), 0)
+
+    return _result(
+        text, start, start + consumed, size, encoding, first_line=first_line, last_line=last_line, partial=partial
+    )
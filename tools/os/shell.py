@@ -0,0 +1,463 @@
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import time
+import uuid
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("JARVIS.OS.Shell")
+
+DEFAULT_TIMEOUT = 60
+# Seconds between SIGTERM and SIGKILL when stopping a command
+KILL_GRACE = 2
+# Output kept per stream: the start, and a ring buffer of the most recent bytes
+HEAD_BYTES = 1024
+TAIL_BYTES = 16 * 1024
+READ_BYTES = 64 * 1024
+# Background children can hold the pipes open after the shell exits
+DRAIN_TIMEOUT = 0.5
+# How often `wait_exit` checks for an exit that process.wait() has not reported
+EXIT_POLL = 0.05
+
+# Persistent shells are closed after this long without a command
+IDLE_TIMEOUT = 600
+REAP_INTERVAL = 60
+MAX_SHELLS = 8
+
+
+class OutputBuffer:
+    """
+    Bounded capture of one output stream. Keeps the first `HEAD_BYTES` and
+    the last `TAIL_BYTES` of everything written, plus the total count, so a
+    command printing gigabytes costs a fixed amount of memory.
+    """
+
+    def __init__(self, head: int = HEAD_BYTES, tail: int = TAIL_BYTES):
+        self.head_limit = head
+        self.tail_limit = tail
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        if len(self.head) < self.head_limit:
+            take = self.head_limit - len(self.head)
+            self.head += data[:take]
+            data = data[take:]
+        if not data:
+            return
+        if len(data) >= self.tail_limit:
+            self.tail[:] = data[-self.tail_limit:]
+        else:
+            self.tail += data
+            excess = len(self.tail) - self.tail_limit
+            if excess > 0:
+                del self.tail[:excess]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def text(self, max_chars: int) -> str:
+        """
+        Returns the captured output, keeping the end when it exceeds `max_chars`.
+        """
+
+        # Once bytes between head and tail were dropped, only the tail is continuous
+        data = self.tail if self.truncated else self.head + self.tail
+        return data.decode("utf-8", errors="replace")[-max_chars:]
+
+
+def process_group_kwargs() -> Dict[str, Any]:
+    # Own process group/session so the whole tree can be stopped, not just the shell
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _signal_tree(pid: int, force: bool) -> None:
+    if os.name == "nt":
+        args = ["taskkill", "/T", "/PID", str(pid)] + (["/F"] if force else [])
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL if force else signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+async def kill_tree(process: asyncio.subprocess.Process) -> None:
+    """
+    Stops a process started by `run_streaming` and everything it spawned:
+    SIGTERM to the group, then SIGKILL if it is still running after `KILL_GRACE`.
+    """
+
+    if process.returncode is not None:
+        # The shell is gone but its children may not be
+        await asyncio.to_thread(_signal_tree, process.pid, True)
+        return
+
+    await asyncio.to_thread(_signal_tree, process.pid, False)
+    try:
+        await asyncio.wait_for(process.wait(), KILL_GRACE)
+    except asyncio.TimeoutError:
+        pass
+    await asyncio.to_thread(_signal_tree, process.pid, True)
+    await process.wait()
+
+
+async def wait_exit(process: asyncio.subprocess.Process) -> int:
+    """
+    Waits for `process` itself to exit and returns its exit code.
+    Before Python 3.12 `process.wait()` also waits for the output pipes to
+    close, which never happens while a background child still holds them.
+    """
+
+    waiter = asyncio.ensure_future(process.wait())
+    try:
+        while not waiter.done() and process.returncode is None:
+            await asyncio.wait([waiter], timeout=EXIT_POLL)
+    finally:
+        waiter.cancel()
+    return process.returncode
+
+
+async def _pump(stream: asyncio.StreamReader, buffer: OutputBuffer) -> None:
+    while True:
+        data = await stream.read(READ_BYTES)
+        if not data:
+            return
+        buffer.write(data)
+
+
+async def run_streaming(
+    command: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    cwd: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Runs a shell command without blocking the event loop.
+    stdout and stderr are read as they are produced into bounded buffers.
+    When `timeout` expires, or the awaiting task is cancelled (run_command does
+    this when the user interrupts the reply), the command's whole process group
+    is killed.
+    Returns:
+        dict: `exit_code` (None if killed), `duration`, `timed_out`, and
+              `stdout` / `stderr` as `OutputBuffer`s.
+    """
+
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        **process_group_kwargs(),
+    )
+
+    stdout, stderr = OutputBuffer(), OutputBuffer()
+    readers = [
+        asyncio.ensure_future(_pump(process.stdout, stdout)),
+        asyncio.ensure_future(_pump(process.stderr, stderr)),
+    ]
+    timed_out = False
+
+    try:
+        try:
+            await asyncio.wait_for(wait_exit(process), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            logger.warning(f"Command timed out after {timeout}s, killing it: {command}")
+            await kill_tree(process)
+        await asyncio.wait(readers, timeout=DRAIN_TIMEOUT)
+    except asyncio.CancelledError:
+        logger.info(f"Command cancelled, killing it: {command}")
+        await asyncio.shield(kill_tree(process))
+        raise
+    finally:
+        for reader in readers:
+            reader.cancel()
+
+    return {
+        "exit_code": None if timed_out else process.returncode,
+        "duration": time.monotonic() - started,
+        "timed_out": timed_out,
+        "stdout": stdout,
+        "stderr": stderr,
+    }
+
+
+def format_result(result: Dict[str, Any], max_chars: int = 4000) -> str:
+    """
+    Summarises a command result for the model: exit status and duration,
+    then the end of stdout and of stderr, within about `max_chars`.
+    """
+
+    stdout, stderr = result["stdout"], result["stderr"]
+    if result["timed_out"]:
+        status = f"Timed out after {result['duration']:.1f}s and was stopped."
+    else:
+        status = f"Exit code {result['exit_code']} in {result['duration']:.1f}s."
+
+    # stderr is usually short and explains failures, so it gets its share first
+    err_chars = min(stderr.total, max_chars // 3) if stderr.total else 0
+    out_chars = max_chars - err_chars
+
+    parts = [status]
+    if stdout.total:
+        label = "Output" if not stdout.truncated and stdout.total <= out_chars else (
+            f"Output (last part of {stdout.total:,} bytes)"
+        )
+        parts.append(f"{label}:\n{stdout.text(out_chars).rstrip()}")
+    if stderr.total:
+        label = "Errors" if not stderr.truncated and stderr.total <= err_chars else (
+            f"Errors (last part of {stderr.total:,} bytes)"
+        )
+        parts.append(f"{label}:\n{stderr.text(err_chars).rstrip()}")
+    if not stdout.total and not stderr.total:
+        parts.append("No output.")
+    if result.get("restarted") or (result["timed_out"] and "restarted" in result):
+        parts.append("Note: the shell was restarted, so earlier cd and variables no longer apply.")
+    return "\n".join(parts)
+
+
+class ShellWorker:
+    """
+    A long-lived shell that runs commands one after another in the same
+    context, so `cd`, exported variables and functions carry over between
+    calls and no process is started per command. Each command is followed
+    by a random sentinel on stdout (carrying the exit status) and on
+    stderr, which marks where its output ends.
+    """
+
+    def __init__(self, shell: str):
+        self.shell = shell
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.last_used = time.monotonic()
+        self.commands = 0
+        self.lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def _spawn(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            self.shell,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **process_group_kwargs(),
+        )
+        self.commands = 0
+        logger.info(f"Started shell worker {self.process.pid} ({self.shell})")
+
+    async def _read_until(self, stream: asyncio.StreamReader, marker: bytes, buffer: OutputBuffer) -> bytes:
+        """
+        Copies `stream` into `buffer` up to `marker` and returns the rest of
+        the marker's line. Only a marker-sized tail is held back between
+        reads, so long outputs still stream into the bounded buffer.
+        """
+
+        pending = bytearray()
+        while True:
+            index = pending.find(marker)
+            if index >= 0:
+                end = pending.find(b"\n", index)
+                if end >= 0:
+                    # The newline printed before the marker is not part of the output
+                    buffer.write(pending[:index][:-1] if index else b"")
+                    return bytes(pending[index + len(marker):end])
+            elif len(pending) > len(marker) + 1:
+                keep = len(marker) + 1
+                buffer.write(pending[:-keep])
+                del pending[:-keep]
+
+            data = await stream.read(READ_BYTES)
+            if not data:
+                buffer.write(pending)
+                raise EOFError("shell exited")
+            pending += data
+
+    async def run(self, command: str, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """
+        Runs one command in the persistent shell. On timeout or cancellation
+        the shell and everything it started is killed; the next command gets
+        a fresh shell. Same result shape as `run_streaming`, plus `restarted`.
+        """
+
+        async with self.lock:
+            restarted = self.process is not None and not self.alive
+            if not self.alive:
+                await self._spawn()
+
+            token = uuid.uuid4().hex.encode()
+            marker = b"__CORTEX_" + token + b"__"
+            # eval keeps `cd` and variables in this shell, and turns a syntax error
+            # in the command into an exit status instead of a stuck parser
+            quoted = "'" + command.replace("'", "'\\''") + "'"
+            script = (
+                f"eval {quoted} </dev/null\n"
+                "__cortex_rc=$?\n"
+                f"printf '\\n%s%d\\n' '{marker.decode()}' \"$__cortex_rc\"\n"
+                f"printf '\\n%s\\n' '{marker.decode()}' >&2\n"
+            )
+
+            started = time.monotonic()
+            stdout, stderr = OutputBuffer(), OutputBuffer()
+            process = self.process
+            timed_out = False
+            exit_code: Optional[int] = None
+
+            readers = []
+            try:
+                process.stdin.write(script.encode())
+                await process.stdin.drain()
+                readers = [
+                    asyncio.ensure_future(self._read_until(process.stdout, marker, stdout)),
+                    asyncio.ensure_future(self._read_until(process.stderr, marker, stderr)),
+                ]
+                done, pending = await asyncio.wait(readers, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION)
+                for reader in done:
+                    if reader.exception() is not None:
+                        raise reader.exception()
+                if pending:
+                    raise asyncio.TimeoutError()
+                exit_code = int(readers[0].result() or 0)
+            except asyncio.TimeoutError:
+                timed_out = True
+                logger.warning(f"Command timed out after {timeout}s, restarting shell: {command}")
+                await kill_tree(process)
+            except asyncio.CancelledError:
+                logger.info(f"Command cancelled, restarting shell: {command}")
+                await asyncio.shield(kill_tree(process))
+                raise
+            except (EOFError, ConnectionResetError, BrokenPipeError):
+                # The command ended the shell itself, e.g. `exit 2`
+                await process.wait()
+                exit_code = process.returncode
+            finally:
+                for reader in readers:
+                    reader.cancel()
+                self.last_used = time.monotonic()
+                self.commands += 1
+
+            return {
+                "exit_code": exit_code,
+                "duration": time.monotonic() - started,
+                "timed_out": timed_out,
+                "stdout": stdout,
+                "stderr": stderr,
+                "restarted": restarted,
+            }
+
+    async def close(self) -> None:
+        if self.process is not None:
+            if self.alive:
+                await kill_tree(self.process)
+            self.process = None
+
+
+class ShellPool:
+    """
+    One persistent `ShellWorker` per agent session. Shells idle for longer
+    than `IDLE_TIMEOUT`, or whose session has gone away, are closed by a
+    background reaper; at most `MAX_SHELLS` are kept, evicting the least
+    recently used.
+    """
+
+    def __init__(self, shell: Optional[str] = None):
+        self.shell = shell or shutil.which("bash") or "/bin/sh"
+        self._workers: Dict[int, Tuple[ShellWorker, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def supported() -> bool:
+        return os.name != "nt"
+
+    def get(self, session: Any) -> Tuple[ShellWorker, bool]:
+        """
+        Returns the session's shell and whether it was just created.
+        """
+
+        key = id(session)
+        entry = self._workers.get(key)
+        if entry is not None and entry[1]() is session:
+            return entry[0], False
+
+        if len(self._workers) >= MAX_SHELLS:
+            oldest = min(self._workers, key=lambda k: self._workers[k][0].last_used)
+            asyncio.get_running_loop().create_task(self._workers.pop(oldest)[0].close())
+
+        try:
+            owner = weakref.ref(session)
+        except TypeError:
+            owner = lambda: session
+        worker = ShellWorker(self.shell)
+        self._workers[key] = (worker, owner)
+        return worker, True
+
+    async def close(self, session: Any) -> None:
+        entry = self._workers.pop(id(session), None)
+        if entry is not None:
+            await entry[0].close()
+
+    async def reap(self) -> None:
+        now = time.monotonic()
+        for key, (worker, owner) in list(self._workers.items()):
+            if worker.lock.locked():
+                continue
+            if owner() is None or now - worker.last_used > IDLE_TIMEOUT:
+                self._workers.pop(key, None)
+                await worker.close()
+                logger.info("Closed idle shell worker")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            try:
+                await self.reap()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Shell worker reaping failed")
+
+    def start(self) -> None:
+        """
+        Starts idle reaping on the running event loop if it is not already running.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for worker, _ in list(self._workers.values()):
+            await worker.close()
+        self._workers.clear()
+
+
+_pool: Optional[ShellPool] = None
+
+
+def get_shell_pool() -> ShellPool:
+    """
+    Returns the shared pool of persistent shells, creating it on first use.
+    """
+
+    global _pool
+    if _pool is None:
+        _pool = ShellPool()
+    return _pool
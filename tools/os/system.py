@@ -1,46 +1,20 @@
+import asyncio
 import logging
 import os
 import subprocess
 import platform
+import time
+from datetime import datetime
 from pathlib import Path
 from livekit.agents import function_tool, RunContext
+from tools.os.file_index import _format_size
+from tools.os.listing import KINDS, SORT_KEYS, cursor_after, list_page
+from tools.os.shell import DEFAULT_TIMEOUT, format_result, get_shell_pool, run_streaming
+from tools.os.path_resolver import describe_missing, expand_path, resolve_path, substitution_note
 
 logger = logging.getLogger("JARVIS.OS")
 
-HOME = str(Path.home())
-
-COMMON_PATHS = {
-    "desktop": str(Path.home() / "Desktop"),
-    "downloads": str(Path.home() / "Downloads"),
-    "documents": str(Path.home() / "Documents"),
-}
-
-
-def _resolve_path(path: str) -> str:
-    """
-    Resolves a given path string to its corresponding absolute path.
-    This function first normalizes the input path string by converting it to 
-    lowercase and stripping any leading or trailing whitespace. It then checks 
-    if the normalized path exists in the `COMMON_PATHS` dictionary. If a match 
-    is found, the corresponding value from the dictionary is returned. Otherwise, 
-    the function expands the user directory (if present) in the path and returns 
-    the expanded path.
-    Args:
-        path (str): The input path string to resolve.
-    Returns:
-        str: The resolved absolute path.
-    """
-
-    home = str(Path.home())
-
-    if "yourusername" in path.lower():
-        return path.lower().replace("/users/yourusername", home)
-
-    if "your_username" in path.lower():
-        return path.lower().replace("/users/your_username", home)
-    
-    key = path.lower().strip()
-    return COMMON_PATHS.get(key, os.path.expanduser(path))
+CHARS_PER_TOKEN = 4
 
 
 def _open_file(path: str):
@@ -83,39 +57,115 @@ async def open_file(context: RunContext, path: str) -> str:
     """
 
     try:
-        path = _resolve_path(path)
-        if not Path(path).exists():
-            return f"File or folder does not exist: {path}"
+        resolved = resolve_path(path)
+        if not resolved.exists():
+            return describe_missing(resolved)
 
-        _open_file(path)
-        logger.info(f"Opened file: {path}")
-        return f"Opened {path}"
+        _open_file(str(resolved))
+        logger.info(f"Opened file: {resolved}")
+        note = substitution_note(path, resolved)
+        return f"{note} Opened {resolved}" if note else f"Opened {resolved}"
     except Exception as e:
         logger.error(f"Failed to open file {path}: {e}")
         return f"Failed to open {path}"
 
 
 @function_tool()
-async def list_directory(context: RunContext, path: str = ".") -> str:
+async def list_directory(
+    context: RunContext,
+    path: str = ".",
+    pattern: str = "",
+    kind: str = "any",
+    sort: str = "name",
+    descending: bool = False,
+    modified_within_days: float = 0,
+    older_than_days: float = 0,
+    include_hidden: bool = False,
+    cursor: str = "",
+    max_tokens: int = 1000,
+) -> str:
     """
-    Lists the contents of a directory.
+    Lists the contents of a directory with type, size and modification date, one page at a time.
     Args:
         context (RunContext): The runtime context in which the function is executed.
         path (str, optional): The path of the directory to list. Defaults to the current directory (".").
+        pattern (str, optional): Only names matching this glob, e.g. "*.pdf" or "report*".
+        kind (str, optional): "file", "folder" or "any". Defaults to "any".
+        sort (str, optional): "name", "size", "modified" or "type". Defaults to "name".
+        descending (bool, optional): Reverse the order, e.g. largest or newest first.
+        modified_within_days (float, optional): Only entries modified in the last N days.
+        older_than_days (float, optional): Only entries not modified for at least N days.
+        include_hidden (bool, optional): Include names starting with a dot. Defaults to False.
+        cursor (str, optional): The cursor from a previous call, to get the next page.
+        max_tokens (int, optional): Approximate size limit of the response. Defaults to 1000.
     Returns:
-        str: A newline-separated string of the directory's contents, or an error message if the directory cannot be listed.
+        str: A summary line followed by one line per entry, and a cursor for the next page
+             when more entries remain, or an error message if the directory cannot be listed.
     Raises:
         None: Any exceptions encountered are logged and handled internally.
     """
 
     try:
-        path = _resolve_path(path)
-        files = os.listdir(path)
-        return "\n".join(files)
+        note = ""
+        resolved = resolve_path(path)
+        if not resolved.is_dir():
+            return describe_missing(resolved, "Folder")
+        note = substitution_note(path, resolved)
+        path = str(resolved)
+
+        sort = sort.lower() if sort.lower() in SORT_KEYS else "name"
+        kind = kind.lower() if kind.lower() in KINDS else "any"
+        now = time.time()
+        budget = max(max_tokens, 100) * CHARS_PER_TOKEN
+
+        page = await asyncio.to_thread(
+            list_page,
+            path,
+            sort,
+            descending,
+            cursor,
+            # A line is at least about 10 tokens, so no more than this many can fit
+            max(1, budget // 40),
+            pattern=pattern,
+            kind=kind,
+            modified_after=now - modified_within_days * 86400 if modified_within_days > 0 else None,
+            modified_before=now - older_than_days * 86400 if older_than_days > 0 else None,
+            include_hidden=include_hidden,
+        )
+    except ValueError as e:
+        return str(e)
     except Exception as e:
         logger.error(f"Failed to list directory {path}: {e}")
         return f"Could not list directory {path}"
 
+    entries, total, position = page["entries"], page["total"], page["position"]
+    if not total:
+        return f"{note} No matching entries in {path}." if note else f"No matching entries in {path}."
+
+    lines = []
+    budget -= 200
+    for entry in entries:
+        modified = datetime.fromtimestamp(entry["mtime"]).strftime("%Y-%m-%d %H:%M")
+        if entry["kind"] == "folder":
+            line = f"{entry['name']}/ | folder | modified {modified}"
+        else:
+            line = f"{entry['name']} | {_format_size(entry['size'])} | modified {modified}"
+        if len(line) + 1 > budget and lines:
+            break
+        lines.append(line)
+        budget -= len(line) + 1
+
+    shown = len(lines)
+    order = f"{sort}, {'descending' if descending else 'ascending'}"
+    header = f"{path}: entries {position + 1}-{position + shown} of {total} (sorted by {order})"
+    if note:
+        header = f"{note}\n{header}"
+    if shown < len(entries) or page["has_more"]:
+        next_cursor = cursor_after(entries[shown - 1], sort, descending)
+        footer = f"{total - position - shown} more. For the next page call again with cursor=\"{next_cursor}\"."
+        return "\n".join([header, *lines, footer])
+    return "\n".join([header, *lines])
+
 
 @function_tool()
 async def create_folder(context: RunContext, path: str) -> str:
@@ -131,7 +181,7 @@ async def create_folder(context: RunContext, path: str) -> str:
     """
 
     try:
-        path = _resolve_path(path)
+        path = str(expand_path(path))
         os.makedirs(path, exist_ok=True)
         logger.info(f"Created folder: {path}")
         return f"Folder created: {path}"
@@ -157,7 +207,9 @@ async def delete_path(context: RunContext, path: str) -> str:
     """
 
     try:
-        path = _resolve_path(path)
+        path = str(expand_path(path))
+        if not os.path.lexists(path):
+            return describe_missing(Path(path))
         if os.path.isdir(path):
             os.rmdir(path)
         else:
@@ -170,26 +222,55 @@ async def delete_path(context: RunContext, path: str) -> str:
 
 
 @function_tool()
-async def run_command(context: RunContext, command: str) -> str:
+async def run_command(context: RunContext, command: str, timeout: float = DEFAULT_TIMEOUT) -> str:
     """
     Executes a shell command asynchronously and returns its output.
+    Commands in one conversation share a persistent shell, so `cd`, exported variables and
+    other shell state carry over to the next command.
+    The command is stopped if it runs longer than `timeout` or the user interrupts.
     Args:
         context (RunContext): The context in which the command is executed.
         command (str): The shell command to execute.
+        timeout (float, optional): Seconds to allow before the command is stopped. Defaults to 60.
     Returns:
-        str: The first 4000 characters of the command's output if successful, 
-             or an error message if the command fails.
+        str: The exit code and duration, followed by the end of the command's output and errors,
+             or an error message if the command could not be started.
     Logs:
-        - Logs the executed command on success.
-        - Logs an error message if the command fails.
+        - Logs the executed command with its exit code and duration.
+        - Logs an error message if the command could not be started.
     Raises:
         None: Any exceptions are caught and logged internally.
     """
 
     try:
-        output = subprocess.check_output(command, shell=True, text=True)
-        logger.info(f"Executed command: {command}")
-        return output[:4000]
+        timeout = max(1.0, timeout)
+        pool = get_shell_pool()
+        session = getattr(context, "session", None)
+
+        if pool.supported() and session is not None:
+            worker, _ = pool.get(session)
+            task = asyncio.ensure_future(worker.run(command, timeout=timeout))
+        else:
+            task = asyncio.ensure_future(run_streaming(command, timeout=timeout))
+
+        # The framework waits for tool calls to finish even when the user talks over
+        # the reply, so race the command against the interruption and stop it ourselves
+        speech_handle = getattr(context, "speech_handle", None)
+        if speech_handle is not None:
+            await speech_handle.wait_if_not_interrupted([task])
+            if speech_handle.interrupted and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                logger.info(f"Command stopped because the user interrupted: {command}")
+                return "The command was stopped because the user interrupted."
+
+        result = await task
+
+        logger.info(f"Executed command: {command} (exit {result['exit_code']}, {result['duration']:.2f}s)")
+        return format_result(result)
     except Exception as e:
         logger.error(f"Command failed: {command} : {e}")
         return f"Command execution failed"
\ No newline at end of file
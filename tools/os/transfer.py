@@ -0,0 +1,349 @@
+import asyncio
+import errno
+import itertools
+import logging
+import os
+import shutil
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("JARVIS.OS.Transfer")
+
+TRANSFER_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+# Progress and cancellation are checked between chunks
+CHUNK_BYTES = 8 * 1024 * 1024
+MAX_FINISHED = 20
+
+_pool: Optional[ThreadPoolExecutor] = None
+_ids = itertools.count(1)
+_transfers: Dict[int, "Transfer"] = {}
+
+# Kernel fast paths are disabled per process after the first unsupported error
+_fast_paths = {"copy_file_range": hasattr(os, "copy_file_range"), "sendfile": hasattr(os, "sendfile")}
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=TRANSFER_WORKERS, thread_name_prefix="transfer")
+    return _pool
+
+
+class Transfer:
+    """
+    A copy or move running in the transfer worker pool.
+    Byte and file counters are updated by the workers as chunks complete;
+    `progress()` turns them into a snapshot with throughput and ETA.
+    """
+
+    def __init__(self, kind: str, source: Path, destination: Path):
+        self.id = next(_ids)
+        self.kind = kind
+        self.source = source
+        self.destination = destination
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.total_files = 0
+        self.done_files = 0
+        self.status = "running"
+        self.error: Optional[str] = None
+        # Pipes, sockets and devices inside a copied folder are left out
+        self.skipped: List[str] = []
+        # Set once every file is in place, so a failure after that keeps the copy
+        self.copied = False
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.future: Optional[asyncio.Future] = None
+
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def _advance(self, nbytes: int) -> None:
+        with self._lock:
+            self.done_bytes += nbytes
+        if self._cancel.is_set():
+            raise TransferCancelled()
+
+    def _file_done(self) -> None:
+        with self._lock:
+            self.done_files += 1
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def progress(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        rate = self.done_bytes / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total_bytes - self.done_bytes, 0)
+
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "source": str(self.source),
+            "destination": str(self.destination),
+            "status": self.status,
+            "error": self.error,
+            "skipped": list(self.skipped),
+            "bytes": self.done_bytes,
+            "total_bytes": self.total_bytes,
+            "files": self.done_files,
+            "total_files": self.total_files,
+            "percent": round(100 * self.done_bytes / self.total_bytes, 1) if self.total_bytes else 100.0,
+            "elapsed": round(elapsed, 2),
+            "mb_per_s": round(rate / 1e6, 1),
+            "eta": round(remaining / rate, 1) if rate and self.status == "running" else None,
+        }
+
+
+def _copy_data(fin: int, fout: int, size: int, transfer: Transfer) -> None:
+    """
+    Copies `size` bytes between two file descriptors, preferring
+    `copy_file_range` (in-kernel, reflink-capable), then `sendfile`, then a
+    userspace read/write loop.
+    """
+
+    offset = 0
+
+    if _fast_paths["copy_file_range"]:
+        try:
+            while offset < size:
+                sent = os.copy_file_range(fin, fout, min(CHUNK_BYTES, size - offset))
+                if sent == 0:
+                    break
+                offset += sent
+                transfer._advance(sent)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP) or offset:
+                raise
+            _fast_paths["copy_file_range"] = e.errno == errno.EXDEV
+
+    if _fast_paths["sendfile"]:
+        try:
+            while offset < size:
+                sent = os.sendfile(fout, fin, offset, min(CHUNK_BYTES, size - offset))
+                if sent == 0:
+                    break
+                offset += sent
+                transfer._advance(sent)
+            return
+        except OSError as e:
+            if e.errno not in (errno.ENOSYS, errno.EINVAL, errno.ENOTSOCK) or offset:
+                raise
+            _fast_paths["sendfile"] = False
+
+    buffer = bytearray(min(CHUNK_BYTES, max(size, 1)))
+    view = memoryview(buffer)
+    while True:
+        n = os.readv(fin, [view])
+        if not n:
+            break
+        os.write(fout, view[:n])
+        transfer._advance(n)
+
+
+def _copy_file(src: Path, dst: Path, transfer: Transfer) -> None:
+    if transfer._cancel.is_set():
+        raise TransferCancelled()
+
+    if src.is_symlink():
+        os.symlink(os.readlink(src), dst)
+        transfer._file_done()
+        return
+
+    try:
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            _copy_data(fin.fileno(), fout.fileno(), os.fstat(fin.fileno()).st_size, transfer)
+        shutil.copystat(src, dst)
+    except BaseException:
+        dst.unlink(missing_ok=True)
+        raise
+
+    transfer._file_done()
+
+
+def _plan_tree(src: Path, dst: Path) -> Tuple[List[Tuple[Path, Path, int]], List[Path], int, List[Path]]:
+    """
+    Walks a directory tree once and returns the files to copy with their
+    sizes, the directories to create, the total byte count and the special
+    files (pipes, sockets, devices) that cannot be copied.
+    """
+
+    files, dirs, total, special = [], [dst], 0, []
+    stack = [(src, dst)]
+
+    while stack:
+        current, target = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                source = Path(entry.path)
+                dest = target / entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(dest)
+                    stack.append((source, dest))
+                elif entry.is_symlink():
+                    files.append((source, dest, 0))
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
+                    files.append((source, dest, size))
+                    total += size
+                else:
+                    special.append(source)
+
+    return files, dirs, total, special
+
+
+def _copy_tree(src: Path, dst: Path, transfer: Transfer) -> None:
+    files, dirs, total, special = _plan_tree(src, dst)
+    if special and transfer.kind == "move":
+        # The source is deleted after the copy, which would lose what was left out
+        names = ", ".join(str(path) for path in special[:5])
+        raise shutil.SpecialFileError(f"Cannot move special files (pipes, sockets, devices): {names}")
+
+    transfer.total_bytes, transfer.total_files = total, len(files)
+    transfer.skipped = [str(path) for path in special]
+
+    for directory in dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # Largest files first so one big file does not start last and dominate the tail
+    files.sort(key=lambda item: item[2], reverse=True)
+    futures = [_get_pool().submit(_copy_file, s, d, transfer) for s, d, _ in files]
+
+    error = None
+    for future in futures:
+        try:
+            future.result()
+        except BaseException as e:
+            error = error or e
+            transfer.cancel()
+
+    if error is not None:
+        raise error
+
+    for directory in reversed(dirs):
+        shutil.copystat(src / directory.relative_to(dst), directory)
+
+
+def _copy(src: Path, dst: Path, transfer: Transfer, follow_symlinks: bool = True) -> None:
+    # Like shutil.copy2, a symlink given as the source is copied as what it points to;
+    # links inside a copied folder are recreated as links
+    if follow_symlinks and src.is_symlink():
+        src = src.resolve(strict=True)
+
+    if src.is_dir() and not src.is_symlink():
+        _copy_tree(src, dst, transfer)
+    else:
+        info = src.lstat()
+        if not stat.S_ISREG(info.st_mode) and not stat.S_ISLNK(info.st_mode):
+            raise shutil.SpecialFileError(f"{src} is a special file (pipe, socket or device)")
+        transfer.total_bytes, transfer.total_files = info.st_size, 1
+        _copy_file(src, dst, transfer)
+    transfer.copied = True
+
+
+def _move(src: Path, dst: Path, transfer: Transfer) -> None:
+    try:
+        # Same filesystem: a rename is instant regardless of size
+        os.rename(src, dst)
+        transfer.total_files = transfer.done_files = 1
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    # A moved link stays a link, as it would with a rename
+    _copy(src, dst, transfer, follow_symlinks=False)
+    if src.is_dir() and not src.is_symlink():
+        shutil.rmtree(src)
+    else:
+        src.unlink()
+
+
+def _target(src: Path, dst: Path) -> Path:
+    # Like `cp` and `mv`: an existing directory destination receives the source by name
+    return dst / src.name if dst.is_dir() else dst
+
+
+def _discard_partial(transfer: Transfer) -> bool:
+    # The source is only removed after a complete copy, so partial output can go.
+    # start_transfer refuses existing folder destinations, so the tree is ours
+    if transfer.copied or not transfer.destination.is_dir() or transfer.destination.is_symlink():
+        return False
+    if not transfer.source.is_dir():
+        return False
+    shutil.rmtree(transfer.destination, ignore_errors=True)
+    return True
+
+
+def _run(transfer: Transfer, action) -> None:
+    try:
+        action(transfer.source, transfer.destination, transfer)
+        transfer.status = "done"
+    except TransferCancelled:
+        transfer.status = "cancelled"
+        _discard_partial(transfer)
+    except Exception as e:
+        transfer.status = "failed"
+        transfer.error = f"{type(e).__name__}: {e}"
+        logger.exception(f"Transfer {transfer.id} failed")
+        if _discard_partial(transfer):
+            transfer.error += f" (partial copy at {transfer.destination} removed)"
+        elif transfer.copied and transfer.source.exists():
+            transfer.error += f" (the copy at {transfer.destination} is complete; the source was not fully removed)"
+    finally:
+        transfer.finished = time.monotonic()
+        progress = transfer.progress()
+        logger.info(
+            f"Transfer {transfer.id} {transfer.status}: {progress['bytes']} bytes, "
+            f"{progress['files']} files in {progress['elapsed']}s ({progress['mb_per_s']} MB/s)"
+        )
+
+
+def _forget_finished() -> None:
+    finished = [t for t in _transfers.values() if t.status != "running"]
+    for transfer in finished[:-MAX_FINISHED]:
+        _transfers.pop(transfer.id, None)
+
+
+def start_transfer(kind: str, source: Path, destination: Path) -> Transfer:
+    """
+    Starts copying or moving `source` to `destination` in the worker pool
+    and returns immediately. Await `transfer.future` to wait for completion.
+    """
+
+    destination = _target(source, destination)
+    # Checked before anything is opened for writing, which would truncate the source
+    if destination.exists() and os.path.samefile(source, destination):
+        raise shutil.SameFileError(f"{source} and {destination} are the same file")
+    if source.is_dir() and not source.is_symlink() and destination.resolve().is_relative_to(source.resolve()):
+        raise ValueError(f"Cannot {kind} a folder into itself: {destination}")
+    if destination.exists() and source.is_dir():
+        raise FileExistsError(f"Destination already exists: {destination}")
+
+    transfer = Transfer(kind, source, destination)
+    action = _copy if kind == "copy" else _move
+
+    _forget_finished()
+    _transfers[transfer.id] = transfer
+
+    # The coordinator runs in its own thread so tree copies can fan out
+    # over the whole pool without one worker waiting on the others
+    transfer.future = asyncio.get_running_loop().run_in_executor(None, _run, transfer, action)
+    return transfer
+
+
+def get_transfer(transfer_id: int) -> Optional[Transfer]:
+    return _transfers.get(transfer_id)
+
+
+def list_transfers() -> List[Transfer]:
+    return list(_transfers.values())
@@ -1,12 +1,21 @@
 from tools.web.search import search
-from tools.web.weather import get_weather
-from tools.email.gmail import send_email
+from tools.web.weather import get_weather, get_weather_multi
+from tools.email.gmail import send_email, email_queue_status
+from tools.email.bulk import send_bulk_email
+from tools.email.inbox import search_email
 from tools.os.system import open_file, list_directory, create_folder, delete_path, run_command
-from tools.web.scraping import scrape_page
-from tools.os.files import read_file, write_file, move_file, copy_file, delete_file
-from tools.os.browser import search_google, search_youtube, open_github, open_stackoverflow, open_url
+from tools.os.file_index import find_files
+from tools.os.grep import grep_files
+from tools.os.documents import search_documents
+from tools.os.disk_usage import disk_usage
+from tools.os.batch import batch_files, undo_batch, resume_batch
+from tools.os.duplicates import find_duplicates
+from tools.os.jobs import start_background_job, job_status, job_output, wait_for_job, stop_job
+from tools.web.scraping import scrape_page, scrape_pages
+from tools.os.files import read_file, write_file, move_file, copy_file, delete_file, transfer_status, cancel_transfer
+from tools.os.browser import search_google, search_youtube, open_github, open_stackoverflow, open_url, open_urls
 from tools.os.apps import open_app, quit_app, focus_app, list_apps
-from tools.browser.control import open_new_tab, go_back, go_forward, search_on_page, click_element, switch_tab, scroll_page, close_all_tabs, close_current_tab, close_tab_by_index, close_tab_by_title, submit_search, smart_click
+from tools.browser.control import open_new_tab, go_back, go_forward, search_on_page, click_element, switch_tab, scroll_page, close_all_tabs, close_current_tab, close_tab_by_index, close_tab_by_title, submit_search, smart_click, browser_status
 
 
 __all__ = ["search", "get_weather", "send_email","open_file","list_directory","create_folder","delete_path","run_command","scrape_page","read_file","write_file","move_file","copy_file","delete_file","open_url","search_google","search_youtube","open_github","open_stackoverflow","open_app","quit_app","focus_app","list_apps","open_new_tab","go_back","go_forward","search_on_page","click_element","switch_tab","scroll_page","close_all_tabs","close_current_tab","close_tab_by_index","close_tab_by_title","submit_search","smart_click"]
\ No newline at end of file
@@ -1,10 +1,69 @@
+import asyncio
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import aiohttp
 import requests
 from bs4 import BeautifulSoup
 from livekit.agents import function_tool, RunContext
 
 logger = logging.getLogger("JARVIS.WebScraper")
 
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (CortexOS/1.0)"
+}
+
+FETCH_TIMEOUT = 10
+MAX_BATCH_URLS = 10
+MAX_CONCURRENCY = 8
+MAX_PER_HOST = 2
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool used for HTML parsing, creating it on first use.
+    """
+
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _parse_pool
+
+
+def _normalize_url(url: str) -> str:
+    url = url.strip()
+    if not url.startswith("http"):
+        url = "https://" + url
+    return url
+
+
+def _extract_text(html: str, max_chars: int) -> str:
+    """
+    Extracts readable text from an HTML document.
+    Scripts, styles and noscript blocks are removed before the visible strings
+    are joined. This runs inside the parse worker pool, so it must stay a
+    module-level function.
+    Args:
+        html (str): The raw HTML document.
+        max_chars (int): The maximum number of characters to return.
+    Returns:
+        str: The cleaned text, truncated to `max_chars`. Empty if nothing readable was found.
+    """
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+
+    text = " ".join(soup.stripped_strings)
+    return text[:max_chars]
+
 
 @function_tool()
 async def scrape_page(context: RunContext, url: str, max_chars: int = 4000) -> str:
@@ -33,30 +92,18 @@ async def scrape_page(context: RunContext, url: str, max_chars: int = 4000) -> s
     """
 
     try:
-        if not url.startswith("http"):
-            url = "https://" + url
+        url = _normalize_url(url)
 
         logger.info(f"Scraping URL: {url}")
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (CortexOS/1.0)"
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
+        response = requests.get(url, headers=HEADERS, timeout=FETCH_TIMEOUT)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        cleaned = _extract_text(response.text, max_chars)
 
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-
-        text = " ".join(soup.stripped_strings)
-
-        if not text:
+        if not cleaned:
             return "No readable content found on the page."
 
-        cleaned = text[:max_chars]
-
         logger.info(f"Scraped {len(cleaned)} characters from {url}")
         return cleaned
 
@@ -70,4 +117,118 @@ async def scrape_page(context: RunContext, url: str, max_chars: int = 4000) -> s
 
     except Exception:
         logger.exception(f"Unexpected error scraping {url}")
-        return "An unexpected error occurred while scraping the web page."
\ No newline at end of file
+        return "An unexpected error occurred while scraping the web page."
+
+
+async def _scrape_one(
+    session: aiohttp.ClientSession,
+    url: str,
+    max_chars: int,
+) -> dict:
+    """
+    Fetches a single URL and parses it in the worker pool.
+    Returns a result dict with the url, status, text or error, and elapsed time.
+    Never raises; failures are reported in the `error` field.
+    """
+
+    started = time.perf_counter()
+    result = {"url": url, "status": None, "text": "", "error": None}
+
+    try:
+        async with session.get(url) as response:
+            result["status"] = response.status
+            response.raise_for_status()
+            html = await response.text(errors="ignore")
+
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(_get_parse_pool(), _extract_text, html, max_chars)
+
+        if text:
+            result["text"] = text
+        else:
+            result["error"] = "No readable content found on the page."
+
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout while scraping {url}")
+        result["error"] = "Request timed out."
+
+    except aiohttp.ClientResponseError as e:
+        logger.error(f"HTTP error while scraping {url}: {e}")
+        result["error"] = f"HTTP error {e.status}."
+
+    except aiohttp.ClientError as e:
+        logger.error(f"Connection error while scraping {url}: {e}")
+        result["error"] = "Could not connect to the page."
+
+    except Exception:
+        logger.exception(f"Unexpected error scraping {url}")
+        result["error"] = "Unexpected error."
+
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+def _format_batch(results: List[dict], elapsed: float) -> str:
+    ok = sum(1 for r in results if not r["error"])
+    lines = [f"Scraped {ok}/{len(results)} pages in {elapsed:.2f}s."]
+
+    for i, r in enumerate(results, start=1):
+        if r["error"]:
+            lines.append(f"\n[{i}] {r['url']} ({r['elapsed']:.2f}s) FAILED: {r['error']}")
+        else:
+            lines.append(f"\n[{i}] {r['url']} ({r['elapsed']:.2f}s, {len(r['text'])} chars)")
+            lines.append(r["text"])
+
+    return "\n".join(lines)
+
+
+@function_tool()
+async def scrape_pages(context: RunContext, urls: List[str], max_chars_per_page: int = 2000) -> str:
+    """
+    Scrape several web pages concurrently and return all results in one response.
+    Use this instead of repeated `scrape_page` calls when comparing or summarising
+    multiple pages.
+    Args:
+        context (RunContext): The runtime context for the operation.
+        urls (List[str]): The URLs to scrape. "https://" is prepended when missing.
+            At most 10 URLs are processed per call; duplicates are ignored.
+        max_chars_per_page (int, optional): The maximum number of characters returned
+            for each page. Defaults to 2000.
+    Returns:
+        str: A summary line followed by one section per URL, in the order given,
+        containing either the cleaned page text or the error for that URL, along
+        with the time taken.
+    Notes:
+        - Fetches are capped both globally and per host, so several URLs on the same
+          site do not hammer it.
+        - HTML parsing runs in a process pool so large pages are parsed on multiple cores.
+    """
+
+    try:
+        unique = list(dict.fromkeys(_normalize_url(u) for u in urls if u and u.strip()))
+
+        if not unique:
+            return "No URLs specified."
+
+        if len(unique) > MAX_BATCH_URLS:
+            logger.warning(f"Batch scrape truncated from {len(unique)} to {MAX_BATCH_URLS} URLs")
+            unique = unique[:MAX_BATCH_URLS]
+
+        logger.info(f"Batch scraping {len(unique)} URLs")
+        started = time.perf_counter()
+
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY, limit_per_host=MAX_PER_HOST)
+        timeout = aiohttp.ClientTimeout(sock_connect=FETCH_TIMEOUT, sock_read=FETCH_TIMEOUT)
+
+        async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(_scrape_one(session, url, max_chars_per_page) for url in unique)
+            )
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Batch scraped {len(unique)} URLs in {elapsed:.2f}s")
+        return _format_batch(results, elapsed)
+
+    except Exception:
+        logger.exception("Batch scrape failed")
+        return "An unexpected error occurred while scraping the web pages."
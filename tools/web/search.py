@@ -1,24 +1,199 @@
+import asyncio
 import logging
+import os
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
 from livekit.agents import function_tool, RunContext
-from langchain_community.tools import DuckDuckGoSearchRun
+from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+from tools.cache import cached_tool
+
+logger = logging.getLogger("JARVIS.WebSearch")
+
+SEARCH_TIMEOUT = 8
+DEFAULT_MAX_RESULTS = 5
+DEFAULT_TOKEN_BUDGET = 600
+CHARS_PER_TOKEN = 4
+
+
+class DuckDuckGoBackend:
+    """
+    Search backend wrapping a single long-lived DuckDuckGo API wrapper.
+    """
+
+    def __init__(self):
+        self._wrapper = DuckDuckGoSearchAPIWrapper()
+
+    def results(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        raw = self._wrapper.results(query, max_results)
+        return [
+            {
+                "title": item.get("title", ""),
+                "url": item.get("link", ""),
+                "snippet": item.get("snippet", ""),
+            }
+            for item in raw
+        ]
+
+
+class LocalSearchBackend:
+    """
+    Offline stand-in backend for benchmarks and development.
+    Returns deterministic results built from the query, optionally after a
+    simulated network delay. Every other result repeats an earlier URL so the
+    deduplication path is exercised.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def results(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        slug = "-".join(query.lower().split()) or "empty"
+        return [
+            {
+                "title": f"{query} - result {i // 2 + 1}",
+                "url": f"https://example.com/{slug}/{i // 2 + 1}",
+                "snippet": f"Local result {i // 2 + 1} about {query}. " * 8,
+            }
+            for i in range(max_results)
+        ]
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Returns the shared search backend, creating it on first use.
+    Set CORTEX_SEARCH_BACKEND=local to use the offline stand-in.
+    """
+
+    global _backend
+    if _backend is None:
+        if os.getenv("CORTEX_SEARCH_BACKEND", "").lower() == "local":
+            _backend = LocalSearchBackend()
+        else:
+            _backend = DuckDuckGoBackend()
+    return _backend
+
+
+def set_search_backend(backend) -> None:
+    """
+    Replaces the shared search backend, e.g. with a `LocalSearchBackend` for benchmarks.
+    """
+
+    global _backend
+    _backend = backend
+
+
+def _url_key(url: str) -> str:
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}?{parts.query}"
+
+
+def _dedupe(results: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    seen_urls = set()
+    seen_snippets = set()
+    unique = []
+
+    for item in results:
+        url_key = _url_key(item["url"])
+        snippet_key = " ".join(item["snippet"].lower().split())
+
+        if url_key in seen_urls or (snippet_key and snippet_key in seen_snippets):
+            continue
+
+        seen_urls.add(url_key)
+        seen_snippets.add(snippet_key)
+        unique.append(item)
+
+    return unique
+
+
+def _format_results(results: List[Dict[str, str]], max_tokens: int) -> str:
+    """
+    Formats results as a numbered list, trimming snippets so the whole block
+    stays within roughly `max_tokens` tokens.
+    """
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    blocks = []
+
+    for i, item in enumerate(results, start=1):
+        header = f"{i}. {item['title']}\n   {item['url']}\n   "
+        remaining = budget - len(header)
+
+        if remaining <= 0:
+            break
+
+        snippet = " ".join(item["snippet"].split())
+        if len(snippet) > remaining:
+            snippet = snippet[: max(remaining - 3, 0)].rstrip() + "..."
+
+        block = header + snippet
+        blocks.append(block)
+        budget -= len(block) + 1
+
+    return "\n".join(blocks)
+
+
+def _is_cacheable(result: str) -> bool:
+    return not result.startswith(("An error", "The search for", "No results"))
+
 
 @function_tool()
-async def search(context: RunContext, query: str) -> str:
+@cached_tool(ttl=300, maxsize=256, cache_if=_is_cacheable)
+async def search(
+    context: RunContext,
+    query: str,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    max_tokens: int = DEFAULT_TOKEN_BUDGET,
+) -> str:
     """
-    Performs a web search using the DuckDuckGo search tool.
+    Performs a web search using DuckDuckGo and returns the top results.
     Args:
         context (RunContext): The context in which the tool is being executed.
         query (str): The search query string.
+        max_results (int, optional): The number of results to return. Defaults to 5.
+        max_tokens (int, optional): Approximate token budget for the whole response.
+            Snippets are trimmed to fit. Defaults to 600.
     Returns:
-        str: The search results as a string, or an error message if the search fails.
-    Logs:
-        Logs the search results or any errors encountered during the search process.
+        str: A numbered list of results, each with its title, URL and snippet,
+        or an error message if the search fails or times out.
+    Notes:
+        The search runs in a worker thread with an 8 second deadline so it never
+        blocks the event loop. Duplicate URLs and snippets are removed.
     """
 
     try:
-        results = DuckDuckGoSearchRun().run(tool_input=query)
-        logging.info(f"Search results for {query} : {results}")
-        return results
+        backend = get_search_backend()
+        started = time.perf_counter()
+
+        # Over-fetch slightly so deduplication still leaves `max_results` entries
+        raw = await asyncio.wait_for(
+            asyncio.to_thread(backend.results, query, max_results * 2),
+            timeout=SEARCH_TIMEOUT,
+        )
+        results = _dedupe(raw)[:max_results]
+
+        logger.info(
+            f"Search for {query} returned {len(results)} results in {time.perf_counter() - started:.2f}s"
+        )
+        logger.debug(f"Search results for {query} : {results}")
+
+        if not results:
+            return f"No results found for {query}"
+
+        return _format_results(results, max_tokens)
+
+    except asyncio.TimeoutError:
+        logger.error(f"Search timed out for {query}")
+        return f"The search for {query} timed out"
+
     except Exception as e:
-        logging.error(f"Error searching the web for {query} : {e}")
-        return f"An error occurred while searching for {query}"
\ No newline at end of file
+        logger.error(f"Error searching the web for {query} : {e}")
+        return f"An error occurred while searching for {query}"
@@ -1,6 +1,90 @@
+import asyncio
 import logging
+import os
+from typing import List, Optional
+from urllib.parse import quote
+import aiohttp
+from aiohttp import web
 from livekit.agents import function_tool, RunContext
-import requests
+from tools.cache import get_cache
+
+logger = logging.getLogger("JARVIS.Weather")
+
+WEATHER_URL = os.getenv("CORTEX_WEATHER_URL", "https://wttr.in")
+WEATHER_TTL = float(os.getenv("CORTEX_WEATHER_TTL", "600"))
+WEATHER_TIMEOUT = 5
+MAX_CITIES = 10
+
+# One entry per city, so a batched call reuses cities fetched by earlier calls
+# and simultaneous lookups for the same city share one request
+_city_cache = get_cache("weather_city", ttl=WEATHER_TTL, maxsize=256)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """
+    Returns the shared HTTP session, creating it on first use or after it was closed.
+    """
+
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=WEATHER_TIMEOUT),
+            headers={"User-Agent": "curl/8.0 (CortexOS/1.0)"},
+        )
+    return _session
+
+
+async def close_session() -> None:
+    """
+    Closes the shared HTTP session. It is recreated on the next lookup.
+    """
+
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+def set_weather_url(url: str) -> None:
+    """
+    Points the weather tools at another wttr.in-compatible server, e.g. a `WeatherStubServer`.
+    """
+
+    global WEATHER_URL
+    WEATHER_URL = url.rstrip("/")
+
+
+async def _fetch_city(city: str) -> str:
+    """
+    Fetches the one-line wttr.in report for a city.
+    Raises on timeouts and non-200 responses so failures are never cached.
+    """
+
+    url = f"{WEATHER_URL}/{quote(city)}?format=3"
+    async with _get_session().get(url) as response:
+        text = (await response.text()).strip()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {text[:200]}")
+        return text
+
+
+async def _lookup(city: str) -> str:
+    city = " ".join(city.split())
+    key = f"weather_city:{WEATHER_URL}:{city.lower()}"
+
+    try:
+        report = await _city_cache.get_or_compute(key, lambda: _fetch_city(city))
+        logger.info(f"Weather for {city} : {report}")
+        return report
+    except asyncio.TimeoutError:
+        logger.error(f"Timed out retrieving weather for {city}")
+        return f"Timed out retrieving weather for {city}"
+    except Exception as e:
+        logger.error(f"Error retrieving weather for {city} : {e}")
+        return f"An error occurred while retrieving weather for {city}"
+
 
 @function_tool()
 async def get_weather(context: RunContext, city: str) -> str:
@@ -11,24 +95,93 @@ async def get_weather(context: RunContext, city: str) -> str:
         city (str): The name of the city for which to retrieve the weather.
     Returns:
         str: A string containing the weather information in a concise format, or an error message if the request fails.
-    Raises:
-        Exception: Logs and handles any exceptions that occur during the HTTP request.
     Note:
-        This function uses the wttr.in service to fetch weather data. Ensure that the `requests` library is installed
-        and that the service is accessible from the network.
+        This function uses the wttr.in service. Reports are cached for ten minutes
+        and each request times out after five seconds.
+    """
+
+    return await _lookup(city)
+
+
+@function_tool()
+async def get_weather_multi(context: RunContext, cities: List[str]) -> str:
+    """
+    Fetches the current weather for several cities in one call.
+    Use this instead of repeated `get_weather` calls when the user asks about
+    more than one place.
+    Args:
+        context (RunContext): The runtime context in which the function is executed.
+        cities (List[str]): The city names to look up. At most 10 cities are
+            processed per call; duplicates are ignored.
+    Returns:
+        str: One line per city with its weather report or an error message.
+    Note:
+        Lookups run concurrently. Cities fetched recently, or currently being
+        fetched by another call, are served without a second request.
     """
+
     try:
-        response = requests.get(
-            f"https://wttr.in/{city}?format=3"
-        )
+        unique = []
+        seen = set()
+        for city in cities:
+            city = (city or "").strip()
+            if city and city.lower() not in seen:
+                seen.add(city.lower())
+                unique.append(city)
 
-        if response.status_code == 200:
-            logging.info(f"Weather for {city} : {response.text.strip()}")
-            return response.text.strip()
+        if not unique:
+            return "No cities specified."
 
-        else:
-            logging.error(f"Failed to get weather for {city}: {response.status_code}")
-            return response.text.strip()
-    except Exception as e:
-        logging.error(f"Error retrieving weather for {city} : {e}")
-        return f"An error occurred while retrieving weather for {city}"
\ No newline at end of file
+        if len(unique) > MAX_CITIES:
+            logger.warning(f"Weather lookup truncated from {len(unique)} to {MAX_CITIES} cities")
+            unique = unique[:MAX_CITIES]
+
+        reports = await asyncio.gather(*(_lookup(city) for city in unique))
+        return "\n".join(reports)
+
+    except Exception:
+        logger.exception("Batched weather lookup failed")
+        return "An error occurred while retrieving the weather."
+
+
+class WeatherStubServer:
+    """
+    Local stand-in for wttr.in used for offline benchmarks and development.
+    Answers `GET /<city>?format=3` with a fixed report after a simulated
+    delay and counts the requests it served. Point the tools at it with
+    `set_weather_url(await stub.start())`.
+    """
+
+    def __init__(self, latency: float = 0.05, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        city = request.match_info["city"]
+        return web.Response(text=f"{city}: ☀️ +21°C\n")
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/{city}", self._handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        self.port = self._runner.addresses[0][1]
+        return self.base_url
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None